@@ -1,9 +1,9 @@
 from langchain_core.tools import tool
 from langchain.agents import create_agent
-import requests
 import json
 
 from utils.models import model
+from utils.weather import get_weather_client
 
 @tool
 def get_weather(latitude: float, longitude: float) -> str:
@@ -16,21 +16,8 @@ def get_weather(latitude: float, longitude: float) -> str:
     Returns:
         JSON string with temperature_fahrenheit and weather_code (do not include the code in your response, translate it to plain English)
     """
-    url = "https://api.open-meteo.com/v1/forecast"
-    params = {
-        "latitude": latitude,
-        "longitude": longitude,
-        "current": "temperature_2m,weather_code",
-        "temperature_unit": "fahrenheit"
-    }
-
-    weather = requests.get(url, params=params).json()["current"]
-    temperature = weather["temperature_2m"]
-    weather_code = weather["weather_code"]
-    result = {
-        "temperature_fahrenheit": temperature,
-        "weather_code": weather_code
-    }
+    # Shared client: pooled connections, grid-snapped TTL cache and single-flight
+    result = get_weather_client().get_current(latitude, longitude)
 
     return json.dumps(result)
 
@@ -17,10 +17,12 @@ from datetime import datetime
 
 from deepagents import create_deep_agent
 from deepagents.backends import CompositeBackend, FilesystemBackend, StoreBackend
+from langchain.agents.middleware import before_agent
 from langchain_core.tools import tool
 from tavily import TavilyClient
 
 from utils.models import model
+from utils.search_cache import cached_tavily_search, reset_search_cache
 
 AGENT_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -36,17 +38,15 @@ def tavily_search(query: str) -> str:
     Args:
         query: Search query to execute
     """
-    search_results = tavily_client.search(query, max_results=3, topic="general")
+    # Identical searches and pages already returned in this run are served
+    # from the shared search cache instead of being fetched and read again
+    return cached_tavily_search(tavily_client, query, max_results=3, topic="general")
 
-    result_texts = []
-    for result in search_results.get("results", []):
-        url = result["url"]
-        title = result["title"]
-        content = result.get("content", "No content available")
-        result_text = f"## {title}\n**URL:** {url}\n\n{content}\n\n---\n"
-        result_texts.append(result_text)
 
-    return f"Found {len(result_texts)} result(s) for '{query}':\n\n{''.join(result_texts)}"
+@before_agent
+def reset_run_search_cache(state, runtime) -> None:
+    """Start each run with an empty search cache, shared by the agent and its subagents."""
+    reset_search_cache()
 
 # --- Research Subagent ---
 
@@ -101,6 +101,7 @@ agent = create_deep_agent(
     memory=["./AGENTS.md"],
     skills=["./skills/"],
     subagents=[research_subagent],
+    middleware=[reset_run_search_cache],
     backend=composite_backend,
     interrupt_on={
         "write_file": True,
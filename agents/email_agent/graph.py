@@ -1,3 +1,4 @@
+import logging
 from typing import Literal, TypedDict
 from pydantic import BaseModel, Field
 from datetime import datetime
@@ -8,9 +9,18 @@ from langgraph.graph import StateGraph, START, END, MessagesState
 from langgraph.types import Command
 from dotenv import load_dotenv
 from utils.models import model
+from utils.structured_output import with_json_repair
+from utils.calendar_engine import book_meeting, check_availability
+from agents.email_agent.utils import compact_email_thread
 
 load_dotenv("../.env")
 
+logger = logging.getLogger(__name__)
+
+# Strip quoted replies, signatures and disclaimers from email_thread before
+# triage and response. Set to False to send the raw thread to the model.
+COMPACT_EMAIL_THREAD = True
+
 class RouterSchema(BaseModel):
     """Analyze the unread email and route it according to its content."""
 
@@ -23,23 +33,20 @@ class RouterSchema(BaseModel):
         "'respond' for emails that need a reply",
     )
 
-llm_router = model.with_structured_output(RouterSchema) 
+llm_router = with_json_repair(model, RouterSchema)
 
 # Tools
 @tool
 def schedule_meeting(
     attendees: list[str], subject: str, duration_minutes: int, preferred_day: datetime, start_time: int
 ) -> str:
-    """Schedule a calendar meeting."""
-    # Placeholder response - in real app would check calendar and schedule
-    date_str = preferred_day.strftime("%A, %B %d, %Y")
-    return f"Meeting '{subject}' scheduled on {date_str} at {start_time} for {duration_minutes} minutes with {len(attendees)} attendees"
+    """Schedule a calendar meeting. start_time is the hour (e.g. 14) or HHMM (e.g. 1430)."""
+    return book_meeting(attendees, subject, preferred_day, start_time, duration_minutes)
 
 @tool
-def check_calendar_availability(day: str) -> str:
-    """Check calendar availability for a given day."""
-    # Placeholder response - in real app would check actual calendar
-    return f"Available times on {day}: 9:00 AM, 2:00 PM, 4:00 PM"
+def check_calendar_availability(day: str, attendees: list[str] | None = None) -> str:
+    """Check calendar availability for a given day, optionally for other attendees too."""
+    return check_availability(day, attendees or [])
 
 
 @tool
@@ -68,6 +75,7 @@ class State(MessagesState):
     # This state class has the messages key build in
     email_input: dict
     classification_decision: Literal["ignore", "respond", "notify"]
+    thread_compaction: dict
 
 
 # ------------------------------------------------------------
@@ -83,7 +91,7 @@ You have access to the following tools to help manage communications and schedul
 
 1. write_email(to, subject, content) - Send emails to specified recipients
 2. schedule_meeting(attendees, subject, duration_minutes, preferred_day, start_time) - Schedule calendar meetings
-3. check_calendar_availability(day) - Check available time slots for a given day
+3. check_calendar_availability(day, attendees) - Check available time slots for a given day (attendees is optional)
 4. Done - E-mail has been sent
 
 Note: FOR EACH INPUT, ONLY EVER CALL ONE TOOL
@@ -294,6 +302,18 @@ def triage_router(state: State) -> Command[Literal["response_agent", "__end__"]]
     author, to, subject, email_thread = parse_email(state["email_input"])
     system_prompt = triage_instructions
 
+    # Compact the thread once so both the router and the response agent see the short version
+    compaction_stats = {}
+    if COMPACT_EMAIL_THREAD:
+        email_thread, compaction_stats = compact_email_thread(email_thread)
+        logger.info(
+            "Compacted email '%s': %d -> %d tokens (%d saved)",
+            subject,
+            compaction_stats["original_tokens"],
+            compaction_stats["compacted_tokens"],
+            compaction_stats["tokens_saved"],
+        )
+
     user_prompt = """
 Please determine how to handle the below email thread:
 
@@ -334,6 +354,9 @@ Subject: {subject}
         goto = END
     else:
         raise ValueError(f"Invalid classification: {result.classification}")
+
+    if compaction_stats:
+        update["thread_compaction"] = compaction_stats
     return Command(goto=goto, update=update)
 
 # Build workflow
@@ -0,0 +1,141 @@
+"""Utility functions for the Email agent."""
+
+import re
+
+from langchain_core.messages.utils import count_tokens_approximately
+
+##########################
+# Email Thread Compaction
+##########################
+
+# "On Mon, Jan 6, 2025 at 9:14 AM Alice <alice@company.com> wrote:"
+QUOTE_ATTRIBUTION_PATTERN = re.compile(r"^\s*On .+wrote:\s*$", re.IGNORECASE)
+
+# Outlook-style reply marker: everything below it is the previous thread.
+# Outlook's "____" separator is not one of these; it also introduces forwards
+REPLY_HISTORY_PATTERNS = [
+    re.compile(r"^\s*-{2,}\s*Original Message\s*-{2,}\s*$", re.IGNORECASE),
+]
+
+# A forwarded message is the content to act on, not history: it is kept, and
+# a signature above it only runs up to the forwarded header
+FORWARDED_HEADER_PATTERNS = [
+    re.compile(r"^\s*-{2,}\s*Forwarded message\s*-{2,}\s*$", re.IGNORECASE),
+    re.compile(r"^\s*Begin forwarded message:\s*$", re.IGNORECASE),
+    re.compile(r"^\s*_{10,}\s*$"),
+]
+
+# "-- " is the standard signature delimiter; mobile footers are signatures too
+SIGNATURE_PATTERNS = [
+    re.compile(r"^--\s*$"),
+    re.compile(r"^\s*Sent from my \w+", re.IGNORECASE),
+    re.compile(r"^\s*Get Outlook for \w+", re.IGNORECASE),
+]
+
+# Legal notices are matched on their full wording, not a keyword, and only
+# as a trailing block, so body text that mentions a "disclaimer" is kept
+LEGAL_NOTICE_HEADING = r"(?:(?:confidentiality notice|legal disclaimer|disclaimer|important notice)\s*:?\s*)?"
+LEGAL_NOTICE_WORDING = [
+    r"this (?:e-?mail|message|communication)(?: and any (?:attachments|files transmitted with it))? "
+    r"(?:is|are|may be|contains?) (?:intended|confidential|privileged)",
+    r"the information (?:contained )?in this (?:e-?mail|message|communication) is (?:confidential|privileged|intended)",
+    r"if you (?:are not the intended recipient|have received this (?:e-?mail|message|communication)? ?in error)",
+    r"any (?:unauthorized )?(?:review|use|disclosure|distribution|copying) .*(?:is )?(?:strictly )?prohibited",
+]
+LEGAL_NOTICE_START = re.compile(LEGAL_NOTICE_HEADING + "(?:" + "|".join(LEGAL_NOTICE_WORDING) + ")")
+LEGAL_NOTICE_PATTERNS = [re.compile(wording) for wording in LEGAL_NOTICE_WORDING]
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the token count of a string."""
+    return count_tokens_approximately([text]) if text else 0
+
+
+def _normalize_block(text: str) -> str:
+    """Normalize a paragraph so repeated copies compare equal."""
+    text = re.sub(r"^[\s>]+", "", text, flags=re.MULTILINE)
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def _strip_quoted_replies(lines: list[str]) -> list[str]:
+    """Drop '>' quoted lines, their attribution lines and trailing reply history."""
+    kept = []
+    for line in lines:
+        if any(pattern.match(line) for pattern in REPLY_HISTORY_PATTERNS):
+            break
+        if line.lstrip().startswith(">") or QUOTE_ATTRIBUTION_PATTERN.match(line):
+            continue
+        kept.append(line)
+    return kept
+
+
+def _strip_signature(lines: list[str]) -> list[str]:
+    """Drop signatures, each running from its delimiter to the next forwarded message."""
+    kept = []
+    in_signature = False
+    for line in lines:
+        if any(pattern.match(line) for pattern in FORWARDED_HEADER_PATTERNS):
+            in_signature = False
+        elif any(pattern.match(line) for pattern in SIGNATURE_PATTERNS):
+            in_signature = True
+        if not in_signature:
+            kept.append(line)
+    return kept
+
+
+def _strip_legal_notice(lines: list[str]) -> list[str]:
+    """Drop a trailing legal notice (confidentiality disclaimer) from the message.
+
+    The notice must start at the beginning of a line with legal wording, and
+    every paragraph from there to the end must be legal wording too; lines
+    above it, even in the same paragraph, are kept.
+    """
+    for start in range(len(lines)):
+        # The opening wording fits in a few lines; only then check the whole tail
+        if not LEGAL_NOTICE_START.match(_normalize_block("\n".join(lines[start:start + 3]))):
+            continue
+        tail = "\n".join(lines[start:])
+        paragraphs = [_normalize_block(p) for p in re.split(r"\n\s*\n", tail)]
+        if all(any(pattern.search(p) for pattern in LEGAL_NOTICE_PATTERNS) for p in paragraphs if p):
+            return lines[:start]
+    return lines
+
+
+def compact_email_thread(email_thread: str) -> tuple[str, dict]:
+    """Strip quoted replies, signatures and disclaimers from an email thread.
+
+    Paragraphs that appear more than once (e.g. the same quoted block pasted
+    into several forwards) are kept only the first time they are seen.
+
+    Args:
+        email_thread: Raw email body, possibly containing quoted history
+
+    Returns:
+        Tuple of the compacted thread and a stats dict with
+        original_tokens, compacted_tokens and tokens_saved
+    """
+    lines = email_thread.replace("\r\n", "\n").split("\n")
+    lines = _strip_legal_notice(_strip_signature(_strip_quoted_replies(lines)))
+
+    seen_blocks = set()
+    paragraphs = []
+    for paragraph in re.split(r"\n\s*\n", "\n".join(lines)):
+        normalized = _normalize_block(paragraph)
+        if not normalized or normalized in seen_blocks:
+            continue
+        seen_blocks.add(normalized)
+        paragraphs.append(paragraph.strip("\n"))
+
+    compacted = "\n\n".join(paragraphs).strip()
+    # Never hand the model an empty thread; fall back to the original text
+    if not compacted:
+        compacted = email_thread.strip()
+
+    original_tokens = estimate_tokens(email_thread)
+    compacted_tokens = estimate_tokens(compacted)
+    stats = {
+        "original_tokens": original_tokens,
+        "compacted_tokens": compacted_tokens,
+        "tokens_saved": max(original_tokens - compacted_tokens, 0),
+    }
+    return compacted, stats
@@ -1,5 +1,6 @@
 from agents.music_store.music_store_supervisor import supervisor
 from utils.models import model
+from utils.structured_output import with_json_repair
 from utils.utils import get_engine_for_chinook_db
 
 from langgraph.graph import StateGraph, START, END
@@ -31,7 +32,7 @@ class UserInput(BaseModel):
     identifier: str = Field(description = "Identifier, which can be a customer ID, email, or phone number.")
 
 
-structured_llm = model.with_structured_output(schema=UserInput)
+structured_llm = with_json_repair(model, UserInput)
 structured_system_prompt = """You are a customer service representative responsible for extracting customer identifier.\n 
 Only extract the customer's account information from the message history. 
 If they haven't provided the information yet, return an empty string for the file"""
@@ -159,6 +160,8 @@ class UserProfile(BaseModel):
         description="The music preferences of the customer"
     )
 
+memory_llm = with_json_repair(model, UserProfile)
+
 create_memory_prompt = """You are an expert analyst that is observing a conversation that has taken place between a customer and a customer support assistant. The customer support assistant works for a digital music store, and has utilized a multi-agent team to answer the customer's request. 
 You are tasked with analyzing the conversation that has taken place between the customer and the customer support assistant, and updating the memory profile associated with the customer. 
 You specifically care about saving any music interest the customer has shared about themselves, particularly their music preferences to their memory profile.
@@ -202,7 +205,7 @@ def create_memory(state: State, store: BaseStore):
     formatted_system_message = SystemMessage(content=create_memory_prompt.format(conversation=state["messages"], memory_profile=formatted_memory))
     # Anthropic requires at least one user message along with the system message
     user_prompt = HumanMessage(content="Please analyze the conversation and update the customer's memory profile according to the instructions.")
-    updated_memory = model.with_structured_output(UserProfile).invoke([formatted_system_message, user_prompt])
+    updated_memory = memory_llm.invoke([formatted_system_message, user_prompt])
     key = "user_memory"
     # Convert Pydantic model to dict to avoid pickle serialization issues on restart
     store.put(namespace, key, {"memory": updated_memory.model_dump()})
@@ -1,5 +1,6 @@
 from agents.music_store.music_store_supervisor import supervisor
 from utils.models import model
+from utils.structured_output import with_json_repair
 from utils.utils import get_engine_for_chinook_db
 
 from langgraph.graph import StateGraph, START, END
@@ -29,7 +30,7 @@ class UserInput(BaseModel):
     identifier: str = Field(description = "Identifier, which can be a customer ID, email, or phone number.")
 
 
-structured_llm = model.with_structured_output(schema=UserInput)
+structured_llm = with_json_repair(model, UserInput)
 structured_system_prompt = """You are a customer service representative responsible for extracting customer identifier.\n 
 Only extract the customer's account information from the message history. 
 If they haven't provided the information yet, return an empty string for the file"""
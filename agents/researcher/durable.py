@@ -0,0 +1,97 @@
+"""Durable research units (DURABLE_RESEARCH_UNITS in graph.py).
+
+Every research unit checkpoints under its own thread, keyed by its
+ConductResearch tool_call_id, in the local SQLite checkpointer (see
+utils/checkpointing.py). If the run died and the supervisor step is
+re-executed, units that completed return their checkpointed output without
+running again, and interrupted units resume from their last completed step.
+"""
+
+import logging
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import StateGraph
+
+from agents.researcher.events import emit_stream_event
+from utils.blob_store import thread_id_from_config
+from utils.checkpointing import get_sqlite_checkpointer
+
+logger = logging.getLogger(__name__)
+
+# Researcher subgraphs compiled with their own checkpointer, keyed by builder
+# and checkpointer (checkpointers are per event loop)
+_durable_researchers = {}
+
+
+async def get_durable_researcher(builder: StateGraph):
+    """Get the researcher subgraph compiled with the local SQLite checkpointer."""
+    checkpointer = await get_sqlite_checkpointer()
+    key = (id(builder), id(checkpointer))
+    compiled = _durable_researchers.get(key)
+    if compiled is None or compiled.checkpointer is not checkpointer:
+        compiled = _durable_researchers[key] = builder.compile(checkpointer=checkpointer)
+    return compiled
+
+
+# Configurable keys that point at the parent run's checkpoint, not settings
+PARENT_CHECKPOINT_KEYS = {"checkpoint_id", "checkpoint_ns", "checkpoint_map"}
+
+
+def research_unit_config(config: RunnableConfig, unit_id: str) -> RunnableConfig:
+    """Config giving one research unit its own checkpoint thread under the parent thread.
+
+    The parent's own configurable keys (run id, model overrides, user ids)
+    are kept, and its thread id moves to parent_thread_id, so blobs and
+    search cache entries of the unit stay with the parent run. Keys that
+    locate the parent's checkpoint (checkpoint_id, checkpoint_ns, and
+    LangGraph's "__"-prefixed runtime keys) are dropped: the unit runs its
+    own graph on its own thread.
+    """
+    parent_thread_id = thread_id_from_config(config)
+    configurable = {
+        key: value for key, value in config.get("configurable", {}).items()
+        if not key.startswith("__") and key not in PARENT_CHECKPOINT_KEYS
+    }
+    return {
+        **config,
+        "configurable": {
+            **configurable,
+            "thread_id": f"{parent_thread_id}:research:{unit_id}",
+            "parent_thread_id": parent_thread_id,
+        },
+    }
+
+
+async def invoke_durable_researcher(builder: StateGraph, inputs: dict, config: RunnableConfig, unit_id: str):
+    """Run, resume or restore one research unit from its checkpoint thread."""
+    researcher_graph = await get_durable_researcher(builder)
+    unit_config = research_unit_config(config, unit_id)
+    snapshot = await researcher_graph.aget_state(unit_config)
+    if snapshot.values and not snapshot.next:
+        logger.info("Research unit %s already completed; using its checkpointed output", unit_id)
+        emit_stream_event({"type": "research_unit_restored", "tool_call_id": unit_id})
+        return {
+            "compressed_research": snapshot.values.get("compressed_research", ""),
+            "raw_notes": list(snapshot.values.get("raw_notes", [])),
+        }
+    if snapshot.next:
+        logger.info("Resuming research unit %s at %s", unit_id, ", ".join(snapshot.next))
+        emit_stream_event({"type": "research_unit_resumed", "tool_call_id": unit_id, "next": list(snapshot.next)})
+        return await researcher_graph.ainvoke(None, unit_config)
+    return await researcher_graph.ainvoke(inputs, unit_config)
+
+
+async def delete_research_unit_checkpoints(config: RunnableConfig, unit_ids):
+    """Delete the checkpoint threads of research units whose fan-out is over.
+
+    Their output is in the supervisor's state by then. Failures are logged,
+    not raised: leftover checkpoints only cost disk space.
+    """
+    if not unit_ids:
+        return
+    try:
+        checkpointer = await get_sqlite_checkpointer()
+        for unit_id in unit_ids:
+            await checkpointer.adelete_thread(research_unit_config(config, unit_id)["configurable"]["thread_id"])
+    except Exception as e:
+        logger.warning("Could not delete research unit checkpoints: %s", e)
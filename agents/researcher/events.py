@@ -0,0 +1,69 @@
+"""Custom stream events and timeout accounting for the Deep Research agent."""
+
+import contextvars
+import logging
+from typing import Optional
+
+from langgraph.config import get_stream_writer
+
+logger = logging.getLogger(__name__)
+
+
+class ResearchUnitEvents:
+    """Stream events of one research unit task.
+
+    While the node that started the unit awaits it, events go straight to
+    the node's stream writer. Once the unit is left running in the
+    background (see RESEARCH_QUORUM in graph.py) it is detached: the node
+    has returned, so its events are buffered and emitted by the node that
+    collects the unit (see fanout.collect_late_research) instead.
+    """
+
+    def __init__(self):
+        self.detached = False
+        self.buffered: list[dict] = []
+
+    async def run(self, unit):
+        """Run a research unit coroutine with its events routed through this object."""
+        _unit_events.set(self)
+        return await unit
+
+    def flush(self):
+        """Emit the buffered events from the calling node."""
+        events, self.buffered = self.buffered, []
+        for event in events:
+            emit_stream_event(event)
+
+
+_unit_events: contextvars.ContextVar[Optional[ResearchUnitEvents]] = contextvars.ContextVar(
+    "research_unit_events", default=None
+)
+
+
+def emit_stream_event(event: dict):
+    """Write a custom stream event (stream_mode="custom") if a graph run is streaming.
+
+    Events of a detached research unit are buffered instead (see ResearchUnitEvents).
+    """
+    unit_events = _unit_events.get()
+    if unit_events is not None and unit_events.detached:
+        unit_events.buffered.append(event)
+        return
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        # Called outside a graph run, e.g. from a benchmark
+        return
+    writer(event)
+
+
+# Deadlines hit since the process started: tool calls, research units, and
+# research units cancelled because the research budget ran out
+timeout_stats = {"tool_calls": 0, "research_units": 0, "research_budget": 0}
+
+
+def record_timeout(kind: str, **details):
+    """Count a timeout, log it and stream it as a "timeout" custom event."""
+    timeout_stats[kind] += 1
+    logger.warning("Timeout (%s): %s", kind, details)
+    emit_stream_event({"type": "timeout", "kind": kind, **details})
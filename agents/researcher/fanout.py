@@ -0,0 +1,253 @@
+"""Machinery of the supervisor's research fan-out.
+
+Per-run concurrency limiters, deadlines and retries of research units, and
+units left running in the background when the supervisor resumes at quorum
+(RESEARCH_QUORUM in graph.py).
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Optional
+
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
+
+from agents.researcher.events import ResearchUnitEvents, emit_stream_event, record_timeout
+from agents.researcher.utils import LATE_RESEARCH_NAME
+from utils.blob_store import thread_id_from_config
+
+logger = logging.getLogger(__name__)
+
+
+def seconds_left(deadline):
+    """Seconds until a wall-clock deadline (never negative), or None without one."""
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.time())
+
+
+def research_run_config(config: RunnableConfig, state: dict) -> RunnableConfig:
+    """Config carrying the research run's id as run_id, for the units it starts."""
+    research_run_id = state.get("research_run_id")
+    if not research_run_id:
+        return config
+    return {**config, "configurable": {**config.get("configurable", {}), "run_id": research_run_id}}
+
+
+# Concurrency limiters keyed by (event loop, thread id, run id). One limiter
+# serves every supervisor step of a run, so stragglers from an earlier step
+# count against MAX_CONCURRENT_RESEARCH_UNITS; concurrent runs, even without
+# a thread id, never share one.
+_research_slots: dict[tuple, asyncio.Semaphore] = {}
+
+
+def research_slots_key(config: RunnableConfig) -> tuple:
+    """Limiter key of the run a config belongs to (see research_run_config)."""
+    run_id = config.get("configurable", {}).get("run_id")
+    return asyncio.get_running_loop(), thread_id_from_config(config), run_id
+
+
+def get_research_slots(config: RunnableConfig, max_concurrent: int) -> asyncio.Semaphore:
+    """Get the run's research unit limiter."""
+    key = research_slots_key(config)
+    if key not in _research_slots:
+        _research_slots[key] = asyncio.Semaphore(max_concurrent)
+    return _research_slots[key]
+
+
+def release_research_slots(config: RunnableConfig):
+    """Drop the run's limiter once its research phase is over."""
+    _research_slots.pop(research_slots_key(config), None)
+
+
+async def run_in_slot(
+    start_unit: Callable[[], Awaitable[dict]],
+    semaphore: asyncio.Semaphore,
+    research_topic: str,
+    deadline=None,
+    timeout=None,
+    retries: int = 0,
+    retry_backoff: float = 2,
+):
+    """Run a research unit once a concurrency slot is free, with a deadline and retries.
+
+    The unit is cancelled after timeout seconds, or when the research
+    budget's deadline passes, whichever comes first; the returned output
+    then says so and is marked "timed_out". A unit that fails is started
+    again up to retries times, with exponential backoff while the budget
+    allows; after that the error is raised to the caller.
+
+    Returns:
+        Tuple of (unit output, seconds spent waiting for a slot, seconds
+        the successful attempt ran)
+    """
+    queue_wait = 0.0
+    for attempt in range(retries + 1):
+        queued_at = time.monotonic()
+        async with semaphore:
+            queue_wait += time.monotonic() - queued_at
+            if queue_wait > 0.01:
+                logger.info("Research unit waited %.2fs for a slot", queue_wait)
+            unit_timeout = timeout
+            remaining = seconds_left(deadline)
+            if remaining is not None:
+                unit_timeout = remaining if unit_timeout is None else min(unit_timeout, remaining)
+            started = time.monotonic()
+            try:
+                observation = await asyncio.wait_for(start_unit(), unit_timeout)
+                return observation, queue_wait, time.monotonic() - started
+            except asyncio.TimeoutError:
+                record_timeout("research_units", research_topic=research_topic, timeout_seconds=unit_timeout)
+                return {
+                    "compressed_research": f"Research on this topic timed out after {unit_timeout:.1f}s and was "
+                                           "cancelled; no findings were returned.",
+                    "raw_notes": [],
+                    "timed_out": True,
+                }, queue_wait, time.monotonic() - started
+            except Exception as e:
+                error = e
+
+        # Back off outside the semaphore, so the slot goes to queued units meanwhile
+        backoff = retry_backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+        remaining = seconds_left(deadline)
+        if attempt == retries or (remaining is not None and remaining <= backoff):
+            raise error
+        logger.warning("Research unit failed (%s); retrying in %.1fs", error, backoff)
+        await asyncio.sleep(backoff)
+
+
+async def wait_for_research_units(tasks: dict, quorum: int, deadline, merged_ids: dict):
+    """Wait for research unit tasks in completion order until quorum of them are back.
+
+    Each finding, or failure, is streamed as soon as its unit returns. A
+    failed unit does not affect its siblings' results.
+
+    Args:
+        tasks: ConductResearch tool call of each research unit task
+        quorum: Number of units to wait for
+        deadline: Research budget deadline; waiting stops when it passes
+        merged_ids: tool_call_ids merged into each unit's call (see merge_research_calls)
+
+    Returns:
+        Tuple of ((output, queue wait) by tool_call_id, errors by
+        tool_call_id, tasks still pending, whether the budget ran out)
+    """
+    results, failures = {}, {}
+    pending = set(tasks)
+    while pending and len(results) + len(failures) < quorum:
+        done, pending = await asyncio.wait(
+            pending, timeout=seconds_left(deadline), return_when=asyncio.FIRST_COMPLETED
+        )
+        if not done:
+            # Research budget exhausted; continue with the results that arrived
+            return results, failures, pending, True
+        for task in done:
+            tool_call = tasks[task]
+            if task.exception() is not None:
+                failures[tool_call["id"]] = task.exception()
+                logger.warning("Research unit %s failed: %s", tool_call["id"], task.exception())
+                emit_stream_event({
+                    "type": "research_unit_failed",
+                    "tool_call_id": tool_call["id"],
+                    "research_topic": tool_call["args"]["research_topic"],
+                    "error": str(task.exception()),
+                })
+                continue
+            observation, queue_wait = task.result()
+            results[tool_call["id"]] = (observation, queue_wait)
+            emit_stream_event({
+                "type": "research_unit_complete",
+                "tool_call_id": tool_call["id"],
+                "research_topic": tool_call["args"]["research_topic"],
+                "merged_tool_call_ids": merged_ids[tool_call["id"]],
+                "compressed_research": observation.get("compressed_research", ""),
+            })
+    return results, failures, pending, False
+
+
+# Research units still running when the supervisor resumed at quorum, with
+# their buffered events, keyed by run (research_slots_key) and tool_call_id.
+# Only the ids are kept in graph state (pending_research), so they do not
+# survive a restart; collect_late_research reports them abandoned. A run's
+# leftovers are cancelled when its research phase ends, when the final
+# report starts, and when the next run on the thread starts.
+_background_research: dict[tuple, dict[str, tuple[asyncio.Task, ResearchUnitEvents]]] = {}
+
+
+def detach_research_unit(config: RunnableConfig, tool_call_id: str, task: asyncio.Task, events: ResearchUnitEvents):
+    """Leave a research unit running in the background after its node returns."""
+    events.detached = True
+    _background_research.setdefault(research_slots_key(config), {})[tool_call_id] = (task, events)
+
+
+async def collect_late_research(config: RunnableConfig, pending_ids: list[str], wait: bool):
+    """Collect the run's stragglers from an earlier quorum return.
+
+    Events the stragglers buffered while detached are emitted now, from the
+    calling node.
+
+    Args:
+        config: Config of the run (see research_run_config)
+        pending_ids: tool_call_ids of research units still running
+        wait: Await every straggler (used when the research phase is ending)
+
+    Returns:
+        Tuple of (late finding messages and notices of abandoned units, raw
+        notes, ids still pending)
+    """
+    background = _background_research.get(research_slots_key(config), {})
+    late_messages, raw_notes, still_pending = [], [], []
+    for tool_call_id in pending_ids:
+        task, events = background.get(tool_call_id, (None, None))
+        if task is None:
+            # Lost, e.g. the process restarted since the unit was launched.
+            # Tell the supervisor instead of silently dropping the findings.
+            logger.warning("Research unit %s was abandoned before it finished", tool_call_id)
+            emit_stream_event({"type": "research_unit_abandoned", "tool_call_id": tool_call_id})
+            late_messages.append(HumanMessage(
+                content=f"Research for ConductResearch call {tool_call_id} was abandoned: the run was "
+                        "interrupted before it finished, so its findings are lost. Delegate the topic "
+                        "again if it is still needed."
+            ))
+            continue
+        if not task.done() and not wait:
+            events.flush()
+            still_pending.append(tool_call_id)
+            continue
+        background.pop(tool_call_id)
+        try:
+            observation, _ = await task
+        except Exception as e:
+            logger.warning("Late research unit %s failed: %s", tool_call_id, e)
+            continue
+        finally:
+            events.flush()
+        late_messages.append(HumanMessage(
+            content=f"Late research findings for ConductResearch call {tool_call_id}:\n\n"
+                    f"{observation.get('compressed_research', '')}",
+            name=LATE_RESEARCH_NAME
+        ))
+        raw_notes.extend(observation.get("raw_notes", []))
+    return late_messages, raw_notes, still_pending
+
+
+def cancel_background_research(config: RunnableConfig, pending_ids: Optional[list[str]] = None):
+    """Cancel the run's stragglers from an earlier quorum return (all of them without pending_ids)."""
+    key = research_slots_key(config)
+    background = _background_research.get(key, {})
+    for tool_call_id in list(background) if pending_ids is None else pending_ids:
+        task, _ = background.pop(tool_call_id, (None, None))
+        if task is not None:
+            task.cancel()
+    if not background:
+        _background_research.pop(key, None)
+
+
+def cancel_other_runs_research(config: RunnableConfig):
+    """Cancel stragglers that earlier runs on the config's thread left behind."""
+    loop, thread_id, run_id = research_slots_key(config)
+    for key in [key for key in _background_research if key[:2] == (loop, thread_id) and key[2] != run_id]:
+        for task, _ in _background_research.pop(key).values():
+            task.cancel()
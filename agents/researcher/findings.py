@@ -0,0 +1,107 @@
+"""Research findings kept outside graph state.
+
+Blob-offloaded notes (OFFLOAD_RESEARCH_BLOBS in graph.py) and the cross-run
+research cache (RESEARCH_CACHE in graph.py).
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from langchain_core.runnables import RunnableConfig
+
+from utils.blob_store import BlobNotFoundError, offload_blob, resolve_blob
+from utils.research_cache import get_research_cache
+
+logger = logging.getLogger(__name__)
+
+##########################
+# Blob-Offloaded Notes
+##########################
+
+MISSING_NOTE_PLACEHOLDER = "[Research note unavailable: it was removed from the blob store]"
+
+
+def offload_notes(notes: list[str], config: RunnableConfig, offload: bool) -> list[str]:
+    """Swap large notes for blob references so checkpoints stay small."""
+    if not offload:
+        return notes
+    return [offload_blob(note, config) for note in notes]
+
+
+def resolve_notes(notes: list[str]) -> list[str]:
+    """Read notes that were offloaded to the blob store.
+
+    A note whose blob was deleted or swept becomes a placeholder instead of
+    failing the caller.
+    """
+    resolved = []
+    for note in notes:
+        try:
+            resolved.append(resolve_blob(note))
+        except BlobNotFoundError:
+            logger.warning("Research note %s is no longer in the blob store", note)
+            resolved.append(MISSING_NOTE_PLACEHOLDER)
+    return resolved
+
+
+def aggregate_raw_notes(raw_notes: list[str], offloaded: bool) -> list[str]:
+    """Combine one iteration's raw notes into state entries.
+
+    Inline notes are joined into a single entry as before. Offloaded notes
+    keep their per-unit references as separate entries instead of reading
+    every blob back just to join them.
+    """
+    if offloaded:
+        return [note for note in raw_notes if note]
+    return ["\n".join(raw_notes)]
+
+
+##########################
+# Research Cache
+##########################
+
+def research_cache_scope(config: RunnableConfig) -> str:
+    """Research cache partition of a run: its user and assistant ids, if any."""
+    configurable = config.get("configurable", {})
+    user_id = configurable.get("user_id") or configurable.get("langgraph_auth_user_id") or ""
+    return f"{user_id}|{configurable.get('assistant_id') or ''}"
+
+
+async def lookup_cached_research(
+    research_topic: str,
+    config: RunnableConfig,
+    max_age: Optional[float],
+    similarity: Optional[float],
+    offload: bool,
+) -> Optional[dict]:
+    """Researcher output cached for the topic by the same user and assistant, if fresh."""
+    hit = await asyncio.to_thread(
+        get_research_cache().lookup, research_topic, max_age, similarity, research_cache_scope(config)
+    )
+    if hit is None:
+        return None
+    logger.info(
+        "Research cache hit (similarity %.2f, %.0fs old); saved %.1fs of research",
+        hit["similarity"], hit["age_seconds"], hit["compute_seconds"]
+    )
+    return {
+        "compressed_research": hit["compressed_research"],
+        "raw_notes": offload_notes(hit["raw_notes"], config, offload),
+        "research_cache": {"similarity": hit["similarity"], "age_seconds": hit["age_seconds"]},
+    }
+
+
+async def store_cached_research(research_topic: str, observation: dict, compute_seconds: float, config: RunnableConfig):
+    """Cache a researcher's output for later runs of the same user and assistant."""
+    if not observation.get("compressed_research"):
+        return
+    # Store the text itself: blob references are scoped to this thread
+    raw_notes = resolve_notes(observation.get("raw_notes", []))
+    if MISSING_NOTE_PLACEHOLDER in raw_notes:
+        # Never cache a placeholder for other runs
+        return
+    await asyncio.to_thread(
+        get_research_cache().store, research_topic, observation["compressed_research"], raw_notes,
+        compute_seconds, research_cache_scope(config)
+    )
@@ -5,7 +5,11 @@ for easier understanding and use in educational settings.
 """
 
 import asyncio
+import logging
+import math
 import os
+import time
+import uuid
 from typing import Literal
 
 from langchain.chat_models import init_chat_model
@@ -17,7 +21,9 @@ from langchain_core.messages import (
     filter_messages,
     get_buffer_string,
 )
+from langchain_core.messages.utils import count_tokens_approximately
 from langchain_core.runnables import RunnableConfig
+from langgraph.constants import CONFIG_KEY_CHECKPOINTER
 from langgraph.graph import END, START, StateGraph
 from langgraph.types import Command, interrupt
 
@@ -42,17 +48,54 @@ from agents.researcher.models import (
     SupervisorState,
 )
 from agents.researcher.utils import (
+    TOOL_ERROR_PREFIX,
+    compact_supervisor_messages,
+    execute_tool_safely,
+    fold_researcher_messages,
     get_all_tools,
     get_notes_from_tool_calls,
     get_today_str,
+    merge_research_calls,
     openai_websearch_called,
     think_tool,
 )
+from agents.researcher.durable import delete_research_unit_checkpoints, invoke_durable_researcher
+from agents.researcher.events import ResearchUnitEvents, emit_stream_event, record_timeout
+from agents.researcher.fanout import (
+    cancel_background_research,
+    cancel_other_runs_research,
+    collect_late_research,
+    detach_research_unit,
+    get_research_slots,
+    release_research_slots,
+    research_run_config,
+    run_in_slot,
+    seconds_left,
+    wait_for_research_units,
+)
+from agents.researcher.findings import (
+    aggregate_raw_notes,
+    lookup_cached_research,
+    offload_notes,
+    resolve_notes,
+    store_cached_research,
+)
+from agents.researcher.novelty import record_researcher_stop, step_novelty
+from agents.researcher.report import condense_findings, is_token_limit_exceeded, stream_final_report
+from agents.researcher.speculation import SpeculativeBrief
+from agents.researcher.worker import enqueue_research_unit
+
+from utils.blob_store import sweep_expired_blobs
+from utils.rate_limiter import rate_limited
+from utils.search_cache import reset_search_cache
+from utils.structured_output import with_json_repair
 
 from dotenv import load_dotenv
 
 load_dotenv("../../.env")
 
+logger = logging.getLogger(__name__)
+
 # ===== HARDCODED CONFIGURATION =====
 # These values are hardcoded for simplicity in this educational example
 RESEARCH_MODEL = "openai:gpt-4.1-mini"
@@ -61,42 +104,135 @@ MAX_REACT_TOOL_CALLS = 10  # Max tool calls per researcher
 MAX_CONCURRENT_RESEARCH_UNITS = 5  # Max parallel research units
 MAX_STRUCTURED_OUTPUT_RETRIES = 3  # Retry attempts for structured outputs
 MAX_OUTPUT_TOKENS = 10000  # Max tokens for model outputs
+SEARCH_API = "openai"  # "openai" (native web search) or "tavily" (shared per-run search cache, URL dedupe)
+FINAL_REPORT_FINDINGS_TOKEN_BUDGET = 60000  # Findings larger than this are condensed map-reduce style
+
+# ===== OPTIONAL BEHAVIOUR =====
+# Off by default: with these values the agent runs like the plain version.
+# See "Research Agent Options" in the README before turning one on.
+# Deadlines and retries
+TOOL_CALL_TIMEOUT_SECONDS = None  # e.g. 60: deadline for each researcher tool call
+RESEARCH_UNIT_TIMEOUT_SECONDS = None  # e.g. 600: deadline for each research unit once it has a slot
+RESEARCH_BUDGET_SECONDS = None  # e.g. 1800: wall-clock budget for the whole research phase
+RESEARCH_UNIT_RETRIES = 0  # e.g. 1: retries for a research unit that fails
+RESEARCH_UNIT_RETRY_BACKOFF_SECONDS = 2  # Base delay before a retry; doubles on each attempt
+# Research fan-out
+RESEARCH_QUORUM = None  # e.g. 0.6: resume the supervisor once 60% of research units return
+TOPIC_MERGE_SIMILARITY = None  # e.g. 0.8: research same-entity ConductResearch topics of one step once
+RESEARCH_EXECUTOR = "local"  # "local" (this event loop) or "queue" (worker processes, see worker.py)
+DURABLE_RESEARCH_UNITS = False  # Checkpoint each research unit (SQLite) so a resumed run only re-runs unfinished units
+# Context and state size
+SUPERVISOR_CONTEXT_COMPACTION = False  # Replace earlier findings/reflections with digests for the supervisor
+INCREMENTAL_COMPRESSION = False  # Fold older researcher messages into a running summary
+RESEARCHER_CONTEXT_TOKEN_THRESHOLD = 20000  # Researcher prompt size that triggers a fold
+OFFLOAD_RESEARCH_BLOBS = False  # Keep large notes/raw_notes in the blob store; state holds references
+# Reuse and early stopping
+RESEARCH_CACHE = False  # Reuse researcher outputs across runs for the same (normalized) topic and user/assistant
+RESEARCH_CACHE_MAX_AGE = None  # e.g. 3600: only reuse results younger than an hour (defaults to the cache TTL)
+RESEARCH_CACHE_SIMILARITY = None  # e.g. 0.8: also reuse results for near-identical topics
+NOVELTY_THRESHOLD = None  # e.g. 0.2: a search step adding less than 20% new content counts as low novelty
+NOVELTY_PATIENCE = 2  # Consecutive low-novelty steps before a researcher stops early
+SPECULATIVE_RESEARCH_BRIEF = False  # Write the research brief while clarify_with_user runs; used if no clarification is needed
+
+
+# Process-wide model client and prebuilt bound runnables, shared by every node
+# and every concurrent research unit so HTTP connection pools are reused
+_model = None
+_bound_models = {}
 
 
 def get_model():
-    """Get or create the model instance."""
-    return init_chat_model(
-        model=RESEARCH_MODEL,
-        max_tokens=MAX_OUTPUT_TOKENS,
-        api_key=os.getenv("OPENAI_API_KEY"),
-        use_responses_api=True
+    """Get or create the shared model instance."""
+    global _model
+    if _model is None:
+        _model = init_chat_model(
+            model=RESEARCH_MODEL,
+            max_tokens=MAX_OUTPUT_TOKENS,
+            api_key=os.getenv("OPENAI_API_KEY"),
+            use_responses_api=True,
+            **rate_limited("openai", max_output_tokens=MAX_OUTPUT_TOKENS)
+        )
+    return _model
+
+
+def _tool_key(tool):
+    """Hashable identity for a tool, pydantic schema, or provider tool dict."""
+    if isinstance(tool, dict):
+        return tuple(sorted(tool.items()))
+    return getattr(tool, "name", None) or getattr(tool, "__name__", repr(tool))
+
+
+def get_bound_model(tools=None, schema=None):
+    """Get a cached model runnable with tools or structured output and retry bound.
+
+    Runnables are keyed by (model, tools, schema), so each combination is only
+    built once per process.
+    """
+    key = (RESEARCH_MODEL, tuple(_tool_key(tool) for tool in tools or []), schema)
+    if key not in _bound_models:
+        model = get_model()
+        if tools:
+            model = model.bind_tools(tools)
+        if schema is not None:
+            # Bad outputs are repaired locally before the model is called again
+            _bound_models[key] = with_json_repair(model, schema, max_attempts=MAX_STRUCTURED_OUTPUT_RETRIES)
+        else:
+            _bound_models[key] = model.with_retry(stop_after_attempt=MAX_STRUCTURED_OUTPUT_RETRIES)
+    return _bound_models[key]
+
+
+async def generate_research_brief(messages: list) -> str:
+    """Turn the conversation into a research brief."""
+    research_model = get_bound_model(schema=ResearchQuestion)
+    prompt_content = transform_messages_into_research_topic_prompt.format(
+        messages=get_buffer_string(messages),
+        date=get_today_str()
     )
+    response = await research_model.ainvoke([HumanMessage(content=prompt_content)])
+    return response.research_brief
 
 
 async def clarify_with_user(state: AgentState, config: RunnableConfig):
-    """Ask clarifying questions if needed using human-in-the-loop."""
+    """Ask clarifying questions if needed using human-in-the-loop.
+
+    With SPECULATIVE_RESEARCH_BRIEF, the research brief is generated at the
+    same time. It is handed to write_research_brief if no clarification is
+    needed, and cancelled otherwise.
+    """
 
     messages = state["messages"]
 
+    speculative_brief = None
+    if SPECULATIVE_RESEARCH_BRIEF:
+        speculative_brief = SpeculativeBrief(generate_research_brief(messages))
+
     # Configure model for structured clarification analysis
-    clarification_model = (
-        get_model()
-        .with_structured_output(ClarifyWithUser)
-        .with_retry(stop_after_attempt=MAX_STRUCTURED_OUTPUT_RETRIES)
-    )
+    clarification_model = get_bound_model(schema=ClarifyWithUser)
 
     # Analyze whether clarification is needed
     prompt_content = clarify_with_user_instructions.format(
         messages=get_buffer_string(messages),
         date=get_today_str()
     )
-    response = await clarification_model.ainvoke([HumanMessage(content=prompt_content)])
+    try:
+        response = await clarification_model.ainvoke([HumanMessage(content=prompt_content)])
+    except BaseException:
+        if speculative_brief is not None:
+            speculative_brief.cancel()
+        raise
+
     # If clarification needed, use interrupt to pause for user input
     if response.need_clarification:
+        if speculative_brief is not None:
+            speculative_brief.discard("clarification needed")
         return {"messages": [AIMessage(content=response.question)], "need_elaboration": True}
-    else:
-        # No clarification needed
-        return {"messages": [AIMessage(content=response.verification)], "need_elaboration": False}
+
+    # No clarification needed
+    update = {"messages": [AIMessage(content=response.verification)], "need_elaboration": False}
+    if speculative_brief is not None:
+        # None if it failed; write_research_brief then generates the brief as usual
+        update["speculative_research_brief"] = await speculative_brief.result()
+    return update
 
 
 async def human_input(state: AgentState, config):
@@ -117,19 +253,17 @@ def human_feedback_needed(state: AgentState):
 async def write_research_brief(state: AgentState, config: RunnableConfig) -> Command[Literal["research_supervisor"]]:
     """Transform user messages into a structured research brief and initialize supervisor."""
 
-    # Configure model for structured research question generation
-    research_model = (
-        get_model()
-        .with_structured_output(ResearchQuestion)
-        .with_retry(stop_after_attempt=MAX_STRUCTURED_OUTPUT_RETRIES)
-    )
+    # A new research run starts with an empty search cache
+    reset_search_cache(config)
+    if OFFLOAD_RESEARCH_BLOBS:
+        # Drop idle blobs that no checkpoint of this graph's checkpointer references
+        await sweep_expired_blobs(config.get("configurable", {}).get(CONFIG_KEY_CHECKPOINTER))
 
-    # Generate structured research brief from user messages
-    prompt_content = transform_messages_into_research_topic_prompt.format(
-        messages=get_buffer_string(state.get("messages", [])),
-        date=get_today_str()
-    )
-    response = await research_model.ainvoke([HumanMessage(content=prompt_content)])
+    # Generate structured research brief from user messages, unless
+    # clarify_with_user already wrote one speculatively
+    research_brief = state.get("speculative_research_brief")
+    if not research_brief:
+        research_brief = await generate_research_brief(state.get("messages", []))
 
     # Initialize supervisor with research brief and instructions
     supervisor_system_prompt = lead_researcher_prompt.format(
@@ -138,15 +272,24 @@ async def write_research_brief(state: AgentState, config: RunnableConfig) -> Com
         max_researcher_iterations=MAX_RESEARCHER_ITERATIONS
     )
 
+    # Runs invoked without a run id still get one, so per-run caches
+    # (also in worker processes) never carry over between runs
+    research_run_id = str(config.get("configurable", {}).get("run_id") or uuid.uuid4().hex)
+    # Research units an earlier run on this thread left running are no longer wanted
+    cancel_other_runs_research(research_run_config(config, {"research_run_id": research_run_id}))
+
     return Command(
         goto="research_supervisor",
         update={
-            "research_brief": response.research_brief,
+            "research_brief": research_brief,
+            "speculative_research_brief": None,
+            "research_deadline": time.time() + RESEARCH_BUDGET_SECONDS if RESEARCH_BUDGET_SECONDS else None,
+            "research_run_id": research_run_id,
             "supervisor_messages": {
                 "type": "override",
                 "value": [
                     SystemMessage(content=supervisor_system_prompt),
-                    HumanMessage(content=response.research_brief)
+                    HumanMessage(content=research_brief)
                 ]
             }
         }
@@ -160,11 +303,7 @@ async def supervisor(state: SupervisorState, config: RunnableConfig) -> Command[
     lead_researcher_tools = [ConductResearch, ResearchComplete, think_tool]
 
     # Configure model with tools and retry logic
-    research_model = (
-        get_model()
-        .bind_tools(lead_researcher_tools)
-        .with_retry(stop_after_attempt=MAX_STRUCTURED_OUTPUT_RETRIES)
-    )
+    research_model = get_bound_model(tools=lead_researcher_tools)
 
     # Generate supervisor response based on current context
     supervisor_messages = state.get("supervisor_messages", [])
@@ -180,9 +319,105 @@ async def supervisor(state: SupervisorState, config: RunnableConfig) -> Command[
     )
 
 
+async def invoke_researcher(research_topic: str, config: RunnableConfig, unit_id=None):
+    """Run the researcher subgraph for one research unit.
+
+    With DURABLE_RESEARCH_UNITS, the unit checkpoints under its own thread
+    and a re-executed supervisor step restores or resumes it (see durable.py).
+    """
+    inputs = {
+        "researcher_messages": [HumanMessage(content=research_topic)],
+        "research_topic": research_topic
+    }
+    if unit_id is not None:
+        # Scopes search result dedupe to this researcher (see utils/search_cache.py)
+        config = {**config, "configurable": {**config.get("configurable", {}), "research_unit_id": unit_id}}
+    if not DURABLE_RESEARCH_UNITS or unit_id is None:
+        return await researcher_subgraph.ainvoke(inputs, config)
+    return await invoke_durable_researcher(researcher_builder, inputs, config, unit_id)
+
+
+async def run_research_unit(
+    research_topic: str,
+    config: RunnableConfig,
+    semaphore: asyncio.Semaphore,
+    deadline=None,
+    unit_id=None,
+):
+    """Run one researcher subgraph once a concurrency slot is free.
+
+    With RESEARCH_CACHE enabled, a fresh cached result for the topic,
+    stored by the same user and assistant, is returned instead, without
+    spawning a researcher or taking a slot.
+
+    Deadlines and retries (RESEARCH_UNIT_TIMEOUT_SECONDS, the research
+    budget's deadline, RESEARCH_UNIT_RETRIES) are applied by run_in_slot; a
+    unit that still fails raises to the caller.
+
+    unit_id (the ConductResearch tool_call_id) names the unit's checkpoint
+    thread when DURABLE_RESEARCH_UNITS is enabled.
+
+    Returns:
+        Tuple of (researcher output, seconds spent waiting for a slot)
+    """
+    if RESEARCH_CACHE:
+        cached = await lookup_cached_research(
+            research_topic, config, RESEARCH_CACHE_MAX_AGE, RESEARCH_CACHE_SIMILARITY, OFFLOAD_RESEARCH_BLOBS
+        )
+        if cached is not None:
+            return cached, 0.0
+
+    def start_unit():
+        if RESEARCH_EXECUTOR == "queue":
+            return enqueue_research_unit(research_topic, config, unit_id)
+        return invoke_researcher(research_topic, config, unit_id)
+
+    observation, queue_wait, compute_seconds = await run_in_slot(
+        start_unit,
+        semaphore,
+        research_topic,
+        deadline=deadline,
+        timeout=RESEARCH_UNIT_TIMEOUT_SECONDS,
+        retries=RESEARCH_UNIT_RETRIES,
+        retry_backoff=RESEARCH_UNIT_RETRY_BACKOFF_SECONDS,
+    )
+    if RESEARCH_CACHE and not observation.get("timed_out"):
+        await store_cached_research(research_topic, observation, compute_seconds, config)
+    return observation, queue_wait
+
+
+async def end_research_phase(
+    state: SupervisorState,
+    config: RunnableConfig,
+    finding_messages: list,
+    raw_notes: list[str],
+    unit_ids: list[str],
+) -> Command[Literal["__end__"]]:
+    """Leave the supervisor subgraph, recording findings that are not in notes yet.
+
+    Stops what the run left running in the background, and deletes the
+    checkpoint threads of the given research units.
+    """
+    cancel_background_research(config)
+    update = {
+        "notes": offload_notes(get_notes_from_tool_calls(finding_messages), config, OFFLOAD_RESEARCH_BLOBS),
+        "research_brief": state.get("research_brief", ""),
+        "pending_research": []
+    }
+    if any(raw_notes):
+        update["raw_notes"] = aggregate_raw_notes(raw_notes, OFFLOAD_RESEARCH_BLOBS)
+    if DURABLE_RESEARCH_UNITS:
+        await delete_research_unit_checkpoints(config, unit_ids)
+    release_research_slots(config)
+    return Command(goto=END, update=update)
+
+
 async def supervisor_tools(state: SupervisorState, config: RunnableConfig) -> Command[Literal["supervisor", "__end__"]]:
     """Execute tools called by the supervisor."""
 
+    # The run id keys the run's search cache and research unit limiter
+    config = research_run_config(config, state)
+
     # Extract current state and check exit conditions
     supervisor_messages = state.get("supervisor_messages", [])
     research_iterations = state.get("research_iterations", 0)
@@ -196,19 +431,27 @@ async def supervisor_tools(state: SupervisorState, config: RunnableConfig) -> Co
         for tool_call in most_recent_message.tool_calls
     )
 
+    # Stop delegating once the research budget is spent
+    deadline = state.get("research_deadline")
+    budget_exhausted = seconds_left(deadline) == 0
+
+    # Pick up research units that were still running at the last quorum return
+    exiting = exceeded_allowed_iterations or no_tool_calls or research_complete_tool_call or budget_exhausted
+    # (without budget left, stragglers are cancelled rather than awaited)
+    late_messages, late_raw_notes, pending_research = await collect_late_research(
+        config, state.get("pending_research", []), wait=exiting and not budget_exhausted
+    )
+
     # Exit if any termination condition is met
-    if exceeded_allowed_iterations or no_tool_calls or research_complete_tool_call:
-        return Command(
-            goto=END,
-            update={
-                "notes": get_notes_from_tool_calls(supervisor_messages),
-                "research_brief": state.get("research_brief", "")
-            }
-        )
+    # Notes are recorded as each iteration's results come in (see below), so
+    # only late findings still need to be added here
+    if exiting:
+        return await end_research_phase(state, config, late_messages, late_raw_notes, state.get("pending_research", []))
 
     # Process all tool calls together (both think_tool and ConductResearch)
     all_tool_messages = []
     update_payload = {"supervisor_messages": []}
+    raw_notes = list(late_raw_notes)
 
     # Handle think_tool calls (strategic reflection)
     think_tool_calls = [
@@ -231,63 +474,154 @@ async def supervisor_tools(state: SupervisorState, config: RunnableConfig) -> Co
     ]
 
     if conduct_research_calls:
+        tasks = {}
         try:
-            # Limit concurrent research units
-            allowed_conduct_research_calls = conduct_research_calls[:MAX_CONCURRENT_RESEARCH_UNITS]
-            overflow_conduct_research_calls = conduct_research_calls[MAX_CONCURRENT_RESEARCH_UNITS:]
-
-            # Execute research tasks in parallel
-            research_tasks = [
-                researcher_subgraph.ainvoke({
-                    "researcher_messages": [
-                        HumanMessage(content=tool_call["args"]["research_topic"])
-                    ],
-                    "research_topic": tool_call["args"]["research_topic"]
-                }, config)
-                for tool_call in allowed_conduct_research_calls
-            ]
-
-            tool_results = await asyncio.gather(*research_tasks)
-
-            # Create tool messages with research results
-            for observation, tool_call in zip(tool_results, allowed_conduct_research_calls):
+            # Near-duplicate topics are researched once, under the first call's id
+            if TOPIC_MERGE_SIMILARITY is not None:
+                research_groups = merge_research_calls(conduct_research_calls, TOPIC_MERGE_SIMILARITY)
+            else:
+                research_groups = [(tool_call, []) for tool_call in conduct_research_calls]
+            merged_ids = {primary["id"]: [call["id"] for call in calls] for primary, calls in research_groups}
+            merged_into = {merged_id: primary_id for primary_id, ids in merged_ids.items() for merged_id in ids}
+            if merged_into:
+                logger.info(
+                    "Merged %d overlapping ConductResearch calls into %d research units",
+                    len(conduct_research_calls), len(research_groups)
+                )
+
+            # Accept every call: at most MAX_CONCURRENT_RESEARCH_UNITS run at once
+            # (including stragglers from earlier steps), the rest queue and start
+            # as slots free up
+            semaphore = get_research_slots(config, MAX_CONCURRENT_RESEARCH_UNITS)
+            unit_events = {tool_call["id"]: ResearchUnitEvents() for tool_call, _ in research_groups}
+            tasks = {
+                asyncio.create_task(unit_events[tool_call["id"]].run(
+                    run_research_unit(
+                        tool_call["args"]["research_topic"], config, semaphore, deadline, tool_call["id"]
+                    )
+                )): tool_call
+                for tool_call, _ in research_groups
+            }
+
+            # Handle units in completion order and stream each finding right away.
+            # With RESEARCH_QUORUM set, stop waiting once enough units are back.
+            quorum = len(tasks)
+            if RESEARCH_QUORUM is not None:
+                quorum = max(1, math.ceil(RESEARCH_QUORUM * len(tasks)))
+            results, failures, pending, budget_exhausted = await wait_for_research_units(
+                tasks, quorum, deadline, merged_ids
+            )
+
+            # Create tool messages with research results, in tool call order
+            for tool_call in conduct_research_calls:
+                if tool_call["id"] in merged_into:
+                    # Answer every original call; the findings themselves appear once
+                    all_tool_messages.append(ToolMessage(
+                        content=f"This topic overlapped with ConductResearch call {merged_into[tool_call['id']]} "
+                                "and was researched together with it; see the findings for that call.",
+                        name=tool_call["name"],
+                        tool_call_id=tool_call["id"],
+                        response_metadata={"merged_into": merged_into[tool_call["id"]]}
+                    ))
+                    continue
+                if tool_call["id"] in failures:
+                    error = failures[tool_call["id"]]
+                    all_tool_messages.append(ToolMessage(
+                        content=f"Research on this topic failed: {type(error).__name__}: {error}",
+                        name=tool_call["name"],
+                        tool_call_id=tool_call["id"],
+                        status="error",
+                        response_metadata={"error": type(error).__name__}
+                    ))
+                    continue
+                if tool_call["id"] not in results:
+                    continue
+                observation, queue_wait = results[tool_call["id"]]
                 all_tool_messages.append(ToolMessage(
                     content=observation.get("compressed_research", "Error synthesizing research report"),
                     name=tool_call["name"],
-                    tool_call_id=tool_call["id"]
+                    tool_call_id=tool_call["id"],
+                    status="error" if observation.get("timed_out") else "success",
+                    response_metadata={
+                        "queue_wait_seconds": queue_wait,
+                        **({"research_cache": observation["research_cache"]} if "research_cache" in observation else {})
+                    }
                 ))
-
-            # Handle overflow research calls with error messages
-            for overflow_call in overflow_conduct_research_calls:
+                raw_notes.extend(observation.get("raw_notes", []))
+
+            # Out of budget: cancel unfinished units and earlier stragglers
+            budget_exhausted = budget_exhausted or seconds_left(deadline) == 0
+            if budget_exhausted:
+                for task in pending:
+                    task.cancel()
+                    tool_call = tasks[task]
+                    record_timeout("research_budget", tool_call_id=tool_call["id"])
+                    all_tool_messages.append(ToolMessage(
+                        content="Research on this topic was cancelled: the research time budget ran out.",
+                        name=tool_call["name"],
+                        tool_call_id=tool_call["id"],
+                        status="error",
+                        response_metadata={"cancelled": True}
+                    ))
+                pending = set()
+                cancel_background_research(config)
+                pending_research = []
+
+            # Stragglers keep running; their findings (and events) arrive in a later iteration
+            for task in pending:
+                tool_call = tasks[task]
+                detach_research_unit(config, tool_call["id"], task, unit_events[tool_call["id"]])
+                pending_research.append(tool_call["id"])
                 all_tool_messages.append(ToolMessage(
-                    content=f"Error: Exceeded max concurrent research units ({MAX_CONCURRENT_RESEARCH_UNITS})",
-                    name="ConductResearch",
-                    tool_call_id=overflow_call["id"]
+                    content="Research on this topic is still running. Its findings will be delivered in a later "
+                            "message, or a notice if the unit is abandoned because the run was interrupted.",
+                    name=tool_call["name"],
+                    tool_call_id=tool_call["id"],
+                    response_metadata={"pending": True}
                 ))
 
-            # Aggregate raw notes from all research results
-            raw_notes_concat = "\n".join([
-                "\n".join(observation.get("raw_notes", []))
-                for observation in tool_results
-            ])
-
-            if raw_notes_concat:
-                update_payload["raw_notes"] = [raw_notes_concat]
-
         except Exception as e:
-            # Handle errors by ending research phase
-            return Command(
-                goto=END,
-                update={
-                    "notes": get_notes_from_tool_calls(supervisor_messages),
-                    "research_brief": state.get("research_brief", "")
-                }
+            # Unexpected errors end the research phase, keeping the findings already collected
+            logger.exception("Research fan-out failed: %s", e)
+            for task in tasks:
+                task.cancel()
+            return await end_research_phase(
+                state, config, all_tool_messages + late_messages, raw_notes,
+                state.get("pending_research", []) + [tool_call["id"] for tool_call in tasks.values()]
             )
 
-    # Return command with all tool results
-    update_payload["supervisor_messages"] = all_tool_messages
+    # Aggregate raw notes from all research results
+    if any(raw_notes):
+        update_payload["raw_notes"] = aggregate_raw_notes(raw_notes, OFFLOAD_RESEARCH_BLOBS)
+
+    # Record full findings in notes now, so final_report_generation keeps the
+    # complete text even after the supervisor's copy is compacted
+    new_messages = all_tool_messages + late_messages
+    update_payload["notes"] = offload_notes(get_notes_from_tool_calls(new_messages), config, OFFLOAD_RESEARCH_BLOBS)
+    update_payload["pending_research"] = pending_research
+
+    # Units that were launched or pending and are not pending any more are done with
+    if DURABLE_RESEARCH_UNITS:
+        launched_ids = state.get("pending_research", []) + [tool_call["id"] for tool_call in conduct_research_calls]
+        await delete_research_unit_checkpoints(
+            config, [unit_id for unit_id in launched_ids if unit_id not in pending_research]
+        )
+
+    # Return command with all tool results; late findings follow the tool messages
+    if SUPERVISOR_CONTEXT_COMPACTION:
+        compacted = compact_supervisor_messages(supervisor_messages)
+        logger.info(
+            "Compacted supervisor context: %d -> %d tokens",
+            count_tokens_approximately(supervisor_messages),
+            count_tokens_approximately(compacted),
+        )
+        update_payload["supervisor_messages"] = {"type": "override", "value": compacted + new_messages}
+    else:
+        update_payload["supervisor_messages"] = new_messages
+    if budget_exhausted:
+        release_research_slots(config)
     return Command(
-        goto="supervisor",
+        goto=END if budget_exhausted else "supervisor",
         update=update_payload
     )
 
@@ -306,7 +640,7 @@ async def researcher(state: ResearcherState, config: RunnableConfig) -> Command[
     researcher_messages = state.get("researcher_messages", [])
 
     # Get all available research tools
-    tools = await get_all_tools()
+    tools = await get_all_tools(SEARCH_API)
     if len(tools) == 0:
         raise ValueError("No tools found for research. Please configure search API.")
 
@@ -317,11 +651,7 @@ async def researcher(state: ResearcherState, config: RunnableConfig) -> Command[
     )
 
     # Configure model with tools and retry logic
-    research_model = (
-        get_model()
-        .bind_tools(tools)
-        .with_retry(stop_after_attempt=MAX_STRUCTURED_OUTPUT_RETRIES)
-    )
+    research_model = get_bound_model(tools=tools)
 
     # Generate researcher response
     messages = [SystemMessage(content=researcher_prompt)] + researcher_messages
@@ -337,14 +667,6 @@ async def researcher(state: ResearcherState, config: RunnableConfig) -> Command[
     )
 
 
-async def execute_tool_safely(tool, args):
-    """Safely execute a tool with error handling."""
-    try:
-        return await tool.ainvoke(args)
-    except Exception as e:
-        return f"Error executing tool: {str(e)}"
-
-
 async def researcher_tools(state: ResearcherState, config: RunnableConfig) -> Command[Literal["researcher", "compress_research"]]:
     """Execute tools called by the researcher."""
 
@@ -358,10 +680,11 @@ async def researcher_tools(state: ResearcherState, config: RunnableConfig) -> Co
     )
 
     if not has_tool_calls and not has_native_search:
+        record_researcher_stop("no_tool_calls", state.get("tool_call_iterations", 0), MAX_REACT_TOOL_CALLS)
         return Command(goto="compress_research")
 
     # Execute all tool calls
-    tools = await get_all_tools()
+    tools = await get_all_tools(SEARCH_API)
     tools_by_name = {
         tool.name if hasattr(tool, "name") else tool.get("name", "web_search"): tool
         for tool in tools
@@ -369,7 +692,7 @@ async def researcher_tools(state: ResearcherState, config: RunnableConfig) -> Co
 
     tool_calls = most_recent_message.tool_calls
     tool_execution_tasks = [
-        execute_tool_safely(tools_by_name[tool_call["name"]], tool_call["args"])
+        execute_tool_safely(tools_by_name[tool_call["name"]], tool_call["args"], TOOL_CALL_TIMEOUT_SECONDS)
         for tool_call in tool_calls
     ]
     observations = await asyncio.gather(*tool_execution_tasks)
@@ -379,7 +702,8 @@ async def researcher_tools(state: ResearcherState, config: RunnableConfig) -> Co
         ToolMessage(
             content=observation,
             name=tool_call["name"],
-            tool_call_id=tool_call["id"]
+            tool_call_id=tool_call["id"],
+            status="error" if str(observation).startswith(TOOL_ERROR_PREFIX) else "success"
         )
         for observation, tool_call in zip(observations, tool_calls)
     ]
@@ -391,16 +715,48 @@ async def researcher_tools(state: ResearcherState, config: RunnableConfig) -> Co
         for tool_call in most_recent_message.tool_calls
     )
 
-    if exceeded_iterations or research_complete_called:
+    # Track marginal information gain: stop once searches keep returning known content
+    low_novelty_steps = state.get("low_novelty_steps", 0)
+    if NOVELTY_THRESHOLD is not None:
+        novelty = step_novelty(researcher_messages[:-1], most_recent_message, tool_outputs)
+        if novelty is not None:
+            low_novelty_steps = low_novelty_steps + 1 if novelty < NOVELTY_THRESHOLD else 0
+            logger.debug("Research step novelty %.2f (%d low in a row)", novelty, low_novelty_steps)
+    low_novelty = NOVELTY_THRESHOLD is not None and low_novelty_steps >= NOVELTY_PATIENCE
+
+    update = {"researcher_messages": tool_outputs}
+    if INCREMENTAL_COMPRESSION:
+        fold = await fold_researcher_messages(
+            get_model(),
+            state.get("research_topic", ""),
+            researcher_messages + tool_outputs,
+            RESEARCHER_CONTEXT_TOKEN_THRESHOLD,
+        )
+        if fold:
+            folded_messages, folded_raw_notes = fold
+            update = {
+                "researcher_messages": {"type": "override", "value": folded_messages},
+                "raw_notes": offload_notes([folded_raw_notes], config, OFFLOAD_RESEARCH_BLOBS)
+            }
+    update["low_novelty_steps"] = low_novelty_steps
+
+    if exceeded_iterations or research_complete_called or low_novelty:
+        if exceeded_iterations:
+            stop_reason = "max_tool_calls"
+        elif research_complete_called:
+            stop_reason = "research_complete"
+        else:
+            stop_reason = "low_novelty"
+        record_researcher_stop(stop_reason, state.get("tool_call_iterations", 0), MAX_REACT_TOOL_CALLS)
         return Command(
             goto="compress_research",
-            update={"researcher_messages": tool_outputs}
+            update=update
         )
 
     # Continue research loop
     return Command(
         goto="researcher",
-        update={"researcher_messages": tool_outputs}
+        update=update
     )
 
 
@@ -427,7 +783,7 @@ async def compress_research(state: ResearcherState, config: RunnableConfig):
 
     return {
         "compressed_research": str(response.content),
-        "raw_notes": [raw_notes_content]
+        "raw_notes": offload_notes([raw_notes_content], config, OFFLOAD_RESEARCH_BLOBS)
     }
 
 
@@ -445,12 +801,26 @@ researcher_subgraph = researcher_builder.compile()
 
 
 async def final_report_generation(state: AgentState, config: RunnableConfig):
-    """Generate the final comprehensive research report."""
+    """Generate the final comprehensive research report.
+
+    Findings over FINAL_REPORT_FINDINGS_TOKEN_BUDGET are first condensed in
+    parallel chunks (map) and then merged into the report (reduce). A
+    context-length error switches to that mode with half the findings size
+    that was sent as the budget, so every retry sends a smaller prompt.
 
-    # Extract research findings
-    notes = state.get("notes", [])
+    The report is streamed while it is generated (see stream_final_report).
+    A "final_report_retry" custom event tells clients to discard the partial
+    report of a failed attempt.
+    """
+
+    # The research phase is over; stop anything it left running
+    cancel_background_research(research_run_config(config, state))
+
+    # Extract research findings (read from the blob store inside the retry loop)
+    notes = None
     cleared_state = {"notes": {"type": "override", "value": []}}
-    findings = "\n".join(notes)
+    research_brief = state.get("research_brief", "")
+    token_budget = FINAL_REPORT_FINDINGS_TOKEN_BUDGET
 
     # Attempt report generation
     max_retries = 3
@@ -458,25 +828,39 @@ async def final_report_generation(state: AgentState, config: RunnableConfig):
 
     while current_retry <= max_retries:
         try:
+            if notes is None:
+                # Notes may be blob references; read them only now that the report needs them
+                notes = resolve_notes(state.get("notes", []))
+            if count_tokens_approximately(["\n".join(notes)]) > token_budget:
+                notes = await condense_findings(get_model(), notes, research_brief, token_budget)
+            findings = "\n".join(notes)
+
             # Create comprehensive prompt
             final_report_prompt = final_report_generation_prompt.format(
-                research_brief=state.get("research_brief", ""),
+                research_brief=research_brief,
                 messages=get_buffer_string(state.get("messages", [])),
                 findings=findings,
                 date=get_today_str()
             )
 
-            # Generate the final report
-            final_report = await get_model().ainvoke([HumanMessage(content=final_report_prompt)])
+            # Generate the final report, streaming tokens as they arrive
+            final_report = await stream_final_report(get_model(), final_report_prompt, config)
 
             return {
-                "final_report": final_report.content,
+                "final_report": str(final_report.text),
                 "messages": [final_report],
                 **cleared_state
             }
 
         except Exception as e:
             current_retry += 1
+            emit_stream_event({"type": "final_report_retry", "attempt": current_retry})
+            if is_token_limit_exceeded(e):
+                # Same prompt would fail again; condense to half of what was sent
+                if notes is not None:
+                    token_budget = min(token_budget, count_tokens_approximately(["\n".join(notes)]))
+                token_budget //= 2
+                logger.warning("Final report exceeded the context window; condensing findings to %d tokens", token_budget)
             continue
 
     # Return failure result
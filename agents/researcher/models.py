@@ -67,6 +67,9 @@ class AgentState(MessagesState):
     
     supervisor_messages: Annotated[list[MessageLikeRepresentation], override_reducer]
     research_brief: Optional[str]
+    speculative_research_brief: Optional[str]
+    research_deadline: Optional[float]
+    research_run_id: Optional[str]
     need_elaboration: bool
     raw_notes: Annotated[list[str], override_reducer] = []
     notes: Annotated[list[str], override_reducer] = []
@@ -80,12 +83,16 @@ class SupervisorState(TypedDict):
     notes: Annotated[list[str], override_reducer] = []
     research_iterations: int = 0
     raw_notes: Annotated[list[str], override_reducer] = []
+    pending_research: list[str] = []
+    research_deadline: Optional[float]
+    research_run_id: Optional[str]
 
 class ResearcherState(TypedDict):
     """State for individual researchers conducting research."""
     
-    researcher_messages: Annotated[list[MessageLikeRepresentation], operator.add]
+    researcher_messages: Annotated[list[MessageLikeRepresentation], override_reducer]
     tool_call_iterations: int = 0
+    low_novelty_steps: int = 0
     research_topic: str
     compressed_research: str
     raw_notes: Annotated[list[str], override_reducer] = []
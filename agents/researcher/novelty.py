@@ -0,0 +1,62 @@
+"""Researcher stopping: marginal information gain per search step (NOVELTY_THRESHOLD in graph.py)."""
+
+import logging
+
+from langchain_core.messages import AIMessage
+
+from agents.researcher.utils import get_message_text, openai_websearch_called
+from utils.text_similarity import shingles
+
+logger = logging.getLogger(__name__)
+
+# Tools whose output is the researcher's own bookkeeping, not gathered information
+NON_EVIDENCE_TOOLS = {"think_tool", "ResearchComplete"}
+
+# Why researchers stopped since the process started, and tool call
+# iterations left unused because of low novelty
+researcher_stop_stats = {
+    "no_tool_calls": 0,
+    "research_complete": 0,
+    "max_tool_calls": 0,
+    "low_novelty": 0,
+    "iterations_saved": 0,
+}
+
+
+def step_novelty(previous_messages: list, message: AIMessage, tool_outputs: list):
+    """Share of the content gathered in this step that is new to the researcher.
+
+    Compares word shingles of the step's search results (tool outputs, or
+    the model's answer when native web search was used) with everything in
+    the earlier researcher messages. Failed tool calls are not evidence: a
+    repeated error message would otherwise look like repeated content.
+
+    Returns:
+        Fraction of new shingles, or None if the step gathered nothing
+        (e.g. only think_tool was called, or every search failed)
+    """
+    evidence = [
+        get_message_text(output) for output in tool_outputs
+        if output.name not in NON_EVIDENCE_TOOLS and getattr(output, "status", "success") != "error"
+    ]
+    if openai_websearch_called(message):
+        evidence.append(get_message_text(message))
+    evidence_shingles = shingles("\n".join(evidence))
+    if not evidence_shingles:
+        return None
+    seen = set()
+    for previous in previous_messages:
+        seen |= shingles(get_message_text(previous))
+    return len(evidence_shingles - seen) / len(evidence_shingles)
+
+
+def record_researcher_stop(reason: str, tool_call_iterations: int, max_tool_calls: int):
+    """Count and log why a researcher moved on to compress_research."""
+    researcher_stop_stats[reason] += 1
+    unused = max(0, max_tool_calls - tool_call_iterations)
+    if reason == "low_novelty":
+        researcher_stop_stats["iterations_saved"] += unused
+    logger.info(
+        "Researcher stopped (%s) after %d tool call iterations; %d of %d unused",
+        reason, tool_call_iterations, unused, max_tool_calls
+    )
@@ -106,7 +106,7 @@ Think like a research manager with limited time and resources. Follow these step
 - **Stop when you can answer confidently** - Don't keep delegating research for perfection
 - **Limit tool calls** - Always stop after {max_researcher_iterations} tool calls to ConductResearch and think_tool if you cannot find the right sources
 
-**Maximum {max_concurrent_research_units} parallel agents per iteration**
+**Maximum {max_concurrent_research_units} parallel agents per iteration** (additional ConductResearch calls are queued and run as agents finish)
 </Hard Limits>
 
 <Show Your Thinking>
@@ -225,6 +225,42 @@ compress_research_simple_human_message = """All above messages are about researc
 
 DO NOT summarize the information. I want the raw information returned, just in a cleaner format. Make sure all relevant information is preserved - you can rewrite findings verbatim."""
 
+incremental_compression_prompt = """You are a research assistant keeping a running record of research in progress on the following topic. For context, today's date is {date}.
+
+<Research Topic>
+{research_topic}
+</Research Topic>
+
+Below are the research messages gathered so far, including any earlier running summary. Rewrite them into a single cleaned-up record of findings that the researcher will keep working from.
+
+<Messages>
+{messages}
+</Messages>
+
+<Guidelines>
+1. Preserve every relevant fact, figure and quote verbatim - do not summarize away information.
+2. Remove only obviously irrelevant or duplicative content.
+3. Keep every source URL, and attach inline citations to the statements they support.
+4. List the queries and tool calls that have already been made, so they are not repeated.
+</Guidelines>
+"""
+
+condense_findings_prompt = """You are helping write a research report on the following brief, but the research findings are too large to fit in a single prompt. You have been given one part of them. For context, today's date is {date}.
+
+<Research Brief>
+{research_brief}
+</Research Brief>
+
+<Findings>
+{findings}
+</Findings>
+
+Condense these findings into a section of notes that a later writer will merge with the other parts into the final report.
+- Keep every fact, figure, date and quote that is relevant to the research brief.
+- Drop repetition and material that is irrelevant to the brief.
+- Keep every source, attaching inline citations in [Title](URL) format to the statements they support.
+"""
+
 final_report_generation_prompt = """Based on all the research conducted, create a comprehensive, well-structured answer to the overall research brief:
 <Research Brief>
 {research_brief}
@@ -0,0 +1,102 @@
+"""Final report helpers: condensing oversized findings and streaming the report."""
+
+import asyncio
+import logging
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, message_chunk_to_message
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.runnables import RunnableConfig
+from langgraph.constants import TAG_NOSTREAM
+
+from agents.researcher.events import emit_stream_event
+from agents.researcher.prompts import condense_findings_prompt
+from agents.researcher.utils import get_today_str
+
+logger = logging.getLogger(__name__)
+
+
+def is_token_limit_exceeded(error: Exception) -> bool:
+    """Detect provider errors caused by a prompt that is too long for the model."""
+    message = str(error).lower()
+    return any(marker in message for marker in (
+        "context_length_exceeded",
+        "maximum context length",
+        "context window",
+        "prompt is too long",
+        "too many tokens",
+        "reduce the length",
+    ))
+
+
+def chunk_notes(notes: list[str], token_budget: int) -> list[list[str]]:
+    """Group notes, in order, into chunks of roughly token_budget tokens each.
+
+    A single note larger than the budget is split into pieces first.
+    """
+    # count_tokens_approximately assumes ~4 characters per token
+    max_chars = token_budget * 4
+    pieces = [
+        note[start:start + max_chars]
+        for note in notes
+        for start in range(0, max(len(note), 1), max_chars)
+    ]
+
+    chunks, current, current_tokens = [], [], 0
+    for piece in pieces:
+        piece_tokens = count_tokens_approximately([piece])
+        if current and current_tokens + piece_tokens > token_budget:
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += piece_tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def condense_findings(model: BaseChatModel, notes: list[str], research_brief: str, token_budget: int) -> list[str]:
+    """Map step of the hierarchical report: condense chunks of findings in parallel.
+
+    Repeats on the condensed output until everything fits the budget, or
+    stops early if a round no longer shrinks the findings.
+    """
+    findings_tokens = count_tokens_approximately(["\n".join(notes)])
+    while findings_tokens > token_budget:
+        chunks = chunk_notes(notes, token_budget // 2)
+        logger.info("Condensing %d findings tokens in %d parallel chunks for the final report", findings_tokens, len(chunks))
+        responses = await asyncio.gather(*[
+            # Intermediate sections are not part of the report; keep them out of stream_mode="messages"
+            model.ainvoke([HumanMessage(content=condense_findings_prompt.format(
+                research_brief=research_brief,
+                findings="\n".join(chunk),
+                date=get_today_str()
+            ))], config={"tags": [TAG_NOSTREAM]})
+            for chunk in chunks
+        ])
+        condensed = [str(response.text) for response in responses]
+        condensed_tokens = count_tokens_approximately(["\n".join(condensed)])
+        if condensed_tokens >= findings_tokens:
+            break
+        notes, findings_tokens = condensed, condensed_tokens
+    return notes
+
+
+async def stream_final_report(model: BaseChatModel, prompt: str, config: RunnableConfig) -> AIMessage:
+    """Generate the final report token by token.
+
+    Chunks surface through stream_mode="messages" (tagged "final_report") and
+    as "final_report_token" events on stream_mode="custom". The merged chunks
+    are returned as a plain AIMessage, the same as ainvoke would return.
+    """
+    report = None
+    async for chunk in model.with_config(tags=["final_report"]).astream([HumanMessage(content=prompt)], config):
+        # With the Responses API, content is a list of blocks; .text joins
+        # the text blocks either way
+        text = str(chunk.text)
+        if text:
+            emit_stream_event({"type": "final_report_token", "content": text})
+        report = chunk if report is None else report + chunk
+    if report is None:
+        return AIMessage(content="")
+    return message_chunk_to_message(report)
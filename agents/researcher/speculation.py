@@ -0,0 +1,60 @@
+"""Speculative research briefs (SPECULATIVE_RESEARCH_BRIEF in graph.py).
+
+The research brief is generated while clarify_with_user decides whether the
+user has to be asked something. It is used if no clarification is needed,
+and cancelled otherwise.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Speculative research briefs since the process started: started, used,
+# discarded (clarification was needed or the brief failed) and the seconds
+# of brief generation hidden behind clarification
+speculation_stats = {"started": 0, "hits": 0, "discarded": 0, "latency_saved_seconds": 0.0}
+
+
+class SpeculativeBrief:
+    """A research brief generated in the background."""
+
+    def __init__(self, brief: Awaitable[str]):
+        self.task = asyncio.create_task(self._timed(brief))
+        speculation_stats["started"] += 1
+
+    @staticmethod
+    async def _timed(brief: Awaitable[str]):
+        started = time.monotonic()
+        research_brief = await brief
+        return research_brief, time.monotonic() - started
+
+    def cancel(self):
+        """Stop generating the brief, e.g. because clarification failed."""
+        self.task.cancel()
+
+    def discard(self, reason: str):
+        """Cancel the brief because it will not be used."""
+        self.task.cancel()
+        speculation_stats["discarded"] += 1
+        logger.info("Discarded the speculative research brief: %s", reason)
+
+    async def result(self) -> Optional[str]:
+        """Wait for the brief; None if it failed (write_research_brief then generates it as usual)."""
+        clarified_at = time.monotonic()
+        try:
+            research_brief, brief_seconds = await self.task
+        except Exception as e:
+            speculation_stats["discarded"] += 1
+            logger.warning("Speculative research brief failed: %s", e)
+            return None
+        saved = max(0.0, brief_seconds - (time.monotonic() - clarified_at))
+        speculation_stats["hits"] += 1
+        speculation_stats["latency_saved_seconds"] += saved
+        logger.info(
+            "Using the speculative research brief (%.1fs saved; hit rate %d/%d)",
+            saved, speculation_stats["hits"], speculation_stats["started"]
+        )
+        return research_brief
@@ -1,15 +1,26 @@
 """Simplified utility functions for the Deep Research agent."""
 
+import asyncio
 import logging
 from datetime import datetime
 
 from langchain_core.messages import (
+    AIMessage,
+    HumanMessage,
     MessageLikeRepresentation,
     filter_messages,
+    get_buffer_string,
 )
+from langchain_core.messages.utils import count_tokens_approximately
 from langchain_core.tools import tool
 
+from agents.researcher.events import record_timeout
 from agents.researcher.models import ResearchComplete
+from agents.researcher.prompts import incremental_compression_prompt
+from utils.search_cache import cached_tavily_search
+from utils.text_similarity import group_similar, named_entities, tokenize
+
+logger = logging.getLogger(__name__)
 
 ##########################
 # Reflection Tool Utils
@@ -34,24 +45,208 @@ def think_tool(reflection: str) -> str:
 # Tool Utils
 ##########################
 
-async def get_all_tools():
+_all_tools = {}
+_tavily_client = None
+
+
+def get_tavily_client():
+    """Get or create the shared Tavily client."""
+    global _tavily_client
+    if _tavily_client is None:
+        from tavily import TavilyClient
+        _tavily_client = TavilyClient()
+    return _tavily_client
+
+
+@tool(parse_docstring=True)
+def tavily_search(query: str) -> str:
+    """Search the web for information on a given query.
+
+    Args:
+        query: Search query to execute
+    """
+    # Researchers of one run share a search cache: repeated searches are not
+    # re-run, and pages this researcher already read are only referenced
+    return cached_tavily_search(get_tavily_client(), query, max_results=5, topic="general")
+
+
+async def get_all_tools(search_api: str = "openai"):
     """Assemble complete toolkit for research operations.
 
-    Returns tools including OpenAI's native web search.
+    Args:
+        search_api: "openai" for OpenAI's native web search, or "tavily" for
+            Tavily search through the shared per-run search cache
+
+    Returns tools including the selected web search. The toolkit is built
+    once per process and shared by every researcher.
     """
+    if search_api in _all_tools:
+        return _all_tools[search_api]
+
     # Core research tools
     tools = [tool(ResearchComplete), think_tool]
 
-    # Add OpenAI's native web search
-    # This is a special tool definition that OpenAI models recognize
-    tools.append({"type": "web_search_preview"})
+    if search_api == "tavily":
+        tools.append(tavily_search)
+    else:
+        # Add OpenAI's native web search
+        # This is a special tool definition that OpenAI models recognize
+        tools.append({"type": "web_search_preview"})
 
+    _all_tools[search_api] = tools
     return tools
 
 
+# Name given to the running summary that replaces older researcher messages
+# when incremental compression is enabled (see INCREMENTAL_COMPRESSION)
+RESEARCH_SUMMARY_NAME = "research_summary"
+
+# Name given to messages carrying findings from research units that finished
+# after the supervisor had already resumed (see RESEARCH_QUORUM)
+LATE_RESEARCH_NAME = "late_research"
+
+
 def get_notes_from_tool_calls(messages: list[MessageLikeRepresentation]):
-    """Extract notes from tool call messages."""
-    return [tool_msg.content for tool_msg in filter_messages(messages, include_types="tool")]
+    """Extract notes from tool call messages and late research findings."""
+    return [
+        message.content
+        for message in filter_messages(messages, include_types="tool", include_names=[LATE_RESEARCH_NAME])
+        if not message.response_metadata.get("pending")
+        and not message.response_metadata.get("merged_into")
+        and getattr(message, "status", "success") != "error"
+    ]
+
+
+##########################
+# Research Topic Merging
+##########################
+
+def merge_research_calls(tool_calls: list[dict], threshold: float) -> list[tuple[dict, list[dict]]]:
+    """Group ConductResearch calls whose topics overlap heavily, so each group is researched once.
+
+    Topics are compared locally by TF-IDF cosine similarity, and only
+    topics naming the same entities are merged: "OpenAI's safety approach"
+    and "Anthropic's safety approach" share most of their words but are
+    separate units of a comparison. A group is
+    researched under its first call's id with the most detailed topic of
+    the group, extended with any other topic that adds terms it does not
+    already cover.
+
+    Returns:
+        (primary call, merged calls) pairs in tool call order; the primary
+        call is a copy whose research_topic covers the whole group
+    """
+    topics = [tool_call["args"]["research_topic"] for tool_call in tool_calls]
+    entities = [named_entities(topic) for topic in topics]
+    merged = []
+    for group in group_similar(topics, threshold, can_join=lambda i, j: entities[i] == entities[j]):
+        calls = [tool_calls[i] for i in group]
+        if len(calls) == 1:
+            merged.append((calls[0], []))
+            continue
+
+        base = max(group, key=lambda i: len(topics[i]))
+        covered = set(tokenize(topics[base]))
+        extra = [topics[i] for i in group if i != base and not set(tokenize(topics[i])) <= covered]
+        topic = topics[base]
+        if extra:
+            topic += "\n\nAlso cover these closely related requests:\n" + "\n".join(f"- {t}" for t in extra)
+
+        primary = {**calls[0], "args": {**calls[0]["args"], "research_topic": topic}}
+        merged.append((primary, calls[1:]))
+    return merged
+
+
+##########################
+# Supervisor Context Utils
+##########################
+
+FINDINGS_DIGEST_CHARS = 800
+REFLECTION_DIGEST_CHARS = 200
+# additional_kwargs key set on digested messages, holding the original length
+DIGEST_MARKER = "digest_of_chars"
+
+
+def make_digest(content: str, max_chars: int) -> str:
+    """Shorten text to roughly max_chars, cutting at a sentence or line boundary."""
+    content = str(content)
+    if len(content) <= max_chars:
+        return content
+    head = content[:max_chars]
+    cut = max(head.rfind(". "), head.rfind("\n"))
+    if cut > max_chars // 2:
+        head = head[:cut + 1]
+    return f"{head.rstrip()}\n[... digest of {len(content)} characters; full text is kept for the final report]"
+
+
+def compact_supervisor_messages(messages: list[MessageLikeRepresentation]):
+    """Replace earlier research findings and reflections with short digests.
+
+    The system prompt, research brief and the supervisor's own AI messages are
+    kept as-is. The full text of each finding is already recorded in `notes`.
+    Messages digested on an earlier iteration are left unchanged, so the
+    compacted prefix stays identical from one supervisor turn to the next.
+    """
+    compacted = []
+    for message in messages:
+        is_late_finding = getattr(message, "name", None) == LATE_RESEARCH_NAME
+        already_digested = DIGEST_MARKER in getattr(message, "additional_kwargs", {})
+        if (message.type == "tool" or is_late_finding) and not already_digested:
+            max_chars = REFLECTION_DIGEST_CHARS if message.name == "think_tool" else FINDINGS_DIGEST_CHARS
+            digest = make_digest(message.content, max_chars)
+            if digest != message.content:
+                message = message.model_copy(update={
+                    "content": digest,
+                    "additional_kwargs": {**message.additional_kwargs, DIGEST_MARKER: len(str(message.content))},
+                })
+        compacted.append(message)
+    return compacted
+
+
+async def fold_researcher_messages(model, research_topic: str, messages: list, token_threshold: int):
+    """Fold older researcher messages into a running summary once they grow too large.
+
+    The topic message and the most recent model turn (with its tool results)
+    are kept as-is; everything in between, including any earlier summary, is
+    compressed into one summary message. This keeps each researcher prompt
+    bounded instead of growing with every tool call.
+
+    Returns:
+        Tuple of (new message list, raw notes of the folded messages), or
+        None if no fold is needed
+    """
+    if count_tokens_approximately(messages) < token_threshold:
+        return None
+
+    last_turn_start = max(
+        index for index, message in enumerate(messages) if isinstance(message, AIMessage)
+    )
+    folded = messages[1:last_turn_start]
+    if not folded:
+        return None
+
+    prompt = incremental_compression_prompt.format(
+        research_topic=research_topic,
+        messages=get_buffer_string(folded),
+        date=get_today_str()
+    )
+    response = await model.ainvoke([HumanMessage(content=prompt)])
+    summary = HumanMessage(
+        content=f"Findings gathered so far:\n\n{response.text}",
+        name=RESEARCH_SUMMARY_NAME
+    )
+
+    raw_notes = "\n".join(
+        str(message.content)
+        for message in filter_messages(folded, include_types=["tool", "ai"])
+    )
+    logger.info(
+        "Folded %d researcher messages into a running summary (%d -> %d tokens)",
+        len(folded),
+        count_tokens_approximately(messages),
+        count_tokens_approximately([messages[0], summary, *messages[last_turn_start:]]),
+    )
+    return [messages[0], summary, *messages[last_turn_start:]], raw_notes
 
 
 ##########################
@@ -95,18 +290,40 @@ def openai_websearch_called(response):
         return False
 
 
-async def execute_tool_safely(tool, args):
-    """Safely execute a tool with error handling."""
+TOOL_ERROR_PREFIX = "Error executing tool:"
+
+
+async def execute_tool_safely(tool, args, timeout=None):
+    """Safely execute a tool with error handling and an optional deadline.
+
+    A call that misses the deadline is cancelled and reported as an error
+    observation (starting with TOOL_ERROR_PREFIX), so the researcher
+    continues with the other results.
+    """
     try:
-        return await tool.ainvoke(args)
+        return await asyncio.wait_for(tool.ainvoke(args), timeout)
+    except asyncio.TimeoutError:
+        record_timeout("tool_calls", tool=getattr(tool, "name", str(tool)), timeout_seconds=timeout)
+        return f"{TOOL_ERROR_PREFIX} timed out after {timeout:.1f}s"
     except Exception as e:
-        return f"Error executing tool: {str(e)}"
+        return f"{TOOL_ERROR_PREFIX} {str(e)}"
 
 
 ##########################
 # Misc Utils
 ##########################
 
+def get_message_text(message) -> str:
+    """Text of a message whose content may be a string or a list of content blocks."""
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return "\n".join(
+        block if isinstance(block, str) else str(block.get("text", ""))
+        for block in content
+    )
+
+
 def get_today_str() -> str:
     """Get current date formatted for display."""
     now = datetime.now()
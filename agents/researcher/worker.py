@@ -0,0 +1,202 @@
+"""Worker processes that run research units from the durable task queue.
+
+With RESEARCH_EXECUTOR = "queue" in graph.py, supervisor_tools enqueues each
+research unit (see utils/task_queue.py) instead of running it in its own
+event loop, and waits for the result. Start workers on the same machine:
+
+    python -m agents.researcher.worker --workers 4 --concurrency 5
+
+Each worker process leases units, runs the researcher subgraph, and
+heartbeats while it works. A worker that dies loses its leases after the
+queue's visibility timeout and its units are picked up by other workers;
+failed units are retried with backoff by the queue.
+
+Rate limits (utils/rate_limiter.py) are kept per process. Unless
+RATE_LIMIT_PROCESSES is set, each worker gets 1/(workers + 1) of the
+configured limits, the graph process being the other share; set
+RATE_LIMIT_PROCESSES to the same value for the graph process.
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import socket
+import uuid
+
+from utils.blob_store import thread_id_from_config
+from utils.checkpointing import sqlite_checkpointers
+from utils.search_cache import drop_other_run_caches
+from utils.task_queue import TaskQueue, get_task_queue
+
+logger = logging.getLogger(__name__)
+
+RESEARCH_UNIT_TASK = "research_unit"
+
+
+async def enqueue_research_unit(research_topic: str, config: dict, unit_id=None):
+    """Hand one research unit to the worker pool and wait for its output.
+
+    The task id is derived from the thread and tool_call_id, so a
+    re-executed supervisor step re-attaches to the same task. Cancelling
+    the wait (e.g. on a timeout) cancels the task for the worker too.
+    """
+    queue = get_task_queue()
+    thread_id = thread_id_from_config(config)
+    run_id = config.get("configurable", {}).get("run_id")
+    payload = {"research_topic": research_topic, "thread_id": thread_id, "run_id": run_id, "unit_id": unit_id}
+    task_id = f"{thread_id}:research:{unit_id}" if unit_id else None
+    task_id = await asyncio.to_thread(queue.enqueue, RESEARCH_UNIT_TASK, payload, task_id)
+    try:
+        return await queue.wait(task_id)
+    except asyncio.CancelledError:
+        queue.cancel(task_id)
+        raise
+
+
+async def run_research_task(payload: dict) -> dict:
+    """Default handler: run the researcher subgraph for one queued research unit."""
+    # Imported here so the queue can be used without loading the graph
+    from agents.researcher.graph import invoke_researcher
+
+    configurable = {"thread_id": payload["thread_id"]}
+    if payload.get("run_id") is not None:
+        configurable["run_id"] = payload["run_id"]
+    config = {"configurable": configurable}
+    # Searches share the parent run's cache; earlier runs' caches are dropped
+    drop_other_run_caches(config)
+    observation = await invoke_researcher(payload["research_topic"], config, payload.get("unit_id"))
+    return {
+        "compressed_research": observation.get("compressed_research", ""),
+        "raw_notes": list(observation.get("raw_notes", [])),
+    }
+
+
+async def process_task(queue: TaskQueue, worker_id: str, task: dict, handler):
+    """Run one leased task, heartbeating until it finishes or the lease is lost."""
+    work = asyncio.create_task(handler(task["payload"]))
+    while True:
+        done, _ = await asyncio.wait({work}, timeout=queue.visibility_timeout / 3)
+        if done:
+            break
+        if not await asyncio.to_thread(queue.heartbeat, task["id"], worker_id):
+            # Cancelled by the supervisor, or the lease expired and moved on
+            logger.warning("Lost the lease on task %s; cancelling it", task["id"])
+            work.cancel()
+            return
+
+    try:
+        result = work.result()
+    except Exception as e:
+        logger.warning("Task %s failed (attempt %d): %s", task["id"], task["attempts"], e)
+        await asyncio.to_thread(queue.fail, task["id"], worker_id, f"{type(e).__name__}: {e}")
+        return
+    await asyncio.to_thread(queue.complete, task["id"], worker_id, result)
+
+
+async def work(
+    queue: TaskQueue,
+    concurrency: int = 5,
+    handler=run_research_task,
+    poll_interval: float = 0.2,
+    stop_when_idle: bool = False,
+):
+    """Lease and run research units until stopped.
+
+    Args:
+        queue: Task queue to consume
+        concurrency: Units run at once by this worker
+        handler: Async function from a task payload to its JSON result
+        poll_interval: Seconds between polls when the queue is empty
+        stop_when_idle: Return once the queue has nothing left for this worker
+    """
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+    slots = asyncio.Semaphore(concurrency)
+    running = set()
+
+    def finished(task):
+        running.discard(task)
+        slots.release()
+
+    while True:
+        await slots.acquire()
+        task = await asyncio.to_thread(queue.lease, worker_id, [RESEARCH_UNIT_TASK])
+        if task is None:
+            slots.release()
+            if stop_when_idle and not running:
+                return
+            await asyncio.sleep(poll_interval)
+            continue
+        running_task = asyncio.create_task(process_task(queue, worker_id, task, handler))
+        running.add(running_task)
+        running_task.add_done_callback(finished)
+
+
+def worker_main(queue_path=None, concurrency: int = 5, handler=run_research_task, stop_when_idle: bool = False,
+                ready=None, rate_limit_processes=None):
+    """Entry point of one worker process.
+
+    Args:
+        ready: Barrier to wait on once the worker is set up, before it leases anything
+        rate_limit_processes: RATE_LIMIT_PROCESSES for this worker, if not set already
+    """
+    logging.basicConfig(level=logging.INFO, format=f"[worker {os.getpid()}] %(levelname)s %(message)s")
+    if rate_limit_processes:
+        os.environ.setdefault("RATE_LIMIT_PROCESSES", str(rate_limit_processes))
+    if handler is run_research_task:
+        # Load the graph now rather than on the first unit
+        import agents.researcher.graph  # noqa: F401
+    queue = TaskQueue(queue_path) if queue_path else get_task_queue()
+
+    async def run():
+        # Durable units open SQLite checkpointers; close them before the loop ends
+        async with sqlite_checkpointers():
+            if ready is not None:
+                await asyncio.to_thread(ready.wait)
+            await work(queue, concurrency, handler, stop_when_idle=stop_when_idle)
+
+    asyncio.run(run())
+
+
+def start_workers(num_workers: int, queue_path=None, concurrency: int = 5, handler=run_research_task,
+                  stop_when_idle: bool = False, ready=None) -> list[multiprocessing.Process]:
+    """Start worker processes and return them.
+
+    Args:
+        ready: Optional spawn-context Barrier for num_workers + 1 parties; the
+            caller's wait on it returns once every worker is set up
+    """
+    context = multiprocessing.get_context("spawn")
+    # Workers plus the graph process share the account's rate limits
+    rate_limit_processes = num_workers + 1
+    processes = [
+        context.Process(
+            target=worker_main,
+            args=(queue_path, concurrency, handler, stop_when_idle, ready, rate_limit_processes),
+            daemon=True,
+        )
+        for _ in range(num_workers)
+    ]
+    for process in processes:
+        process.start()
+    return processes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run research unit workers on the local task queue")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--concurrency", type=int, default=5, help="Research units run at once per worker")
+    args = parser.parse_args()
+
+    processes = start_workers(args.workers, concurrency=args.concurrency)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Checkpoint size and write time with and without blob offloading of research notes.
+
+Simulates a research run whose raw_notes grow by one unit's notes per
+step. After every step the checkpointer serializes the whole channel
+value, so each step is timed for:
+
+- inline: the notes themselves are serialized
+- offloaded: the new note is written to the blob store once, and only the
+  list of references is serialized
+
+Also checks that the blob sweep keeps the blobs of threads still referenced
+by a checkpoint, however old, and deletes idle unreferenced ones.
+
+Run from the project root: python -m benchmarks.blob_offload
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from operator import add
+from pathlib import Path
+from typing import Annotated, TypedDict
+
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.graph import START, StateGraph
+
+import utils.blob_store as blob_store
+
+STEPS = 30
+NOTE_CHARS = 40_000  # raw notes of one research unit
+
+
+def note(step: int) -> str:
+    return f"Raw notes of research unit {step}: " + "search result text " * (NOTE_CHARS // 19)
+
+
+def run_steps(offload: bool) -> tuple[int, float, int]:
+    """Total checkpoint bytes, total write seconds and the last checkpoint's size over STEPS steps."""
+    serde = JsonPlusSerializer()
+    config = {"configurable": {"thread_id": "bench"}}
+    raw_notes, total_bytes, total_seconds, last_bytes = [], 0, 0.0, 0
+    for step in range(STEPS):
+        started = time.perf_counter()
+        value = note(step)
+        raw_notes.append(blob_store.offload_blob(value, config) if offload else value)
+        _, payload = serde.dumps_typed(raw_notes)
+        total_seconds += time.perf_counter() - started
+        total_bytes += len(payload)
+        last_bytes = len(payload)
+    return total_bytes, total_seconds, last_bytes
+
+
+def check_checkpoint_size():
+    print(f"{STEPS} steps, {NOTE_CHARS:,} chars of raw notes added per step")
+    results = {}
+    for offload in (False, True):
+        total_bytes, total_seconds, last_bytes = run_steps(offload)
+        label = "offloaded" if offload else "inline"
+        results[label] = total_bytes
+        print(f"{label:<10} last checkpoint {last_bytes / 1024:>8.1f} KiB   "
+              f"all checkpoints {total_bytes / 1024:>8.1f} KiB   write time {total_seconds * 1000:>7.1f} ms")
+    assert results["offloaded"] * 20 < results["inline"], "offloading did not shrink the checkpoints"
+
+
+class State(TypedDict):
+    raw_notes: Annotated[list[str], add]
+
+
+async def check_sweep_keeps_referenced_threads():
+    live_ref = blob_store.offload_blob(note(0), {"configurable": {"thread_id": "live"}})
+    dead_ref = blob_store.offload_blob(note(1), {"configurable": {"thread_id": "dead"}})
+
+    # A checkpoint of thread "live" still references its blob
+    builder = StateGraph(State)
+    builder.add_node("research", lambda state: {"raw_notes": [live_ref]})
+    builder.add_edge(START, "research")
+    checkpointer = InMemorySaver()
+    await builder.compile(checkpointer=checkpointer).ainvoke({"raw_notes": []}, {"configurable": {"thread_id": "live"}})
+
+    # Both threads were last written to long before the TTL
+    store = blob_store.get_blob_store()
+    long_ago = time.time() - 30 * 24 * 60 * 60
+    for thread_id in ("live", "dead"):
+        os.utime(store.root / thread_id, (long_ago, long_ago))
+
+    deleted = await blob_store.sweep_expired_blobs(checkpointer, force=True)
+    assert deleted == 1, deleted
+    assert blob_store.resolve_blob(live_ref) == note(0)
+    try:
+        blob_store.resolve_blob(dead_ref)
+    except blob_store.BlobNotFoundError:
+        pass
+    else:
+        raise AssertionError("an idle unreferenced thread was not swept")
+    print("sweep: referenced thread kept, idle unreferenced thread deleted")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        blob_store._blob_store = blob_store.LocalBlobStore(Path(tmp) / "blobs")
+        check_checkpoint_size()
+        asyncio.run(check_sweep_keeps_referenced_threads())
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
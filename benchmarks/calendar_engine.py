@@ -0,0 +1,136 @@
+"""Benchmark the calendar engine with thousands of attendees and events.
+
+Also checks that:
+
+- parse_day resolves a full date that names its weekday ("Monday, June 2,
+  2025") to that date rather than the next Monday
+- parse_time_of_day rejects bare numbers that are neither an hour nor HHMM,
+  and book_meeting refuses times that have already passed
+- booking into a persisted calendar appends one line per event, so its cost
+  does not grow with the number of events already stored, and a reload
+  (including of the older single-array format) rebuilds the same calendar
+
+Run from the project root: python -m benchmarks.calendar_engine
+"""
+
+import json
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from utils.calendar_engine import CalendarEngine, book_meeting, parse_day, parse_time_of_day
+
+NUM_ATTENDEES = 5000
+EVENTS_PER_ATTENDEE = 40
+NUM_DAYS = 20
+GROUP_SIZE = 10
+NUM_QUERIES = 2000
+PERSISTED_EVENTS = 2000
+
+
+def build_calendar(seed: int = 0) -> CalendarEngine:
+    rng = random.Random(seed)
+    calendar = CalendarEngine(path=None)
+    first_day = date(2025, 1, 6)
+    for attendee_index in range(NUM_ATTENDEES):
+        attendee = f"user{attendee_index}@company.com"
+        for _ in range(EVENTS_PER_ATTENDEE):
+            day = first_day + timedelta(days=rng.randrange(NUM_DAYS))
+            start = datetime.combine(day, datetime.min.time()) + timedelta(minutes=rng.randrange(8 * 4, 18 * 4) * 15)
+            end = start + timedelta(minutes=rng.choice([15, 30, 60, 90]))
+            calendar.add_event([attendee], start, end, persist=False)
+    return calendar
+
+
+def check_parse_day():
+    today = date(2025, 5, 20)  # a Tuesday
+    cases = {
+        "Monday, June 2, 2025": date(2025, 6, 2),
+        "Friday 2025-06-13": date(2025, 6, 13),
+        "monday": date(2025, 5, 26),
+        "fri": date(2025, 5, 23),
+    }
+    for text, expected in cases.items():
+        assert parse_day(text, today) == expected, (text, parse_day(text, today))
+    print(f"parse_day: {len(cases)} cases ok")
+
+
+def check_booking_validation():
+    assert parse_time_of_day(14) == datetime.strptime("14:00", "%H:%M").time()
+    assert parse_time_of_day(1430) == datetime.strptime("14:30", "%H:%M").time()
+    for value in (30, "30", 2460, 2400, -1):
+        try:
+            parse_time_of_day(value)
+        except ValueError:
+            continue
+        raise AssertionError(f"parse_time_of_day({value!r}) did not fail")
+
+    yesterday = date.today() - timedelta(days=1)
+    message = book_meeting(["alice@company.com"], "Retro", yesterday.isoformat(), "2:00 PM")
+    assert "already passed" in message, message
+    message = book_meeting(["alice@company.com"], "Retro", "tomorrow", 30)
+    assert "Could not parse time" in message, message
+    print("booking validation: ambiguous times and past dates rejected")
+
+
+def check_persistence():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "calendar.jsonl"
+        calendar = CalendarEngine(path)
+        first_day = date(2025, 1, 6)
+        timings = []
+        for i in range(PERSISTED_EVENTS):
+            start = datetime.combine(first_day + timedelta(days=i // 16), datetime.min.time()) + timedelta(
+                hours=9, minutes=(i % 16) * 30
+            )
+            started = time.perf_counter()
+            calendar.schedule_meeting([f"user{i % 50}@company.com"], f"Meeting {i}", start, 30)
+            timings.append(time.perf_counter() - started)
+
+        first, last = timings[:200], timings[-200:]
+        first_us, last_us = sum(first) / len(first) * 1e6, sum(last) / len(last) * 1e6
+        print(f"persisted booking: {first_us:.0f}us/booking for the first 200, "
+              f"{last_us:.0f}us/booking for the last 200 of {PERSISTED_EVENTS}")
+        assert last_us < first_us * 3, "booking cost grows with the number of stored events"
+
+        assert len(path.read_text().splitlines()) == PERSISTED_EVENTS
+        reloaded = CalendarEngine(path)
+        assert reloaded.events == calendar.events
+
+        legacy_path = Path(tmp) / "legacy.json"
+        legacy_path.write_text(json.dumps(calendar.events))
+        migrated = CalendarEngine(legacy_path)
+        assert migrated.events == calendar.events
+        assert len(legacy_path.read_text().splitlines()) == PERSISTED_EVENTS, "legacy file was not migrated"
+        print("persistence: reload and legacy migration rebuild the same calendar")
+
+
+def main():
+    check_parse_day()
+    check_booking_validation()
+    check_persistence()
+    started = time.perf_counter()
+    calendar = build_calendar()
+    build_seconds = time.perf_counter() - started
+    num_events = NUM_ATTENDEES * EVENTS_PER_ATTENDEE
+    print(f"Indexed {num_events} events for {NUM_ATTENDEES} attendees in {build_seconds:.2f}s "
+          f"({num_events / build_seconds:,.0f} events/s)")
+
+    rng = random.Random(1)
+    first_day = date(2025, 1, 6)
+    started = time.perf_counter()
+    found = 0
+    for _ in range(NUM_QUERIES):
+        attendees = [f"user{rng.randrange(NUM_ATTENDEES)}@company.com" for _ in range(GROUP_SIZE)]
+        day = first_day + timedelta(days=rng.randrange(NUM_DAYS))
+        _, slots = calendar.find_slots(attendees, day)
+        found += bool(slots)
+    query_seconds = time.perf_counter() - started
+    print(f"{NUM_QUERIES} free-slot queries over {GROUP_SIZE} attendees: "
+          f"{query_seconds / NUM_QUERIES * 1e6:.0f}us/query, {found} with open slots")
+
+
+if __name__ == "__main__":
+    main()
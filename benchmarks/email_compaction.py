@@ -0,0 +1,88 @@
+"""Check what email thread compaction keeps and drops.
+
+Builds a reply with a quoted history, a signature and a trailing
+confidentiality notice, plus one where body text shares a paragraph with a
+disclaimer line and a forward with the sender's signature above the
+forwarded email, and asserts that only boilerplate is removed. Prints the
+token savings.
+
+Run from the project root: python -m benchmarks.email_compaction
+"""
+
+from agents.email_agent.utils import compact_email_thread
+
+NOTICE = """CONFIDENTIALITY NOTICE: This email and any attachments are confidential and
+intended solely for the use of the individual to whom they are addressed.
+
+If you have received this email in error, please notify the sender. Any
+unauthorized review, use or distribution is strictly prohibited."""
+
+REPLY = f"""Hi Lance,
+
+Thanks for the update. Revenue: 10M for Q3, see the attached deck.
+
+On Mon, Jan 6, 2025 at 9:14 AM Alice <alice@company.com> wrote:
+> Can you send the Q3 numbers?
+> Thanks
+
+--
+Bob Smith
+VP Finance
+
+{NOTICE}"""
+
+# Body text directly above a disclaimer, in the same paragraph
+BODY_NEXT_TO_DISCLAIMER = f"""Hi Lance,
+
+Final figures below.
+Revenue: 10M
+{NOTICE}"""
+
+# A "disclaimer" mentioned in the body is not a legal notice
+BODY_MENTIONS_DISCLAIMER = """Hi Lance,
+
+Please add a disclaimer to the launch post.
+Revenue: 10M is still preliminary."""
+
+
+# A forward: the forwarded email is the request itself and must survive
+FORWARD = """Can you take care of this customer request below? It's urgent.
+
+--
+Bob Smith
+Sent from my iPhone
+
+---------- Forwarded message ---------
+From: Dana Customer <dana@example.com>
+Subject: Refund for order 4417
+
+Hi, I was charged twice for order 4417 on March 3. Please refund the
+duplicate charge.
+
+Thanks,
+Dana"""
+
+
+def check(name: str, thread: str, kept: list[str], dropped: list[str]):
+    compacted, stats = compact_email_thread(thread)
+    print(f"{name}: {stats['original_tokens']} -> {stats['compacted_tokens']} tokens")
+    for text in kept:
+        assert text in compacted, f"{name}: lost {text!r}"
+    for text in dropped:
+        assert text not in compacted, f"{name}: kept {text!r}"
+
+
+def main():
+    check("reply", REPLY, ["Revenue: 10M for Q3"], ["Can you send", "Bob Smith", "CONFIDENTIALITY", "in error"])
+    check("body next to disclaimer", BODY_NEXT_TO_DISCLAIMER,
+          ["Final figures below.", "Revenue: 10M"], ["CONFIDENTIALITY", "strictly prohibited"])
+    check("body mentions disclaimer", BODY_MENTIONS_DISCLAIMER,
+          ["Please add a disclaimer", "Revenue: 10M"], [])
+    check("forward", FORWARD,
+          ["take care of this customer request", "Forwarded message", "charged twice for order 4417"],
+          ["Bob Smith", "Sent from my iPhone"])
+    print("OK: only boilerplate removed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Check final report generation against a stub model with a small context window.
+
+The stub streams its report the way the Responses API does (content is a
+list of blocks, including a block without text) and fails with a
+context_length_exceeded error when a report prompt is larger than its
+window. Checks that:
+
+- findings that fit are reported in one streamed call, without condensing
+- oversized findings are condensed in parallel chunks (map step), each
+  call tagged so it stays out of stream_mode="messages"
+- every context-length error sends a smaller prompt next, until the report
+  fits the window
+- the streamed "final_report_token" events and the returned final_report
+  are plain text
+
+Run from the project root: python -m benchmarks.final_report
+"""
+
+import asyncio
+
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.constants import TAG_NOSTREAM
+
+import agents.researcher.events as research_events
+import agents.researcher.graph as research_graph
+
+CONTEXT_WINDOW = 8_000  # tokens the stub accepts in a report prompt
+NOTE_TOKENS = 2_000
+REPORT_PIECES = ["# Report\n\n", "Findings ", "in brief."]
+
+
+class StubModel:
+    """Condenses to a quarter of the prompt; streams a fixed report in content blocks."""
+
+    def __init__(self):
+        self.condense_calls = 0
+        self.report_prompt_tokens = []
+
+    async def ainvoke(self, messages, config=None):
+        assert TAG_NOSTREAM in (config or {}).get("tags", []), "a condense call would stream into the report"
+        self.condense_calls += 1
+        return AIMessage(content=[{"type": "text", "text": "abc " * (count_tokens_approximately(messages) // 4)}])
+
+    def with_config(self, tags=None, **kwargs):
+        assert tags == ["final_report"]
+        return self
+
+    async def astream(self, messages, config=None):
+        tokens = count_tokens_approximately(messages)
+        self.report_prompt_tokens.append(tokens)
+        if tokens > CONTEXT_WINDOW:
+            raise ValueError(
+                "Error code: 400 - {'error': {'code': 'context_length_exceeded', "
+                f"'message': 'Your input exceeds the context window of this model ({tokens} tokens)'}}}}"
+            )
+        yield AIMessageChunk(content=[{"type": "reasoning", "summary": [], "index": 0}])
+        for piece in REPORT_PIECES:
+            yield AIMessageChunk(content=[{"type": "text", "text": piece, "index": 1}])
+
+
+async def run(num_notes: int):
+    model = StubModel()
+    research_graph.get_model = lambda: model
+    events = []
+    research_events.get_stream_writer = lambda: events.append
+    state = {
+        "notes": [f"note {i}: " + "word " * NOTE_TOKENS for i in range(num_notes)],
+        "research_brief": "a brief",
+        "messages": [HumanMessage(content="a question")],
+    }
+    result = await research_graph.final_report_generation(state, {"configurable": {"thread_id": "bench"}})
+    return model, events, result
+
+
+def check_report(events, result):
+    report = "".join(REPORT_PIECES)
+    tokens = [event["content"] for event in events if event["type"] == "final_report_token"]
+    assert all(type(token) is str for token in tokens) and "".join(tokens) == report, tokens
+    assert result["final_report"] == report, result["final_report"]
+    assert result["messages"][0].text == report
+
+
+async def main():
+    research_graph.OFFLOAD_RESEARCH_BLOBS = False
+
+    model, events, result = await run(num_notes=2)
+    check_report(events, result)
+    assert model.condense_calls == 0 and len(model.report_prompt_tokens) == 1
+    print(f"fits: one report call of {model.report_prompt_tokens[0]:,} tokens, nothing condensed")
+
+    model, events, result = await run(num_notes=20)
+    check_report(events, result)
+    prompts = model.report_prompt_tokens
+    retries = [event["attempt"] for event in events if event["type"] == "final_report_retry"]
+    print(f"oversized: report prompts {[f'{tokens:,}' for tokens in prompts]} tokens "
+          f"(window {CONTEXT_WINDOW:,}), {model.condense_calls} condense calls, retries {retries}")
+    assert all(later < earlier for earlier, later in zip(prompts, prompts[1:])), "a retry resent the same prompt"
+    assert prompts[-1] <= CONTEXT_WINDOW and retries == list(range(1, len(prompts)))
+    assert model.condense_calls > 1
+    print("OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,116 @@
+"""Check how BatchCoalescer groups concurrent single-item calls into batch calls.
+
+Runs the coalescer against a stub pool that records every call it receives
+and answers batch calls after a short simulated round trip. Checks that:
+
+- calls inside one window go out as a single batch call
+- a batch that reaches max_batch_size is sent at once, and calls arriving
+  after that early flush wait for a full window of their own
+- a caller cancelled during the window or the round trip does not affect
+  the other callers
+- when the batch returns fewer results than items, the unmatched callers
+  fail instead of waiting forever
+
+Run from the project root: python -m benchmarks.mcp_batching
+"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+from utils.mcp_pool import BatchCoalescer
+
+WINDOW = 0.05
+ROUND_TRIP = 0.02
+TOOL = "check_calendar_availability"
+
+
+class StubPool:
+    """Answers `<tool>_batch` calls with one result per item, recording each call."""
+
+    def __init__(self, drop_last_result: bool = False):
+        self.calls = []
+        self.drop_last_result = drop_last_result
+
+    async def list_tools(self):
+        return [SimpleNamespace(name=TOOL), SimpleNamespace(name=f"{TOOL}_batch")]
+
+    async def call_tool_text(self, name: str, arguments: dict) -> str:
+        self.calls.append((time.perf_counter(), name, arguments))
+        await asyncio.sleep(ROUND_TRIP)
+        if not name.endswith("_batch"):
+            return f"free on {arguments['day']}"
+        items = [{"result": f"free on {item['day']}"} for item in arguments["items"]]
+        return json.dumps(items[:-1] if self.drop_last_result else items)
+
+
+def batch_sizes(pool: StubPool) -> list[int]:
+    return [len(arguments["items"]) if name.endswith("_batch") else 1 for _, name, arguments in pool.calls]
+
+
+async def check_window():
+    pool = StubPool()
+    coalescer = BatchCoalescer(pool, window=WINDOW)
+    results = await asyncio.gather(*[coalescer.call(TOOL, {"day": f"day {i}"}) for i in range(5)])
+    assert results == [f"free on day {i}" for i in range(5)], results
+    assert batch_sizes(pool) == [5], batch_sizes(pool)
+    print(f"window: 5 concurrent calls -> batch sizes {batch_sizes(pool)}")
+
+
+async def check_early_flush():
+    pool = StubPool()
+    coalescer = BatchCoalescer(pool, window=WINDOW, max_batch_size=3)
+    started = time.perf_counter()
+    first = [asyncio.create_task(coalescer.call(TOOL, {"day": f"day {i}"})) for i in range(3)]
+    await asyncio.sleep(WINDOW / 2)
+    # Arrives after the early flush; must wait a full window of its own
+    late = asyncio.create_task(coalescer.call(TOOL, {"day": "late"}))
+    await asyncio.gather(*first, late)
+
+    assert batch_sizes(pool) == [3, 1], batch_sizes(pool)
+    early_sent, late_sent = pool.calls[0][0] - started, pool.calls[1][0] - started
+    assert early_sent < WINDOW / 2, f"full batch waited {early_sent:.3f}s"
+    assert late_sent >= WINDOW / 2 + WINDOW * 0.9, f"late call sent after {late_sent:.3f}s, before its window"
+    print(f"early flush: full batch sent at {early_sent * 1000:.0f}ms, "
+          f"late call at {late_sent * 1000:.0f}ms (window {WINDOW * 1000:.0f}ms)")
+
+
+async def check_cancelled_callers():
+    pool = StubPool()
+    coalescer = BatchCoalescer(pool, window=WINDOW)
+    calls = [asyncio.create_task(coalescer.call(TOOL, {"day": f"day {i}"})) for i in range(4)]
+    await asyncio.sleep(WINDOW / 2)
+    calls[0].cancel()  # during the window: not sent
+    await asyncio.sleep(WINDOW / 2 + ROUND_TRIP / 2)
+    calls[1].cancel()  # while the batch is in flight
+    results = await asyncio.gather(*calls, return_exceptions=True)
+
+    assert isinstance(results[0], asyncio.CancelledError) and isinstance(results[1], asyncio.CancelledError)
+    assert results[2:] == ["free on day 2", "free on day 3"], results
+    assert batch_sizes(pool) == [3], batch_sizes(pool)
+    print("cancelled callers: the others still get their results")
+
+
+async def check_short_batch():
+    pool = StubPool(drop_last_result=True)
+    coalescer = BatchCoalescer(pool, window=WINDOW)
+    results = await asyncio.wait_for(
+        asyncio.gather(*[coalescer.call(TOOL, {"day": f"day {i}"}) for i in range(3)], return_exceptions=True),
+        timeout=1,
+    )
+    assert results[:2] == ["free on day 0", "free on day 1"], results
+    assert isinstance(results[2], RuntimeError), results
+    print(f"short batch: unmatched caller failed with {results[2]}")
+
+
+async def main():
+    await check_window()
+    await check_early_flush()
+    await check_cancelled_callers()
+    await check_short_batch()
+    print("OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,130 @@
+"""Compare per-call latency for the email tools MCP server.
+
+- cold: spawn a server process and open a session for every call
+- warm stdio: MCPSessionPool keeping server processes alive
+- http: MCPSessionPool against one streamable-HTTP server process
+
+Then restarts the HTTP server under an open pool and checks that the next call
+and health_check() reconnect instead of failing.
+
+Run from the project root: python -m benchmarks.mcp_sessions
+"""
+
+import asyncio
+import statistics
+import subprocess
+import sys
+import time
+
+from mcp import ClientSession
+from mcp.client.stdio import stdio_client
+
+from utils.mcp_pool import EMAIL_TOOLS_SERVER, MCPSessionPool
+
+NUM_CALLS = 50
+CONCURRENCY = 10
+HTTP_PORT = 8765
+TOOL_NAME = "check_calendar_availability"
+TOOL_ARGS = {"day": "tomorrow"}
+
+
+def report(label: str, latencies: list[float]):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:<12} mean {statistics.mean(latencies) * 1000:8.1f}ms   p95 {p95 * 1000:8.1f}ms")
+
+
+async def timed(coro_factory) -> float:
+    started = time.perf_counter()
+    await coro_factory()
+    return time.perf_counter() - started
+
+
+async def bench_cold() -> list[float]:
+    server_params = MCPSessionPool.for_email_tools().server_params
+
+    async def call():
+        async with stdio_client(server_params) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                await session.list_tools()
+                await session.call_tool(TOOL_NAME, TOOL_ARGS)
+
+    # Cold spawns are slow; a handful is enough for a stable mean
+    return [await timed(call) for _ in range(max(NUM_CALLS // 10, 3))]
+
+
+async def bench_pool(pool: MCPSessionPool) -> list[float]:
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def call():
+        async with semaphore:
+            return await timed(lambda: pool.call_tool(TOOL_NAME, TOOL_ARGS))
+
+    async with pool:
+        return await asyncio.gather(*(call() for _ in range(NUM_CALLS)))
+
+
+async def wait_for_port(port: int, timeout: float = 15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise TimeoutError(f"MCP HTTP server did not start on port {port}")
+
+
+def start_http_server() -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-u", str(EMAIL_TOOLS_SERVER), "--http", "--port", str(HTTP_PORT)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def check_reconnect():
+    """Restart the server under an open pool and check the sessions reconnect."""
+    servers = [start_http_server()]
+    try:
+        await wait_for_port(HTTP_PORT)
+        async with MCPSessionPool(
+            transport="streamable_http", url=f"http://127.0.0.1:{HTTP_PORT}/mcp", size=2
+        ) as pool:
+            await pool.call_tool(TOOL_NAME, TOOL_ARGS)
+            servers[0].terminate()
+            servers[0].wait()
+            servers.append(start_http_server())
+            await wait_for_port(HTTP_PORT)
+            # The call replaces the session it landed on, health_check the other
+            result = await pool.call_tool(TOOL_NAME, TOOL_ARGS)
+            assert not result.isError
+            replaced = 1 + await pool.health_check()
+    finally:
+        for server in servers:
+            server.terminate()
+            server.wait()
+    print(f"reconnect    {replaced} of 2 sessions replaced after a server restart")
+    assert replaced == 2, replaced
+
+
+async def main():
+    report("cold", await bench_cold())
+    report("warm stdio", await bench_pool(MCPSessionPool.for_email_tools(size=2)))
+
+    server = start_http_server()
+    try:
+        await wait_for_port(HTTP_PORT)
+        pool = MCPSessionPool(transport="streamable_http", url=f"http://127.0.0.1:{HTTP_PORT}/mcp", size=2)
+        report("http", await bench_pool(pool))
+    finally:
+        server.terminate()
+        server.wait()
+
+    await check_reconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""Show the shared rate limiter holding its configured rate against a simulated provider.
+
+A fake provider enforces its own requests-per-minute window and returns 429
+when it is exceeded. 300 concurrent callers share one TokenBucketRateLimiter
+configured under the provider limit; the achieved rate should track the
+configured rate with no 429s. A second check reconciles a call whose
+estimate was clamped to the token bucket's capacity and expects the refund to
+be based on what was actually charged.
+
+Run from the project root: python -m benchmarks.rate_limiter
+"""
+
+import asyncio
+import time
+from collections import deque
+
+from utils.rate_limiter import TokenBucketRateLimiter, _estimated_tokens
+
+PROVIDER_RPM = 600
+LIMITER_RPM = 480
+NUM_CALLS = 300
+SIMULATED_LATENCY = 0.05
+
+
+class SimulatedProvider:
+    """Returns 429 when more than rpm/6 requests land in any rolling 10 seconds."""
+
+    def __init__(self, rpm: int):
+        self.rpm = rpm
+        self.window = deque()
+        self.rate_limited = 0
+
+    async def call(self):
+        now = time.monotonic()
+        while self.window and now - self.window[0] > 10:
+            self.window.popleft()
+        if len(self.window) >= self.rpm / 6:
+            self.rate_limited += 1
+            raise RuntimeError("429 rate limit exceeded")
+        self.window.append(now)
+        await asyncio.sleep(SIMULATED_LATENCY)
+
+
+async def main():
+    provider = SimulatedProvider(PROVIDER_RPM)
+    limiter = TokenBucketRateLimiter("simulated", requests_per_minute=LIMITER_RPM, burst_seconds=2)
+    admitted_at = []
+
+    async def caller():
+        while True:
+            await limiter.aacquire()
+            try:
+                await provider.call()
+                admitted_at.append(time.monotonic())
+                limiter.on_success()
+                return
+            except RuntimeError:
+                limiter.on_rate_limited()
+
+    started = time.monotonic()
+    await asyncio.gather(*(caller() for _ in range(NUM_CALLS)))
+    elapsed = time.monotonic() - started
+
+    # Steady-state rate, excluding the initial burst allowance
+    burst = int(limiter.requests.capacity)
+    steady = sorted(admitted_at)[burst:]
+    steady_rpm = (len(steady) - 1) / (steady[-1] - steady[0]) * 60
+    print(f"{NUM_CALLS} calls in {elapsed:.1f}s")
+    print(f"configured {LIMITER_RPM} rpm, achieved steady-state {steady_rpm:.0f} rpm")
+    print(f"provider 429s: {provider.rate_limited}")
+
+
+def check_reconcile():
+    limiter = TokenBucketRateLimiter("simulated", requests_per_minute=0, tokens_per_minute=6_000)
+    capacity = limiter.tokens.capacity  # 1,000 tokens
+    _estimated_tokens.set(("run", 5_000))
+    limiter.acquire()
+    limiter.reconcile("run", 400)
+    # 1,000 charged, 400 used: 600 back, not the 4,600 the estimate would give
+    level = limiter.tokens.level
+    print(f"bucket after clamped call using 400 tokens: {level:.0f}/{capacity:.0f}")
+    assert abs(level - (capacity - 400)) < 5, level
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
+    check_reconcile()
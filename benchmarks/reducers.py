@@ -0,0 +1,63 @@
+"""Reducer cost against history length for the research state lists.
+
+Simulates a state key receiving one small update per step (e.g. a tool
+result appended to researcher_messages) and reports, per update:
+
+- override_reducer, which copies the list on every append;
+- an in-place list.extend, the floor any append-efficient structure could
+  reach;
+- serializing the whole value the way the checkpointer does after each
+  step, which every reducer pays regardless of how it appends.
+
+Run from the project root: python -m benchmarks.reducers
+"""
+
+import time
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from agents.researcher.models import override_reducer
+
+HISTORY_LENGTHS = [100, 1_000, 5_000, 20_000]
+ITEMS_PER_UPDATE = 2
+ITEM = "Tool result: " + "x" * 200
+
+
+def extend_in_place(current_value, new_value):
+    current_value.extend(new_value)
+    return current_value
+
+
+def per_update(reducer, length: int) -> float:
+    """Average seconds per update to build a history of the given length."""
+    value = []
+    updates = length // ITEMS_PER_UPDATE
+    started = time.perf_counter()
+    for _ in range(updates):
+        value = reducer(value, [ITEM] * ITEMS_PER_UPDATE)
+    elapsed = time.perf_counter() - started
+    assert len(value) == length
+    return elapsed / updates
+
+
+def serialize_once(serde: JsonPlusSerializer, length: int) -> float:
+    """Seconds to serialize a history of the given length once."""
+    value = [ITEM] * length
+    started = time.perf_counter()
+    serde.dumps_typed(value)
+    return time.perf_counter() - started
+
+
+def main():
+    serde = JsonPlusSerializer()
+    print(f"{'history':>8}   {'override_reducer':>16}   {'list.extend':>11}   {'checkpoint write':>16}")
+    for length in HISTORY_LENGTHS:
+        print(
+            f"{length:>8,}   {per_update(override_reducer, length) * 1e6:>14.2f}us   "
+            f"{per_update(extend_in_place, length) * 1e6:>9.2f}us   "
+            f"{serialize_once(serde, length) * 1e6:>14.2f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
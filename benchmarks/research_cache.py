@@ -0,0 +1,95 @@
+"""Hit rate and saved compute of the cross-run research cache.
+
+Replays several runs whose ConductResearch topics repeat (verbatim, reworded
+in case/punctuation, or lightly paraphrased) against a stub researcher that
+sleeps for a fixed time per unit, once with exact-fingerprint matching and
+once with a near-duplicate threshold. Uses a temporary cache file.
+
+Also checks that entries older than RESEARCH_CACHE_MAX_AGE are researched
+again, and that runs of different users never see each other's entries.
+
+Run from the project root: python -m benchmarks.research_cache
+"""
+
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import agents.researcher.graph as research_graph
+import utils.research_cache as research_cache
+
+UNIT_SECONDS = 0.2
+
+RUNS = [
+    ["Recent advances in solid-state battery electrolytes", "Market share of EV makers in Europe in 2024"],
+    ["recent advances in solid state battery electrolytes!", "Market share of EV makers in Europe, 2024"],
+    ["Recent advances in solid-state battery electrolytes and anodes", "EV makers' market share in Europe in 2024"],
+]
+
+
+class StubResearcher:
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, inputs, config=None):
+        self.calls += 1
+        await asyncio.sleep(UNIT_SECONDS)
+        return {"compressed_research": f"findings on {inputs['research_topic']}", "raw_notes": ["raw"]}
+
+
+async def replay(similarity):
+    research_graph.RESEARCH_CACHE_SIMILARITY = similarity
+    with tempfile.TemporaryDirectory() as tmp:
+        research_cache._research_cache = research_cache.ResearchCache(Path(tmp) / "cache.sqlite3")
+        semaphore = asyncio.Semaphore(research_graph.MAX_CONCURRENT_RESEARCH_UNITS)
+        started = time.perf_counter()
+        for topics in RUNS:
+            await asyncio.gather(*(research_graph.run_research_unit(topic, {}, semaphore) for topic in topics))
+        elapsed = time.perf_counter() - started
+        stats = research_cache.get_research_cache().stats()
+    label = "exact" if similarity is None else f"similarity {similarity}"
+    print(f"{label:<16} hit rate {stats['hit_rate']:.0%} ({stats['hits']}/{stats['lookups']}, "
+          f"{stats['near_duplicate_hits']} near-duplicate)   saved {stats['saved_seconds']:.2f}s   wall {elapsed:.2f}s")
+
+
+async def check_max_age_and_scope():
+    research_graph.RESEARCH_CACHE_SIMILARITY = None
+    research_graph.RESEARCH_CACHE_MAX_AGE = 0.5
+    topic = RUNS[0][0]
+    alice = {"configurable": {"user_id": "alice"}}
+    bob = {"configurable": {"user_id": "bob"}}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            research_cache._research_cache = research_cache.ResearchCache(Path(tmp) / "cache.sqlite3")
+            semaphore = asyncio.Semaphore(research_graph.MAX_CONCURRENT_RESEARCH_UNITS)
+            stub = research_graph.researcher_subgraph = StubResearcher()
+
+            await research_graph.run_research_unit(topic, alice, semaphore)
+            fresh, _ = await research_graph.run_research_unit(topic, alice, semaphore)
+            assert "research_cache" in fresh and stub.calls == 1, "a fresh entry was not reused"
+
+            other_user, _ = await research_graph.run_research_unit(topic, bob, semaphore)
+            assert "research_cache" not in other_user and stub.calls == 2, "another user's entry was reused"
+
+            await asyncio.sleep(research_graph.RESEARCH_CACHE_MAX_AGE)
+            expired, _ = await research_graph.run_research_unit(topic, alice, semaphore)
+            assert "research_cache" not in expired and stub.calls == 3, "an entry past RESEARCH_CACHE_MAX_AGE was reused"
+    finally:
+        research_graph.RESEARCH_CACHE_MAX_AGE = None
+    print("max age and scope: expired entries and other users' entries are researched again")
+
+
+async def main():
+    research_graph.researcher_subgraph = StubResearcher()
+    research_graph.RESEARCH_CACHE = True
+    research_graph.OFFLOAD_RESEARCH_BLOBS = False
+    print(f"{len(RUNS)} runs x {len(RUNS[0])} topics, {UNIT_SECONDS}s per uncached unit")
+    await replay(None)
+    await replay(0.6)
+    await check_max_age_and_scope()
+    print("OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+"""Time-to-first-finding and supervisor wait for the research fan-out.
+
+Replaces the researcher subgraph with a stub whose units have skewed
+latencies, then runs supervisor_tools on one supervisor turn with five
+ConductResearch calls. Reports when the first finding was streamed and when
+the supervisor could resume, with and without RESEARCH_QUORUM.
+
+Also checks that a straggler left running at quorum writes nothing to the
+stream after supervisor_tools returns: its events are buffered and emitted
+when a later supervisor_tools collects it, and a new run on the thread
+cancels it.
+
+Run from the project root: python -m benchmarks.research_fanout
+"""
+
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage
+
+import agents.researcher.events as research_events
+import agents.researcher.fanout as research_fanout
+import agents.researcher.graph as research_graph
+
+UNIT_LATENCIES = [0.2, 0.3, 0.4, 0.5, 3.0]
+
+
+class StubResearcher:
+    """Stands in for researcher_subgraph; latency is looked up by topic."""
+
+    async def ainvoke(self, inputs, config=None):
+        await asyncio.sleep(float(inputs["research_topic"]))
+        # Like a tool timeout inside the researcher, streamed from the unit's task
+        research_events.emit_stream_event({"type": "unit_progress", "research_topic": inputs["research_topic"]})
+        return {"compressed_research": f"findings after {inputs['research_topic']}s", "raw_notes": []}
+
+
+def supervisor_state():
+    tool_calls = [
+        {"name": "ConductResearch", "args": {"research_topic": str(latency)}, "id": f"call_{i}"}
+        for i, latency in enumerate(UNIT_LATENCIES)
+    ]
+    return {
+        "supervisor_messages": [AIMessage(content="", tool_calls=tool_calls)],
+        "research_iterations": 1,
+    }
+
+
+def record_stream(started: float) -> list:
+    """Route custom stream events into a list of (seconds since start, event)."""
+    events = []
+    research_events.get_stream_writer = lambda: lambda event: events.append((time.perf_counter() - started, event))
+    return events
+
+
+async def run(quorum, run_id: str):
+    research_graph.RESEARCH_QUORUM = quorum
+    started = time.perf_counter()
+    events = record_stream(started)
+    config = {"configurable": {"thread_id": "bench", "run_id": run_id}}
+
+    command = await research_graph.supervisor_tools(supervisor_state(), config)
+    resumed = time.perf_counter() - started
+    findings = [at for at, event in events if event["type"] == "research_unit_complete"]
+    label = "all units" if quorum is None else f"quorum {quorum}"
+    print(f"{label:<12} first finding {findings[0]:.2f}s   supervisor resumes {resumed:.2f}s")
+    return command, events, config
+
+
+async def check_detached_events():
+    command, events, config = await run(0.6, "quorum-run")
+    pending = command.update["pending_research"]
+    assert pending, "no unit was left running at quorum"
+    written = len(events)
+
+    # The stragglers finish while no node is running: nothing reaches the stream
+    await asyncio.sleep(max(UNIT_LATENCIES) + 0.1)
+    assert len(events) == written, [event for _, event in events[written:]]
+
+    # The next supervisor_tools emits their buffered events when it collects them
+    late_messages, _, still_pending = await research_fanout.collect_late_research(config, pending, wait=False)
+    flushed = [event for _, event in events[written:] if event["type"] == "unit_progress"]
+    assert len(late_messages) == len(pending) and not still_pending
+    assert len(flushed) == len(pending), flushed
+    print(f"detached stragglers: 0 events while detached, {len(flushed)} emitted on collection")
+
+    # A new run on the thread cancels what the previous run left behind
+    await run(0.6, "earlier-run")
+    research_fanout.cancel_other_runs_research({"configurable": {"thread_id": "bench", "run_id": "next-run"}})
+    assert not research_fanout._background_research, research_fanout._background_research
+    print("new run: leftover stragglers of the earlier run cancelled")
+
+
+async def main():
+    research_graph.researcher_subgraph = StubResearcher()
+    # Both runs use the same topics; measure the fan-out, not the cross-run cache
+    research_graph.RESEARCH_CACHE = False
+    print(f"unit latencies: {UNIT_LATENCIES} (asyncio.gather would surface nothing before {max(UNIT_LATENCIES):.2f}s)")
+    await run(None, "all-units-run")
+    await check_detached_events()
+    print("OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,175 @@
+"""Check how research copes with hanging or failing tools and research units, using stubs.
+
+- a researcher turn with one fast and one hanging search: the hanging call
+  is cancelled after TOOL_CALL_TIMEOUT_SECONDS and reported as an error
+  ToolMessage, and the researcher finishes with the fast result
+- a supervisor step with one hanging research unit: the unit is cancelled
+  after RESEARCH_UNIT_TIMEOUT_SECONDS, the supervisor is told it timed out,
+  and the other units' findings are kept
+- the same step under a research budget that runs out: the step returns by
+  the deadline and the research phase ends
+- a supervisor step with a unit that fails once and one that always fails:
+  with RESEARCH_UNIT_RETRIES the first succeeds on its retry, the other is
+  reported as failed, and the successful units' findings are kept either way
+
+Run from the project root: python -m benchmarks.research_fault_tolerance
+"""
+
+import asyncio
+import time
+from collections import Counter
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+
+import agents.researcher.events as research_events
+import agents.researcher.graph as research_graph
+from agents.researcher.events import timeout_stats
+
+DEADLINE = 0.3
+HANG_SECONDS = 30
+
+
+class StubResearcher:
+    """Stands in for researcher_subgraph; "hang" never finishes in time, "flaky" fails once, "broken" always."""
+
+    def __init__(self):
+        self.calls = Counter()
+
+    async def ainvoke(self, inputs, config=None):
+        topic = inputs["research_topic"]
+        self.calls[topic] += 1
+        await asyncio.sleep(HANG_SECONDS if topic == "hang" else 0.05)
+        if topic == "broken" or (topic == "flaky" and self.calls[topic] == 1):
+            raise RuntimeError(f"search backend unavailable for {topic}")
+        return {"compressed_research": f"findings on {topic}", "raw_notes": [f"raw {topic}"]}
+
+
+def supervisor_state(topics: list[str], deadline=None):
+    tool_calls = [
+        {"name": "ConductResearch", "args": {"research_topic": topic}, "id": f"call_{topic}"}
+        for topic in topics
+    ]
+    return {
+        "supervisor_messages": [AIMessage(content="", tool_calls=tool_calls)],
+        "research_iterations": 1,
+        "research_deadline": deadline,
+    }
+
+
+def record_stream() -> list:
+    events = []
+    research_events.get_stream_writer = lambda: events.append
+    return events
+
+
+async def check_tool_timeout():
+    @tool
+    async def search(query: str) -> str:
+        """Search the web."""
+        await asyncio.sleep(HANG_SECONDS if query == "slow" else 0)
+        return f"results for {query}"
+
+    class StubModel:
+        async def ainvoke(self, messages, config=None):
+            if len(messages) > 2:
+                return AIMessage(content="compressed findings")
+            return AIMessage(content="", tool_calls=[
+                {"name": "search", "args": {"query": query}, "id": f"call-{query}"} for query in ("fast", "slow")
+            ])
+
+    model = StubModel()
+    research_graph.get_all_tools = lambda search_api: asyncio.sleep(0, [search])
+    research_graph.get_bound_model = lambda tools=None, schema=None: model
+    research_graph.get_model = lambda: model
+    research_graph.MAX_REACT_TOOL_CALLS = 1
+    research_graph.TOOL_CALL_TIMEOUT_SECONDS = DEADLINE
+    before = timeout_stats["tool_calls"]
+
+    started = time.perf_counter()
+    # The real researcher; researcher_subgraph is the stub for the supervisor checks
+    output = await research_graph.researcher_builder.compile().ainvoke(
+        {"researcher_messages": [HumanMessage(content="a topic")], "research_topic": "a topic"}
+    )
+    elapsed = time.perf_counter() - started
+    assert output["compressed_research"] == "compressed findings", output
+    assert "results for fast" in output["raw_notes"][0] and "timed out" in output["raw_notes"][0]
+    assert timeout_stats["tool_calls"] == before + 1 and elapsed < DEADLINE + 1, elapsed
+    print(f"tool timeout: hanging search cancelled, researcher finished in {elapsed:.2f}s")
+
+
+async def check_unit_timeout():
+    research_graph.RESEARCH_UNIT_TIMEOUT_SECONDS = DEADLINE
+    events = record_stream()
+    started = time.perf_counter()
+    command = await research_graph.supervisor_tools(
+        supervisor_state(["fast", "hang"]), {"configurable": {"thread_id": "bench-unit-timeout"}}
+    )
+    elapsed = time.perf_counter() - started
+    research_graph.RESEARCH_UNIT_TIMEOUT_SECONDS = None
+
+    fast, hang = command.update["supervisor_messages"]
+    assert fast.status == "success" and fast.content == "findings on fast"
+    assert hang.status == "error" and "timed out" in hang.content, hang
+    assert command.goto == "supervisor" and elapsed < DEADLINE + 1, elapsed
+    assert any(event["type"] == "timeout" and event["kind"] == "research_units" for event in events)
+    print(f"unit timeout: hanging unit reported as timed out after {elapsed:.2f}s, other findings kept")
+
+
+async def check_research_budget():
+    started = time.perf_counter()
+    command = await research_graph.supervisor_tools(
+        supervisor_state(["fast", "hang"], deadline=time.time() + DEADLINE),
+        {"configurable": {"thread_id": "bench-budget"}},
+    )
+    elapsed = time.perf_counter() - started
+    assert command.goto == "__end__" and elapsed < DEADLINE + 1, (command.goto, elapsed)
+    assert "findings on fast" in command.update["notes"]
+    print(f"research budget: step returned after {elapsed:.2f}s and ended the research phase")
+
+
+async def run_failing_units(retries: int):
+    stub = research_graph.researcher_subgraph = StubResearcher()
+    research_graph.RESEARCH_UNIT_RETRIES = retries
+    research_graph.RESEARCH_UNIT_RETRY_BACKOFF_SECONDS = 0.01
+    events = record_stream()
+    command = await research_graph.supervisor_tools(
+        supervisor_state(["fast", "flaky", "broken"]), {"configurable": {"thread_id": f"bench-retries-{retries}"}}
+    )
+    research_graph.RESEARCH_UNIT_RETRIES = 0
+    messages = {message.tool_call_id: message for message in command.update["supervisor_messages"]}
+    failed = sorted(event["tool_call_id"] for event in events if event["type"] == "research_unit_failed")
+    return stub, command, messages, failed
+
+
+async def check_failing_units():
+    stub, command, messages, failed = await run_failing_units(retries=1)
+    assert command.goto == "supervisor"
+    assert messages["call_fast"].status == "success" and messages["call_flaky"].status == "success"
+    assert messages["call_broken"].status == "error" and "RuntimeError" in messages["call_broken"].content
+    assert stub.calls == {"fast": 1, "flaky": 2, "broken": 2}, stub.calls
+    assert failed == ["call_broken"], failed
+    assert command.update["notes"] == ["findings on fast", "findings on flaky"], command.update["notes"]
+    assert command.update["raw_notes"] == ["raw fast\nraw flaky"], command.update["raw_notes"]
+    print(f"failing units, 1 retry: flaky unit recovered, broken unit reported failed ({dict(stub.calls)} calls)")
+
+    stub, command, messages, failed = await run_failing_units(retries=0)
+    assert messages["call_fast"].status == "success"
+    assert failed == ["call_broken", "call_flaky"], failed
+    assert command.update["notes"] == ["findings on fast"], command.update["notes"]
+    print("failing units, no retries: both reported failed, the successful unit's findings kept")
+
+
+async def main():
+    research_graph.researcher_subgraph = StubResearcher()
+    research_graph.RESEARCH_CACHE = False
+    research_graph.OFFLOAD_RESEARCH_BLOBS = False
+    await check_unit_timeout()
+    await check_research_budget()
+    await check_failing_units()
+    await check_tool_timeout()
+    print("OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
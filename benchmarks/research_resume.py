@@ -0,0 +1,127 @@
+"""Fault injection: kill a research fan-out mid-way, then resume it from checkpoints.
+
+Swaps the researcher subgraph for a stub graph with the same state schema
+and two steps per unit (search, compress) that sleep instead of calling
+models. One supervisor step with three ConductResearch calls runs with
+DURABLE_RESEARCH_UNITS and a temporary SQLite checkpoint file in a child
+process, which is killed (SIGKILL) once the two fast units have finished
+and the slow one is halfway. The same supervisor step then runs again.
+
+Expected: the finished units are not re-run, the slow unit only re-runs
+its compress step, no per-unit checkpoints are left afterwards, and the
+units see the parent's configurable keys (here a user id).
+
+Requires the durable extra: uv sync --extra durable.
+Run from the project root: python -m benchmarks.research_resume
+"""
+
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import END, START, StateGraph
+
+import agents.researcher.graph as research_graph
+from agents.researcher.models import ResearcherOutputState, ResearcherState
+from utils.checkpointing import get_sqlite_checkpointer, sqlite_checkpointers
+
+UNIT_LATENCIES = {"fast-a": 0.2, "fast-b": 0.4, "slow": 4.0}
+THREAD_ID = "research-resume-demo"
+USER_ID = "demo-user"
+
+
+def stub_researcher_builder(log_path: Path):
+    def step(name):
+        async def run(state: ResearcherState, config: RunnableConfig):
+            topic = state["research_topic"]
+            user_id = config["configurable"].get("user_id")
+            await asyncio.sleep(UNIT_LATENCIES[topic] / 2)
+            with open(log_path, "a") as log:
+                log.write(f"{name} {topic}\n")
+            if name == "compress":
+                return {"compressed_research": f"findings on {topic} for {user_id}", "raw_notes": [f"raw {topic}"]}
+            return {}
+        return run
+
+    builder = StateGraph(ResearcherState, output_schema=ResearcherOutputState)
+    builder.add_node("search", step("search"))
+    builder.add_node("compress", step("compress"))
+    builder.add_edge(START, "search")
+    builder.add_edge("search", "compress")
+    builder.add_edge("compress", END)
+    return builder
+
+
+def run_supervisor_step(log_path: Path):
+    research_graph.researcher_builder = stub_researcher_builder(log_path)
+    research_graph.DURABLE_RESEARCH_UNITS = True
+    research_graph.RESEARCH_CACHE = False
+    research_graph.OFFLOAD_RESEARCH_BLOBS = False
+    research_graph.TOPIC_MERGE_SIMILARITY = None
+
+    tool_calls = [
+        {"name": "ConductResearch", "args": {"research_topic": topic}, "id": f"call_{topic}"}
+        for topic in UNIT_LATENCIES
+    ]
+    state = {"supervisor_messages": [AIMessage(content="", tool_calls=tool_calls)], "research_iterations": 1}
+    config = {"configurable": {"thread_id": THREAD_ID, "user_id": USER_ID}}
+
+    async def run():
+        async with sqlite_checkpointers():
+            return await research_graph.supervisor_tools(state, config)
+
+    return asyncio.run(run())
+
+
+async def leftover_unit_checkpoints() -> int:
+    async with sqlite_checkpointers():
+        checkpointer = await get_sqlite_checkpointer()
+        threads = {
+            checkpoint.config["configurable"]["thread_id"]
+            async for checkpoint in checkpointer.alist(None)
+        }
+    return len(threads)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["RESEARCH_CHECKPOINT_PATH"] = str(Path(tmp) / "checkpoints.sqlite3")
+        log_path = Path(tmp) / "steps.log"
+        log_path.touch()
+
+        child = multiprocessing.get_context("spawn").Process(target=run_supervisor_step, args=(log_path,))
+        child.start()
+        # Kill once both fast units are done and the slow unit has finished searching
+        while log_path.read_text().count("\n") < 5:
+            time.sleep(0.02)
+        time.sleep(0.2)  # let the search step's checkpoint land
+        child.kill()
+        child.join()
+        first_run = Counter(log_path.read_text().splitlines())
+        print(f"killed child mid fan-out after: {sorted(first_run)}")
+
+        log_path.write_text("")
+        started = time.perf_counter()
+        result = run_supervisor_step(log_path)
+        resumed = Counter(log_path.read_text().splitlines())
+        print(f"resumed in {time.perf_counter() - started:.2f}s; steps re-run: {sorted(resumed) or 'none'}")
+        print(f"notes after resume: {result.update['notes']}")
+
+        leftover = asyncio.run(leftover_unit_checkpoints())
+        print(f"unit checkpoint threads left: {leftover}")
+
+        expected = Counter({"compress slow": 1})
+        kept_config = all(note.endswith(f"for {USER_ID}") for note in result.update["notes"])
+        ok = resumed == expected and leftover == 0 and kept_config
+        print("OK: only unfinished work re-ran" if ok else
+              f"UNEXPECTED: re-ran {resumed}, {leftover} threads left, configurable kept: {kept_config}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Research unit throughput against worker process count on the durable task queue.
+
+Enqueues NUM_UNITS stub research units and drains them with 1, 2 and 4
+worker processes (one unit at a time each). The stub stands in for a
+researcher whose work holds its process: a blocking model/search client
+call plus a little CPU-bound parsing, with no real model calls.
+
+Timing starts once every worker has started and reported ready (process
+spawn and imports are excluded) and ends when the last unit is marked done
+in the queue. Each worker count drains enough units for the blocking wait
+to dominate, so units per second should grow close to linearly with the
+worker count; the run fails if 4 workers are not at least MIN_SPEEDUP
+times faster than one.
+
+Run from the project root: python -m benchmarks.research_workers
+"""
+
+import asyncio
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from agents.researcher.worker import RESEARCH_UNIT_TASK, start_workers
+from utils.task_queue import TaskQueue
+
+NUM_UNITS = 80
+BLOCKING_SECONDS = 0.1
+CPU_SECONDS = 0.005
+WORKER_COUNTS = [1, 2, 4]
+MIN_SPEEDUP = 2.5  # for 4 workers over 1
+
+
+async def stub_research_task(payload: dict) -> dict:
+    time.sleep(BLOCKING_SECONDS)  # blocking client call; holds the worker's event loop
+    deadline = time.perf_counter() + CPU_SECONDS
+    while time.perf_counter() < deadline:
+        pass
+    return {"compressed_research": f"findings on {payload['research_topic']}", "raw_notes": []}
+
+
+async def drain(queue_path: Path, num_workers: int) -> float:
+    queue = TaskQueue(queue_path)
+    task_ids = [
+        queue.enqueue(RESEARCH_UNIT_TASK, {"research_topic": f"topic {i}", "thread_id": "bench", "unit_id": str(i)})
+        for i in range(NUM_UNITS)
+    ]
+    ready = multiprocessing.get_context("spawn").Barrier(num_workers + 1)
+    processes = start_workers(
+        num_workers, queue_path, concurrency=1, handler=stub_research_task, stop_when_idle=True, ready=ready
+    )
+    await asyncio.to_thread(ready.wait)
+    started = time.time()
+    await asyncio.gather(*(queue.wait(task_id) for task_id in task_ids))
+    # The queue records when each unit finished; wait's polling delay is not counted
+    finished = max(queue.get(task_id)["updated_at"] for task_id in task_ids)
+    for process in processes:
+        process.join()
+    return finished - started
+
+
+async def main():
+    print(f"{NUM_UNITS} units, {BLOCKING_SECONDS}s blocking + {CPU_SECONDS}s CPU each")
+    throughputs = {}
+    for num_workers in WORKER_COUNTS:
+        with tempfile.TemporaryDirectory() as tmp:
+            elapsed = await drain(Path(tmp) / "queue.sqlite3", num_workers)
+        throughputs[num_workers] = NUM_UNITS / elapsed
+        speedup = throughputs[num_workers] / throughputs[WORKER_COUNTS[0]]
+        print(f"{num_workers} worker(s): {elapsed:.2f}s  {throughputs[num_workers]:.1f} units/s  ({speedup:.1f}x)")
+
+    speedup = throughputs[4] / throughputs[1]
+    assert speedup >= MIN_SPEEDUP, f"4 workers are only {speedup:.1f}x faster than one"
+    print("OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
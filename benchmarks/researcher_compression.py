@@ -0,0 +1,117 @@
+"""Check incremental compression of researcher messages in a real researcher loop.
+
+Runs the researcher subgraph with a scripted model that makes two parallel
+searches (and a think_tool call every other turn) on each turn, and a stub
+search tool that returns new pages. Every prompt the model receives is
+checked the way the provider API checks it:
+
+- each ToolMessage directly follows (with only other ToolMessages in
+  between) the AIMessage whose tool call it answers
+- each tool call of an AIMessage is answered before the next non-tool message
+
+With INCREMENTAL_COMPRESSION on, older turns are folded into a running
+summary several times during the run; the check reports the folds and the
+largest and total researcher prompt sizes with and without folding.
+
+Run from the project root: python -m benchmarks.researcher_compression
+"""
+
+import asyncio
+import itertools
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.tools import tool
+
+import agents.researcher.graph as research_graph
+from agents.researcher.utils import think_tool
+
+PAGE_WORDS = 300
+CONTEXT_TOKEN_THRESHOLD = 3000
+
+
+def check_tool_call_pairing(messages: list):
+    """Raise if a ToolMessage is orphaned or a tool call is left unanswered."""
+    open_calls, turn = set(), None
+    for index, message in enumerate(messages):
+        if isinstance(message, ToolMessage):
+            assert turn is not None, f"ToolMessage {index} does not follow an AIMessage"
+            assert message.tool_call_id in open_calls, f"ToolMessage {index} answers no open tool call"
+            open_calls.remove(message.tool_call_id)
+            continue
+        assert not open_calls, f"tool calls {open_calls} unanswered before message {index}"
+        turn = message if isinstance(message, AIMessage) else None
+        open_calls = {tool_call["id"] for tool_call in turn.tool_calls} if turn is not None else set()
+    assert not open_calls, f"tool calls {open_calls} unanswered at the end of the prompt"
+
+
+class StubModel:
+    """Searches on every researcher turn; answers summary and compression prompts with short text."""
+
+    def __init__(self):
+        self.turns = itertools.count()
+        self.folds = 0
+        self.prompt_tokens = []
+
+    async def ainvoke(self, messages, config=None):
+        check_tool_call_pairing(messages)
+        if not isinstance(messages[0], SystemMessage):
+            # incremental_compression_prompt: fold older messages into a summary
+            self.folds += 1
+            return AIMessage(content=f"summary {self.folds} of the findings so far")
+        if isinstance(messages[-1], HumanMessage) and len(messages) > 2:
+            # compress_research
+            return AIMessage(content="compressed findings")
+        self.prompt_tokens.append(count_tokens_approximately(messages))
+        turn = next(self.turns)
+        tool_calls = [
+            {"name": "search", "args": {"query": f"query {turn}-{i}"}, "id": f"call-{turn}-{i}"}
+            for i in range(2)
+        ]
+        if turn % 2:
+            tool_calls.append({"name": "think_tool", "args": {"reflection": f"turn {turn}"}, "id": f"think-{turn}"})
+        return AIMessage(content="", tool_calls=tool_calls)
+
+
+@tool
+def search(query: str) -> str:
+    """Search the web."""
+    return " ".join(f"{query.replace(' ', '-')}-word{i}" for i in range(PAGE_WORDS))
+
+
+async def run(incremental: bool) -> StubModel:
+    research_graph.INCREMENTAL_COMPRESSION = incremental
+    model = StubModel()
+    research_graph.get_bound_model = lambda tools=None, schema=None: model
+    research_graph.get_model = lambda: model
+    output = await research_graph.researcher_subgraph.ainvoke(
+        {"researcher_messages": [HumanMessage(content="a topic")], "research_topic": "a topic"}
+    )
+    assert output["compressed_research"] == "compressed findings"
+    return model
+
+
+async def main():
+    tools = [search, think_tool]
+    research_graph.get_all_tools = lambda search_api: asyncio.sleep(0, tools)
+    research_graph.OFFLOAD_RESEARCH_BLOBS = False
+    research_graph.NOVELTY_THRESHOLD = None
+    research_graph.RESEARCHER_CONTEXT_TOKEN_THRESHOLD = CONTEXT_TOKEN_THRESHOLD
+
+    results = {}
+    for incremental in (False, True):
+        model = await run(incremental)
+        results[incremental] = model
+        label = "folding" if incremental else "no folding"
+        print(f"{label:<11} {len(model.prompt_tokens)} researcher turns, {model.folds} folds, "
+              f"largest prompt {max(model.prompt_tokens):>6,} tokens, total {sum(model.prompt_tokens):>7,} tokens")
+
+    assert results[False].folds == 0
+    assert results[True].folds >= 2, "the researcher context was never folded twice"
+    assert max(results[True].prompt_tokens) < max(results[False].prompt_tokens) / 2
+    print("every prompt kept each tool call paired with its ToolMessage")
+    print("OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
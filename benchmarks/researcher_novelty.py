@@ -0,0 +1,93 @@
+"""Check the researcher's low-novelty stop in a real researcher loop with a stub model.
+
+Runs the researcher subgraph with a scripted model that searches on every
+turn and a stub search tool, and reports how many tool call iterations each
+run used and why it stopped:
+
+- searches that keep returning the same pages stop the researcher after
+  NOVELTY_PATIENCE low-novelty steps
+- searches that return new pages every time run to MAX_REACT_TOOL_CALLS
+- searches that keep failing are not low novelty (the repeated error text
+  is not evidence) and also run to MAX_REACT_TOOL_CALLS
+- with NOVELTY_THRESHOLD = None (the default) the stop never fires
+
+Run from the project root: python -m benchmarks.researcher_novelty
+"""
+
+import asyncio
+import itertools
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+
+import agents.researcher.graph as research_graph
+from agents.researcher.novelty import researcher_stop_stats
+from agents.researcher.utils import think_tool
+
+PAGE_WORDS = 200
+
+
+class StubModel:
+    """Calls the search tool with a new query every turn; answers compression prompts with a summary."""
+
+    def __init__(self):
+        self.queries = itertools.count()
+
+    async def ainvoke(self, messages, config=None):
+        if isinstance(messages[-1], HumanMessage) and len(messages) > 2:
+            return AIMessage(content="summary of the findings")
+        query = next(self.queries)
+        return AIMessage(content="", tool_calls=[{"name": "search", "args": {"query": f"query {query}"}, "id": f"call-{query}"}])
+
+
+def search_tool(mode: str):
+    pages = itertools.count()
+
+    @tool
+    def search(query: str) -> str:
+        """Search the web."""
+        if mode == "failing":
+            raise ConnectionError("search backend unavailable")
+        page = 0 if mode == "repeating" else next(pages)
+        return " ".join(f"page{page}-word{i}" for i in range(PAGE_WORDS))
+
+    return search
+
+
+async def run(mode: str, threshold) -> tuple[int, str]:
+    """Tool call iterations used by one researcher and why it stopped."""
+    research_graph.NOVELTY_THRESHOLD = threshold
+    model = StubModel()
+    tools = [search_tool(mode), think_tool]
+    research_graph.get_all_tools = lambda search_api: asyncio.sleep(0, tools)
+    research_graph.get_bound_model = lambda tools=None, schema=None: model
+    research_graph.get_model = lambda: model
+
+    before = dict(researcher_stop_stats)
+    await research_graph.researcher_subgraph.ainvoke(
+        {"researcher_messages": [HumanMessage(content="a topic")], "research_topic": "a topic"}
+    )
+    (reason,) = [key for key, count in researcher_stop_stats.items()
+                 if key != "iterations_saved" and count != before[key]]
+    return next(model.queries), reason
+
+
+async def main():
+    research_graph.INCREMENTAL_COMPRESSION = False
+    research_graph.OFFLOAD_RESEARCH_BLOBS = False
+    max_calls = research_graph.MAX_REACT_TOOL_CALLS
+    expected = {
+        ("repeating", 0.2): (1 + research_graph.NOVELTY_PATIENCE, "low_novelty"),
+        ("new pages", 0.2): (max_calls, "max_tool_calls"),
+        ("failing", 0.2): (max_calls, "max_tool_calls"),
+        ("repeating", None): (max_calls, "max_tool_calls"),
+    }
+    for (mode, threshold), (expected_calls, expected_reason) in expected.items():
+        calls, reason = await run(mode, threshold)
+        print(f"{mode:<10} threshold {str(threshold):<5} {calls:>2} tool call iterations, stopped: {reason}")
+        assert (calls, reason) == (expected_calls, expected_reason), (mode, threshold, calls, reason)
+    print("OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+"""Check speculative research briefs against stub models.
+
+Runs clarify_with_user and write_research_brief with stub structured-output
+models that each take MODEL_SECONDS, and reports the time until the
+supervisor could start:
+
+- speculation off: clarification, then the brief (about two model calls)
+- no clarification needed: the brief written during clarification is used,
+  so the brief is not generated again (about one model call)
+- clarification needed: the speculative brief is cancelled and discarded,
+  and no brief is handed on
+- the speculative brief fails: it is discarded and write_research_brief
+  generates the brief as usual
+
+Run from the project root: python -m benchmarks.speculative_brief
+"""
+
+import asyncio
+import time
+
+from langchain_core.messages import HumanMessage
+
+import agents.researcher.graph as research_graph
+from agents.researcher.models import ClarifyWithUser, ResearchQuestion
+from agents.researcher.speculation import speculation_stats
+
+MODEL_SECONDS = 0.3
+
+
+class StubModels:
+    """Structured-output stubs for ClarifyWithUser and ResearchQuestion."""
+
+    def __init__(self, need_clarification: bool, brief_fails: bool = False):
+        self.need_clarification = need_clarification
+        self.brief_fails = brief_fails
+        self.briefs_started = self.briefs_finished = self.briefs_cancelled = 0
+
+    def get_bound_model(self, tools=None, schema=None):
+        stubs = self
+
+        class Stub:
+            async def ainvoke(self, messages, config=None):
+                if schema is ClarifyWithUser:
+                    await asyncio.sleep(MODEL_SECONDS)
+                    return ClarifyWithUser(
+                        need_clarification=stubs.need_clarification,
+                        question="Which region do you mean?",
+                        verification="Starting research now.",
+                    )
+                stubs.briefs_started += 1
+                try:
+                    # A little slower than clarification, so a discarded brief is always still running
+                    await asyncio.sleep(MODEL_SECONDS * 1.2)
+                except asyncio.CancelledError:
+                    stubs.briefs_cancelled += 1
+                    raise
+                if stubs.brief_fails and stubs.briefs_started == 1:
+                    raise RuntimeError("model overloaded")
+                stubs.briefs_finished += 1
+                return ResearchQuestion(research_brief="the research brief")
+
+        return Stub()
+
+
+async def run(speculative: bool, need_clarification: bool, brief_fails: bool = False):
+    research_graph.SPECULATIVE_RESEARCH_BRIEF = speculative
+    stubs = StubModels(need_clarification, brief_fails)
+    research_graph.get_bound_model = stubs.get_bound_model
+    state = {"messages": [HumanMessage(content="Research heat pump adoption")]}
+    config = {"configurable": {"thread_id": "bench"}}
+
+    started = time.perf_counter()
+    update = await research_graph.clarify_with_user(state, config)
+    command = None
+    if not update["need_elaboration"]:
+        command = await research_graph.write_research_brief({**state, **update}, config)
+    elapsed = time.perf_counter() - started
+    await asyncio.sleep(0)  # let a cancelled brief finish cancelling
+    return stubs, update, command, elapsed
+
+
+async def main():
+    stubs, _, command, baseline = await run(speculative=False, need_clarification=False)
+    assert command.update["research_brief"] == "the research brief" and stubs.briefs_started == 1
+    print(f"speculation off:        supervisor starts after {baseline:.2f}s")
+
+    before = dict(speculation_stats)
+    stubs, _, command, elapsed = await run(speculative=True, need_clarification=False)
+    assert command.update["research_brief"] == "the research brief"
+    assert stubs.briefs_started == 1, "the brief was generated again"
+    assert speculation_stats["hits"] == before["hits"] + 1
+    assert elapsed < baseline - MODEL_SECONDS / 2, (elapsed, baseline)
+    print(f"no clarification:       supervisor starts after {elapsed:.2f}s (speculative brief used)")
+
+    before = dict(speculation_stats)
+    stubs, update, command, elapsed = await run(speculative=True, need_clarification=True)
+    assert command is None and not update.get("speculative_research_brief")
+    assert stubs.briefs_cancelled == 1 and stubs.briefs_finished == 0
+    assert speculation_stats["discarded"] == before["discarded"] + 1
+    print(f"clarification needed:   question returned after {elapsed:.2f}s, speculative brief cancelled")
+
+    before = dict(speculation_stats)
+    stubs, update, command, elapsed = await run(speculative=True, need_clarification=False, brief_fails=True)
+    assert update["speculative_research_brief"] is None
+    assert command.update["research_brief"] == "the research brief" and stubs.briefs_started == 2
+    assert speculation_stats["discarded"] == before["discarded"] + 1
+    print(f"speculative brief fails: brief generated again, supervisor starts after {elapsed:.2f}s")
+    print(f"stats: {speculation_stats}")
+    print("OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,120 @@
+"""Check local repair of structured outputs against a scripted stub model.
+
+The stub answers each call with the next scripted raw message, the way
+with_structured_output(include_raw=True) reports an output that failed to
+parse. Checks that:
+
+- truncated JSON is closed without loss after a complete value, and a value
+  cut off mid-way (a string, or a number that may be a prefix) is dropped
+  and the repair counted as lossy rather than passed off as complete
+- a required field that was cut off still re-calls the model
+- Literal values in the wrong case are coerced to the declared literal
+- with_json_repair re-calls the model for unrepairable outputs, counting
+  "recalls" and, after the last attempt, "failed"; model errors are retried
+  with backoff and not counted as recalls
+
+Run from the project root: python -m benchmarks.structured_output
+"""
+
+import asyncio
+from typing import Literal, Optional
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from pydantic import BaseModel
+
+import utils.structured_output as structured_output
+from utils.structured_output import StructuredOutputError, recover_json, with_json_repair
+
+
+class Route(BaseModel):
+    reasoning: str
+    classification: Literal["ignore", "respond", "notify"]
+    scores: Optional[list[int]] = None
+
+
+class StubModel:
+    """Returns scripted outputs, one per call; an exception in the script is raised instead."""
+
+    def __init__(self, script: list):
+        self.script = list(script)
+        self.calls = 0
+
+    def with_structured_output(self, schema, include_raw=False, **kwargs):
+        def respond(messages):
+            self.calls += 1
+            item = self.script.pop(0)
+            if isinstance(item, Exception):
+                raise item
+            return {"raw": AIMessage(content=item), "parsed": None, "parsing_error": ValueError("no parse")}
+        return RunnableLambda(respond)
+
+
+def check_truncation():
+    cases = {
+        # text: (recovered object, lossy)
+        '{"a": [1, 2], "b": "done"': ({"a": [1, 2], "b": "done"}, False),
+        '{"a": [1, 2]': ({"a": [1, 2]}, False),
+        '{"a": true': ({"a": True}, False),
+        '{"a": [1, 2,': ({"a": [1, 2]}, False),
+        '{"a": [1, 2': ({"a": [1]}, True),
+        '{"a": 1, "b": "cut of': ({"a": 1}, True),
+        '{"a": 1, "b": tr': ({"a": 1}, True),
+    }
+    for text, expected in cases.items():
+        assert recover_json(text) == expected, (text, recover_json(text))
+    print(f"truncation: {len(cases)} cases ok, trailing numbers and strings dropped as lossy")
+
+
+def check_repair_stats():
+    structured_output.structured_output_stats.clear()
+    model = StubModel([
+        '```json\n{"reasoning": "asks for a reply", "classification": "Respond"}\n```',
+        '{"reasoning": "newsletter", "classification": "IGNORE", "scores": [3, 1',
+    ])
+    router = with_json_repair(model, Route)
+    first = router.invoke([])
+    second = router.invoke([])
+    assert first.classification == "respond", first
+    assert second.classification == "ignore" and second.scores == [3], second
+    stats = structured_output.structured_output_stats["Route"]
+    assert stats == {"parsed": 0, "repaired": 2, "lossy": 1, "recalls": 0, "failed": 0}, stats
+    assert model.calls == 2
+    print(f"literal coercion and lossy count: {stats}")
+
+
+def check_retries():
+    structured_output.structured_output_stats.clear()
+    structured_output.RETRY_BACKOFF_SECONDS = 0
+    cut_required = '{"reasoning": "a long explanation that was cut o'
+    complete = '{"reasoning": "meeting request", "classification": "respond"}'
+
+    # Unrepairable output, a model error, then a good output: one recall
+    model = StubModel([cut_required, TimeoutError("upstream timeout"), complete])
+    result = with_json_repair(model, Route, max_attempts=3).invoke([])
+    assert result.classification == "respond" and model.calls == 3
+    stats = dict(structured_output.structured_output_stats["Route"])
+    assert stats["recalls"] == 1 and stats["failed"] == 0, stats
+
+    # Unrepairable on every attempt (async path): two more recalls, then failed
+    model = StubModel([cut_required] * 3)
+    try:
+        asyncio.run(with_json_repair(model, Route, max_attempts=3).ainvoke([]))
+    except StructuredOutputError:
+        pass
+    else:
+        raise AssertionError("an unrepairable output did not fail")
+    stats = structured_output.structured_output_stats["Route"]
+    assert stats["recalls"] == 3 and stats["failed"] == 1 and model.calls == 3, stats
+    print(f"retries: {stats}")
+
+
+def main():
+    check_truncation()
+    check_repair_stats()
+    check_retries()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Compare supervisor prompt tokens with and without context compaction.
+
+Replays the shape of a typical research run: MAX_RESEARCHER_ITERATIONS
+supervisor turns, each with a think_tool reflection and several
+ConductResearch results of a few thousand tokens. Pass a JSON file of
+recorded research findings (a list of strings, e.g. a run's `notes`) to
+replay real content instead of the synthetic filler. Also checks that
+compacting an already compacted context leaves it unchanged.
+
+Run from the project root: python -m benchmarks.supervisor_compaction [notes.json]
+"""
+
+import json
+import sys
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+from agents.researcher.graph import MAX_RESEARCHER_ITERATIONS
+from agents.researcher.utils import compact_supervisor_messages
+
+UNITS_PER_ITERATION = 3
+SYNTHETIC_FINDING = "Source [1] reports that the measured value was 42 units in 2024. " * 200
+
+
+def load_findings():
+    if len(sys.argv) > 1:
+        with open(sys.argv[1]) as f:
+            return json.load(f)
+    return [SYNTHETIC_FINDING] * (MAX_RESEARCHER_ITERATIONS * UNITS_PER_ITERATION)
+
+
+def replay(findings, compact: bool) -> list[int]:
+    """Return the supervisor prompt size (tokens) at each supervisor call."""
+    messages = [SystemMessage(content="lead researcher prompt"), HumanMessage(content="research brief")]
+    prompt_tokens = [count_tokens_approximately(messages)]
+    findings = iter(findings)
+
+    for iteration in range(MAX_RESEARCHER_ITERATIONS):
+        tool_calls = [{"name": "think_tool", "args": {"reflection": "plan"}, "id": f"think_{iteration}"}]
+        tool_calls += [
+            {"name": "ConductResearch", "args": {"research_topic": "topic"}, "id": f"research_{iteration}_{unit}"}
+            for unit in range(UNITS_PER_ITERATION)
+        ]
+        turn = [AIMessage(content="", tool_calls=tool_calls)]
+        turn += [ToolMessage(content="Reflection recorded: " + "reasoning " * 150, name="think_tool", tool_call_id=f"think_{iteration}")]
+        turn += [
+            ToolMessage(content=next(findings, SYNTHETIC_FINDING), name="ConductResearch", tool_call_id=call["id"])
+            for call in tool_calls[1:]
+        ]
+        history = messages + turn[:1]
+        messages = (compact_supervisor_messages(history) if compact else history) + turn[1:]
+        prompt_tokens.append(count_tokens_approximately(messages))
+    return prompt_tokens
+
+
+def check_idempotent(findings):
+    """Compacting an already compacted context must not change it."""
+    messages = [
+        ToolMessage(content=finding, name="ConductResearch", tool_call_id=f"research_{index}")
+        for index, finding in enumerate(findings[:UNITS_PER_ITERATION])
+    ]
+    once = compact_supervisor_messages(messages)
+    twice = compact_supervisor_messages(once)
+    assert [m.content for m in twice] == [m.content for m in once], "digests were digested again"
+    for original, digest in zip(messages, once):
+        if digest.content != original.content:
+            assert f"digest of {len(original.content)} characters" in digest.content
+
+
+def main():
+    findings = load_findings()
+    check_idempotent(findings)
+    baseline = replay(findings, compact=False)
+    compacted = replay(findings, compact=True)
+    print("supervisor call   baseline tokens   compacted tokens")
+    for call, (before, after) in enumerate(zip(baseline, compacted), start=1):
+        print(f"{call:>15}   {before:>15,}   {after:>16,}")
+    print(f"{'total':>15}   {sum(baseline):>15,}   {sum(compacted):>16,}  "
+          f"({1 - sum(compacted) / sum(baseline):.0%} fewer)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Check that topic merging keeps the units of a comparison apart.
+
+The supervisor prompt asks for one sub-agent per compared entity ("Compare
+OpenAI vs. Anthropic vs. DeepMind approaches to AI safety → Use 3
+sub-agents"). Such topics share most of their wording, and with IDF taken
+from just a few topics that boilerplate barely loses weight. Merging must
+still keep them separate, while a plain rewording of one topic is merged.
+
+Run from the project root: python -m benchmarks.topic_merging
+"""
+
+from agents.researcher.utils import merge_research_calls
+
+THRESHOLDS = [0.4, 0.6, 0.8]
+
+COMPARISON = [
+    "Research OpenAI's approach to AI safety, including its alignment research, safety policies and governance.",
+    "Research Anthropic's approach to AI safety, including its alignment research, safety policies and governance.",
+    "Research DeepMind's approach to AI safety, including its alignment research, safety policies and governance.",
+]
+REWORDED = [
+    "Research OpenAI's approach to AI safety, including its alignment research and safety policies.",
+    "Research OpenAI's approach to AI safety, including its safety policies and alignment research.",
+]
+
+
+def groups(topics: list[str], threshold: float) -> list[list[str]]:
+    tool_calls = [
+        {"name": "ConductResearch", "args": {"research_topic": topic}, "id": f"call_{i}"}
+        for i, topic in enumerate(topics)
+    ]
+    return [
+        [primary["id"]] + [call["id"] for call in merged]
+        for primary, merged in merge_research_calls(tool_calls, threshold)
+    ]
+
+
+def main():
+    for threshold in THRESHOLDS:
+        comparison = groups(COMPARISON, threshold)
+        reworded = groups(REWORDED, threshold)
+        print(f"threshold {threshold}: comparison {comparison}  reworded {reworded}")
+        assert comparison == [["call_0"], ["call_1"], ["call_2"]], "compared entities were merged"
+        assert reworded == [["call_0", "call_1"]], "a reworded topic was not merged"
+    print("OK: compared entities stay separate, rewordings merge")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Check WeatherClient against a local stand-in for the open-meteo API.
+
+Starts an HTTP server on localhost that answers forecast requests after a
+short simulated latency and records every request and client connection.
+Then checks that:
+
+- concurrent lookups for a few cities hit the server once per grid cell
+  (single-flight and nearby coordinates sharing a cache entry)
+- sequential requests reuse one pooled connection instead of opening one
+  per lookup
+- expired readings are evicted and the cache never grows past max_entries
+
+Run from the project root: python -m benchmarks.weather_client
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.weather import WeatherClient
+
+SIMULATED_LATENCY = 0.05
+NUM_LOOKUPS = 200
+CONCURRENCY = 20
+# (latitude, longitude) of a few cities, each looked up with small jitter
+CITIES = [(37.77, -122.42), (40.71, -74.01), (51.51, -0.13), (35.68, 139.69)]
+
+
+class StandInServer:
+    """Open-meteo stand-in on an ephemeral localhost port."""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections = set()
+        lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with lock:
+                    server.requests += 1
+                    server.connections.add(self.client_address)
+                time.sleep(SIMULATED_LATENCY)
+                body = json.dumps({"current": {"temperature_2m": 61.5, "weather_code": 3}}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1/forecast"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def check_coalescing(server: StandInServer):
+    client = WeatherClient(base_url=server.url)
+    lookups = [
+        (latitude + (i % 5) * 0.01, longitude - (i % 3) * 0.01)
+        for i in range(NUM_LOOKUPS)
+        for latitude, longitude in [CITIES[i % len(CITIES)]]
+    ]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(CONCURRENCY) as pool:
+        list(pool.map(lambda coords: client.get_current(*coords), lookups))
+    elapsed = time.perf_counter() - started
+
+    cells = {client._snap(*coords) for coords in lookups}
+    print(f"{NUM_LOOKUPS} concurrent lookups in {elapsed * 1000:.0f}ms: {server.requests} requests "
+          f"for {len(cells)} grid cells; stats {client.stats}")
+    assert server.requests == len(cells), "lookups in one grid cell were not served once"
+
+
+def check_connection_reuse(server: StandInServer):
+    client = WeatherClient(base_url=server.url)
+    server.connections.clear()
+    for i in range(20):
+        client.get_current(i, 10)
+    print(f"20 sequential uncached lookups over {len(server.connections)} connection(s)")
+    assert len(server.connections) == 1, "connections were not reused"
+
+
+def check_eviction(server: StandInServer):
+    client = WeatherClient(base_url=server.url, max_entries=10)
+    for i in range(25):
+        client.get_current(i, 0)
+    assert len(client._cache) == 10, f"cache holds {len(client._cache)} entries, max_entries is 10"
+
+    client = WeatherClient(base_url=server.url, ttl_seconds=0.5)
+    for i in range(5):
+        client.get_current(i, 20)
+    time.sleep(0.5)
+    client.get_current(50, 20)
+    assert len(client._cache) == 1, "expired readings were not evicted"
+    print("eviction: cache capped at max_entries and expired readings dropped")
+
+
+def main():
+    server = StandInServer()
+    try:
+        check_coalescing(server)
+        check_connection_reuse(server)
+        check_eviction(server)
+    finally:
+        server.close()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,26 @@
 
 Run directly: python -u mcp/email_tools.py
 Used by notebooks as a subprocess via langchain-mcp-adapters.
+
+Run with --http to serve the streamable-HTTP transport instead, so one server
+process can be shared by many agents (see utils/mcp_pool.py):
+    python -u mcp/email_tools.py --http --port 8000
 """
 
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
 from mcp.server import FastMCP
+from pydantic import BaseModel
+
+# Running as a script puts mcp/ on sys.path; append the project root so the
+# shared calendar engine is importable without shadowing the `mcp` package.
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils.calendar_engine import book_meeting, check_availability  # noqa: E402
 
 mcp = FastMCP("Email Tools")
 
@@ -15,17 +32,81 @@ def write_email(to: str, subject: str, content: str) -> str:
     return f"Email sent to {to} with subject '{subject}'"
 
 
-@mcp.tool(description="Check calendar availability for a given day.")
-def check_calendar_availability(day: str) -> str:
+@mcp.tool(description="Check calendar availability for a given day. Attendees is an optional comma-separated list.")
+def check_calendar_availability(day: str, attendees: str = "") -> str:
     """Check calendar availability for a given day."""
-    return f"Available times on {day}: 9:00 AM, 2:00 PM, 4:00 PM"
+    return check_availability(day, attendees)
 
 
-@mcp.tool(description="Schedule a calendar meeting.")
-def schedule_meeting(attendees: str, subject: str, day: str, time: str) -> str:
+@mcp.tool(description="Schedule a calendar meeting. Attendees is a comma-separated list.")
+def schedule_meeting(attendees: str, subject: str, day: str, time: str, duration_minutes: int = 30) -> str:
     """Schedule a meeting."""
-    return f"Meeting '{subject}' scheduled on {day} at {time} with {attendees}"
+    return book_meeting(attendees, subject, day, time, duration_minutes)
+
+
+# ---- Batch tools ----
+# Each batch tool takes a list of the single tool's arguments, runs the items
+# concurrently and returns a JSON list with one {"result"} or {"error"} per
+# item, in input order. One failing item never fails the whole batch.
+
+class EmailRequest(BaseModel):
+    to: str
+    subject: str
+    content: str
+
+
+class AvailabilityRequest(BaseModel):
+    day: str
+    attendees: str = ""
+
+
+class MeetingRequest(BaseModel):
+    attendees: str
+    subject: str
+    day: str
+    time: str
+    duration_minutes: int = 30
+
+
+async def run_batch(fn, items: list[BaseModel]) -> str:
+    """Run a single-item tool over a batch in worker threads."""
+    async def run_one(item):
+        try:
+            return {"result": await asyncio.to_thread(fn, **item.model_dump())}
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+
+    return json.dumps(await asyncio.gather(*(run_one(item) for item in items)))
+
+
+@mcp.tool(description="Write and send several emails at once. Returns a JSON list of per-email results or errors.")
+async def write_email_batch(items: list[EmailRequest]) -> str:
+    """Write and send several emails."""
+    return await run_batch(write_email, items)
+
+
+@mcp.tool(description="Check calendar availability for several days at once. Returns a JSON list of per-day results or errors.")
+async def check_calendar_availability_batch(items: list[AvailabilityRequest]) -> str:
+    """Check calendar availability for several days."""
+    return await run_batch(check_calendar_availability, items)
+
+
+@mcp.tool(description="Schedule several meetings at once. Returns a JSON list of per-meeting results or errors.")
+async def schedule_meeting_batch(items: list[MeetingRequest]) -> str:
+    """Schedule several meetings."""
+    return await run_batch(schedule_meeting, items)
 
 
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--http", action="store_true", help="Serve streamable-HTTP instead of stdio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    if args.http:
+        mcp.settings.host = args.host
+        mcp.settings.port = args.port
+        mcp.run(transport="streamable-http")
+    else:
+        mcp.run(transport="stdio")
@@ -0,0 +1,232 @@
+"""
+Blob Store
+
+Content-addressed storage for large strings that would otherwise be
+serialized into every checkpoint (e.g. the research agent's raw_notes).
+
+Graph state keeps only a short reference such as
+`blob://<thread_id>/<sha256>`; the text is written once per thread and read
+back lazily with `resolve_blob` by the node that actually needs it. Blobs
+are grouped by thread. An application that deletes a thread should call
+`delete_thread` to drop its blobs (and, given a checkpointer, its
+checkpoints); nothing in this repo deletes threads, so otherwise blobs are
+only removed by the sweep.
+
+`sweep_expired_blobs` (called by the research agent when a run starts, at
+most once per BLOB_SWEEP_INTERVAL_SECONDS per process) is mark-and-sweep:
+it first collects the threads whose blobs are referenced by any checkpoint
+the given checkpointer holds, then deletes the other threads nobody wrote
+to for BLOB_TTL_SECONDS (default 7 days). A thread that can still be
+resumed or read therefore keeps its blobs however old they are. Runs
+without a thread id share one bucket. Readers get BlobNotFoundError for a
+swept or deleted blob.
+
+The default LocalBlobStore writes under BLOB_STORE_PATH (defaults to .blobs
+in the project root).
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BLOB_STORE_PATH = PROJECT_ROOT / ".blobs"
+
+BLOB_REF_PREFIX = "blob://"
+
+# Strings shorter than this stay inline; a reference would not save much
+MIN_OFFLOAD_CHARS = 2000
+
+UNTHREADED = "_unthreaded"
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+SWEEP_INTERVAL_SECONDS = 60 * 60
+
+
+class BlobNotFoundError(KeyError):
+    """Raised when a reference points to a blob that was deleted or swept."""
+
+
+def is_blob_ref(value) -> bool:
+    return isinstance(value, str) and value.startswith(BLOB_REF_PREFIX)
+
+
+class BlobStore(ABC):
+    """Interface for thread-scoped, content-addressed string storage."""
+
+    @abstractmethod
+    def put(self, text: str, thread_id: str) -> str:
+        """Store text and return its reference."""
+
+    @abstractmethod
+    def get(self, ref: str) -> str:
+        """Return the text behind a reference."""
+
+    @abstractmethod
+    def delete_thread(self, thread_id: str) -> int:
+        """Delete every blob stored for a thread; returns the number deleted."""
+
+    @abstractmethod
+    def purge_expired(self, max_age: float, keep: frozenset[str] = frozenset()) -> int:
+        """Delete the blobs of threads not written to for max_age seconds; returns the number deleted.
+
+        Threads in keep (as named in their references) are never deleted.
+        """
+
+
+class LocalBlobStore(BlobStore):
+    """Blob store on the local filesystem: <root>/<thread_id>/<sha256[:2]>/<sha256>."""
+
+    def __init__(self, root: str | Path = DEFAULT_BLOB_STORE_PATH):
+        self.root = Path(root)
+
+    @staticmethod
+    def _safe_thread_id(thread_id: str) -> str:
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", str(thread_id)) or UNTHREADED
+
+    def _path(self, thread_id: str, digest: str) -> Path:
+        return self.root / self._safe_thread_id(thread_id) / digest[:2] / digest
+
+    def put(self, text: str, thread_id: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        path = self._path(thread_id, digest)
+        # Content-addressed: identical text is only written once per thread
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(text, encoding="utf-8")
+            os.replace(tmp_path, path)
+        # The thread directory's mtime marks the thread's last use for purge_expired
+        os.utime(path.parent.parent)
+        return f"{BLOB_REF_PREFIX}{self._safe_thread_id(thread_id)}/{digest}"
+
+    def get(self, ref: str) -> str:
+        thread_id, digest = ref[len(BLOB_REF_PREFIX):].split("/", 1)
+        try:
+            return self._path(thread_id, digest).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            raise BlobNotFoundError(ref) from None
+
+    def delete_thread(self, thread_id: str) -> int:
+        thread_dir = self.root / self._safe_thread_id(thread_id)
+        if not thread_dir.exists():
+            return 0
+        deleted = 0
+        for path in sorted(thread_dir.rglob("*"), reverse=True):
+            if path.is_dir():
+                path.rmdir()
+            else:
+                path.unlink()
+                deleted += 1
+        thread_dir.rmdir()
+        return deleted
+
+    def purge_expired(self, max_age: float, keep: frozenset[str] = frozenset()) -> int:
+        if not self.root.exists():
+            return 0
+        cutoff = time.time() - max_age
+        deleted = 0
+        for thread_dir in self.root.iterdir():
+            if not thread_dir.is_dir() or thread_dir.name in keep or thread_dir.stat().st_mtime >= cutoff:
+                continue
+            try:
+                deleted += self.delete_thread(thread_dir.name)
+            except OSError as e:
+                # Written to by another process meanwhile; try again next sweep
+                logger.info("Skipped sweeping blob thread %s: %s", thread_dir.name, e)
+        return deleted
+
+
+_blob_store: Optional[BlobStore] = None
+_last_sweep = 0.0
+
+
+def get_blob_store() -> BlobStore:
+    """Get the process-wide blob store backed by BLOB_STORE_PATH."""
+    global _blob_store
+    if _blob_store is None:
+        _blob_store = LocalBlobStore(os.getenv("BLOB_STORE_PATH", DEFAULT_BLOB_STORE_PATH))
+    return _blob_store
+
+
+def thread_id_from_config(config) -> str:
+    """The run's thread id; a research unit checkpointing under its own thread reports its parent's."""
+    configurable = (config or {}).get("configurable", {})
+    return str(configurable.get("parent_thread_id") or configurable.get("thread_id") or UNTHREADED)
+
+
+def offload_blob(text: str, config) -> str:
+    """Store large text in the blob store and return a reference; small text is returned as-is."""
+    if not isinstance(text, str) or is_blob_ref(text) or len(text) < MIN_OFFLOAD_CHARS:
+        return text
+    return get_blob_store().put(text, thread_id_from_config(config))
+
+
+def resolve_blob(value):
+    """Return the text behind a blob reference, or the value unchanged.
+
+    Raises:
+        BlobNotFoundError: The blob was deleted or swept
+    """
+    if is_blob_ref(value):
+        return get_blob_store().get(value)
+    return value
+
+
+def referenced_blob_threads(value, threads: Optional[set] = None) -> set[str]:
+    """Threads (as named in references) of every blob reference in a nested state value."""
+    threads = set() if threads is None else threads
+    if is_blob_ref(value):
+        threads.add(value[len(BLOB_REF_PREFIX):].split("/", 1)[0])
+    elif isinstance(value, dict):
+        for item in value.values():
+            referenced_blob_threads(item, threads)
+    elif isinstance(value, (list, tuple, set)):
+        for item in value:
+            referenced_blob_threads(item, threads)
+    return threads
+
+
+async def sweep_expired_blobs(checkpointer=None, force: bool = False) -> int:
+    """Delete unreferenced threads idle for BLOB_TTL_SECONDS, at most once per BLOB_SWEEP_INTERVAL_SECONDS.
+
+    Every checkpoint the checkpointer holds is scanned first, and threads
+    referenced by any of them are kept. Without a checkpointer no run can be
+    resumed, so only idleness counts. If the checkpoints cannot be listed,
+    nothing is swept. BLOB_TTL_SECONDS=0 disables the sweep.
+    """
+    global _last_sweep
+    ttl = float(os.getenv("BLOB_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+    interval = float(os.getenv("BLOB_SWEEP_INTERVAL_SECONDS", SWEEP_INTERVAL_SECONDS))
+    now = time.time()
+    if ttl <= 0 or (not force and now - _last_sweep < interval):
+        return 0
+    _last_sweep = now
+
+    live = set()
+    if checkpointer is not None:
+        try:
+            async for checkpoint_tuple in checkpointer.alist(None):
+                referenced_blob_threads(checkpoint_tuple.checkpoint.get("channel_values", {}), live)
+        except Exception as e:
+            logger.warning("Skipped the blob sweep: could not list checkpoints (%s)", e)
+            return 0
+    deleted = await asyncio.to_thread(get_blob_store().purge_expired, ttl, frozenset(live))
+    if deleted:
+        logger.info("Swept %d expired blobs (%d referenced threads kept)", deleted, len(live))
+    return deleted
+
+
+def delete_thread(thread_id: str, checkpointer=None) -> int:
+    """Delete a thread's blobs, and its checkpoints if a checkpointer is given."""
+    if checkpointer is not None:
+        checkpointer.delete_thread(thread_id)
+    return get_blob_store().delete_thread(thread_id)
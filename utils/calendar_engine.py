@@ -0,0 +1,403 @@
+"""
+Calendar Engine
+
+In-process free/busy calendar shared by the email agent tools and the MCP
+email server.
+
+Each attendee's busy time is kept as a sorted array of merged, non-overlapping
+(start, end) intervals, so range queries and inserts are a bisect away.
+Free slots for a group of attendees are the gaps left after k-way merging
+their busy intervals for the requested window.
+
+Events are appended to a local JSON Lines file (CALENDAR_PATH, defaults to
+.calendar.jsonl in the project root), one event per line, and the index is
+rebuilt on load.
+"""
+
+import heapq
+import json
+import os
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Iterable, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CALENDAR_PATH = PROJECT_ROOT / ".calendar.jsonl"
+
+# Calendar owner: always included in availability checks and new meetings
+CALENDAR_OWNER = "robert@company.com"
+
+WORKDAY_START = time(9, 0)
+WORKDAY_END = time(17, 0)
+SLOT_GRANULARITY_MINUTES = 15
+
+# Calendar preferences from the email agent prompt:
+# 30 minute meetings are preferred, 15 minute meetings are also acceptable,
+# and times later in the day are preferable.
+PREFERRED_MEETING_MINUTES = 30
+MINIMUM_MEETING_MINUTES = 15
+
+
+##########################
+# Parsing Helpers
+##########################
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+def normalize_attendee(attendee: str) -> str:
+    """Reduce 'Name <email>' or an email/name to a lowercase calendar key."""
+    match = re.search(r"<([^>]+)>", attendee)
+    return (match.group(1) if match else attendee).strip().lower()
+
+
+def parse_attendees(attendees: str | Iterable[str]) -> list[str]:
+    """Accept a list of attendees or a comma/semicolon separated string."""
+    if isinstance(attendees, str):
+        attendees = re.split(r"[;,]", attendees)
+    return [normalize_attendee(a) for a in attendees if a and a.strip()]
+
+
+def parse_day(day: str | date | datetime, today: Optional[date] = None) -> date:
+    """Parse an ISO date, 'today'/'tomorrow', or a weekday name (next occurrence)."""
+    if isinstance(day, datetime):
+        return day.date()
+    if isinstance(day, date):
+        return day
+
+    today = today or date.today()
+    text = day.strip().lower()
+    if text == "today":
+        return today
+    if text == "tomorrow":
+        return today + timedelta(days=1)
+
+    # Explicit dates first: "Monday, June 2, 2025" names a weekday too, and
+    # must not resolve to the next Monday after today
+    iso_match = re.search(r"\d{4}-\d{2}-\d{2}", text)
+    if iso_match:
+        return date.fromisoformat(iso_match.group(0))
+
+    for fmt in ("%B %d, %Y", "%b %d, %Y", "%A, %B %d, %Y", "%m/%d/%Y"):
+        try:
+            return datetime.strptime(day.strip(), fmt).date()
+        except ValueError:
+            continue
+
+    for weekday_index, weekday in enumerate(WEEKDAYS):
+        if weekday in text or text == weekday[:3]:
+            days_ahead = (weekday_index - today.weekday()) % 7
+            return today + timedelta(days=days_ahead)
+    raise ValueError(f"Could not parse day: {day!r}")
+
+
+def parse_time_of_day(value: str | int) -> time:
+    """Parse '2:00 PM', '14:00', 14 or 1430 into a time."""
+    if isinstance(value, int):
+        if 0 <= value < 24:
+            return time(value, 0)
+        # HHMM; anything else (30, 2460, ...) is ambiguous rather than 00:30
+        if 100 <= value < 2400 and value % 100 < 60:
+            return time(value // 100, value % 100)
+        raise ValueError(f"Could not parse time: {value!r}")
+
+    text = value.strip().upper().replace(".", "")
+    for fmt in ("%I:%M %p", "%I:%M%p", "%I %p", "%I%p", "%H:%M"):
+        try:
+            return datetime.strptime(text, fmt).time()
+        except ValueError:
+            continue
+    if text.isdigit():
+        return parse_time_of_day(int(text))
+    raise ValueError(f"Could not parse time: {value!r}")
+
+
+def format_time_of_day(moment: datetime) -> str:
+    """Format a datetime as '2:00 PM'."""
+    return moment.strftime("%I:%M %p").lstrip("0")
+
+
+##########################
+# Interval Index
+##########################
+
+class IntervalIndex:
+    """Sorted array of merged, non-overlapping busy intervals for one attendee.
+
+    Intervals are stored as two parallel lists of POSIX timestamps. Because
+    intervals never overlap, both lists are sorted and can be bisected.
+    """
+
+    def __init__(self):
+        self.starts: list[float] = []
+        self.ends: list[float] = []
+
+    def __len__(self):
+        return len(self.starts)
+
+    def add(self, start: float, end: float) -> None:
+        """Insert an interval, merging it with any intervals it touches."""
+        # First interval whose end reaches our start, last one whose start reaches our end
+        lo = bisect_left(self.ends, start)
+        hi = bisect_right(self.starts, end)
+        if lo < hi:
+            start = min(start, self.starts[lo])
+            end = max(end, self.ends[hi - 1])
+        self.starts[lo:hi] = [start]
+        self.ends[lo:hi] = [end]
+
+    def overlapping(self, window_start: float, window_end: float) -> list[tuple[float, float]]:
+        """Return busy intervals intersecting [window_start, window_end)."""
+        lo = bisect_right(self.ends, window_start)
+        hi = bisect_left(self.starts, window_end)
+        return list(zip(self.starts[lo:hi], self.ends[lo:hi]))
+
+    def is_free(self, start: float, end: float) -> bool:
+        return not self.overlapping(start, end)
+
+
+##########################
+# Calendar Engine
+##########################
+
+class CalendarEngine:
+    """Multi-attendee free/busy calendar with local JSON Lines persistence.
+
+    Args:
+        path: JSON Lines file to append events to, or None for an in-memory calendar
+    """
+
+    def __init__(self, path: Optional[str | Path] = None):
+        self.path = Path(path) if path else None
+        self.events: list[dict] = []
+        self.indexes: dict[str, IntervalIndex] = {}
+        # Re-entrant so schedule_meeting can check and book under one lock
+        self._lock = threading.RLock()
+        if self.path and self.path.exists():
+            self._load()
+
+    # ---- Persistence ----
+
+    def _load(self) -> None:
+        with open(self.path) as f:
+            text = f.read()
+        legacy = text.lstrip().startswith("[")
+        if legacy:
+            # Older calendars stored every event in one JSON array
+            events = json.loads(text)
+        else:
+            events = []
+            for line in text.splitlines():
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A crash mid-append can leave a partial last line
+                    continue
+        for event in events:
+            self._index_event(event)
+        self.events = events
+        if legacy:
+            self._rewrite()
+
+    def _append(self, event: dict) -> None:
+        """Persist one event without rewriting the events already on disk."""
+        if not self.path:
+            return
+        with open(self.path, "a") as f:
+            f.write(json.dumps(event) + "\n")
+
+    def _rewrite(self) -> None:
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            f.writelines(json.dumps(event) + "\n" for event in self.events)
+        os.replace(tmp_path, self.path)
+
+    def _index_event(self, event: dict) -> None:
+        for attendee in event["attendees"]:
+            self.indexes.setdefault(attendee, IntervalIndex()).add(event["start"], event["end"])
+
+    # ---- Writes ----
+
+    def add_event(
+        self,
+        attendees: Iterable[str],
+        start: datetime,
+        end: datetime,
+        subject: str = "",
+        persist: bool = True,
+    ) -> dict:
+        """Record a busy block for every attendee without checking conflicts."""
+        event = {
+            "subject": subject,
+            "attendees": sorted(set(parse_attendees(attendees))),
+            "start": start.timestamp(),
+            "end": end.timestamp(),
+        }
+        with self._lock:
+            self.events.append(event)
+            self._index_event(event)
+            if persist:
+                self._append(event)
+        return event
+
+    def schedule_meeting(
+        self,
+        attendees: Iterable[str],
+        subject: str,
+        start: datetime,
+        duration_minutes: int,
+    ) -> tuple[bool, list[str]]:
+        """Book a meeting if every attendee (and the owner) is free.
+
+        Returns:
+            Tuple of (scheduled, conflicting_attendees)
+        """
+        attendees = sorted(set(parse_attendees(attendees)) | {CALENDAR_OWNER})
+        end = start + timedelta(minutes=duration_minutes)
+        with self._lock:
+            conflicts = [
+                attendee for attendee in attendees
+                if attendee in self.indexes
+                and not self.indexes[attendee].is_free(start.timestamp(), end.timestamp())
+            ]
+            if conflicts:
+                return False, conflicts
+            self.add_event(attendees, start, end, subject)
+        return True, []
+
+    # ---- Reads ----
+
+    def free_intervals(
+        self,
+        attendees: Iterable[str],
+        window_start: datetime,
+        window_end: datetime,
+    ) -> list[tuple[datetime, datetime]]:
+        """Intersect the free time of all attendees inside a window."""
+        lo, hi = window_start.timestamp(), window_end.timestamp()
+        with self._lock:
+            busy_lists = [
+                self.indexes[attendee].overlapping(lo, hi)
+                for attendee in set(parse_attendees(attendees))
+                if attendee in self.indexes
+            ]
+
+        # Sweep the k-way merged busy intervals; gaps between them are free for everyone
+        free = []
+        cursor = lo
+        for busy_start, busy_end in heapq.merge(*busy_lists):
+            if busy_start > cursor:
+                free.append((cursor, min(busy_start, hi)))
+            cursor = max(cursor, busy_end)
+            if cursor >= hi:
+                break
+        if cursor < hi:
+            free.append((cursor, hi))
+
+        tz = window_start.tzinfo
+        return [
+            (datetime.fromtimestamp(start, tz), datetime.fromtimestamp(end, tz))
+            for start, end in free
+        ]
+
+    def find_slots(
+        self,
+        attendees: Iterable[str],
+        day: date,
+        preferred_minutes: int = PREFERRED_MEETING_MINUTES,
+        minimum_minutes: int = MINIMUM_MEETING_MINUTES,
+        max_slots: int = 3,
+    ) -> tuple[int, list[datetime]]:
+        """Find meeting start times on a day, honoring the calendar preferences.
+
+        Tries the preferred duration first and falls back to the minimum
+        duration. Slots are returned latest-first, since later in the day is
+        preferred.
+
+        Returns:
+            Tuple of (duration_minutes, slot_start_times)
+        """
+        attendees = set(parse_attendees(attendees)) | {CALENDAR_OWNER}
+        window_start = datetime.combine(day, WORKDAY_START)
+        window_end = datetime.combine(day, WORKDAY_END)
+        free = self.free_intervals(attendees, window_start, window_end)
+        step = timedelta(minutes=SLOT_GRANULARITY_MINUTES)
+
+        for duration_minutes in dict.fromkeys([preferred_minutes, minimum_minutes]):
+            duration = timedelta(minutes=duration_minutes)
+            slots = []
+            for free_start, free_end in reversed(free):
+                # Latest grid-aligned start that still fits in this gap
+                latest = free_end - duration
+                offset = (latest - window_start) % step
+                candidate = latest - offset
+                while candidate >= free_start and len(slots) < max_slots:
+                    slots.append(candidate)
+                    candidate -= duration
+                if len(slots) >= max_slots:
+                    break
+            if slots:
+                return duration_minutes, slots
+        return minimum_minutes, []
+
+
+_calendar: Optional[CalendarEngine] = None
+_calendar_lock = threading.Lock()
+
+
+def get_calendar() -> CalendarEngine:
+    """Get the process-wide calendar backed by CALENDAR_PATH."""
+    global _calendar
+    # Batch tools call this from several worker threads at once; without the
+    # lock each could load its own engine and book into a different copy
+    with _calendar_lock:
+        if _calendar is None:
+            _calendar = CalendarEngine(os.getenv("CALENDAR_PATH", DEFAULT_CALENDAR_PATH))
+        return _calendar
+
+
+##########################
+# Tool Helpers
+##########################
+
+def check_availability(day: str | date, attendees: str | Iterable[str] = ()) -> str:
+    """Describe open meeting slots on a day for the owner and any attendees."""
+    try:
+        target_day = parse_day(day)
+    except ValueError as e:
+        return str(e)
+
+    duration_minutes, slots = get_calendar().find_slots(parse_attendees(attendees), target_day)
+    day_str = target_day.strftime("%A, %B %d, %Y")
+    if not slots:
+        return f"No available times on {day_str}"
+    times = ", ".join(format_time_of_day(slot) for slot in slots)
+    return f"Available {duration_minutes} minute slots on {day_str} (latest first): {times}"
+
+
+def book_meeting(
+    attendees: str | Iterable[str],
+    subject: str,
+    day: str | date,
+    start_time: str | int,
+    duration_minutes: int = PREFERRED_MEETING_MINUTES,
+) -> str:
+    """Schedule a meeting and describe the outcome."""
+    try:
+        start = datetime.combine(parse_day(day), parse_time_of_day(start_time))
+    except ValueError as e:
+        return str(e)
+
+    date_str = start.strftime("%A, %B %d, %Y")
+    time_str = format_time_of_day(start)
+    if start < datetime.now():
+        return f"Could not schedule '{subject}' on {date_str} at {time_str}: that time has already passed"
+
+    attendee_list = parse_attendees(attendees)
+    scheduled, conflicts = get_calendar().schedule_meeting(attendee_list, subject, start, duration_minutes)
+    if not scheduled:
+        return f"Could not schedule '{subject}' on {date_str} at {time_str}: busy attendees: {', '.join(conflicts)}"
+    return f"Meeting '{subject}' scheduled on {date_str} at {time_str} for {duration_minutes} minutes with {len(attendee_list)} attendees"
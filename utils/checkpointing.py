@@ -0,0 +1,83 @@
+"""
+Checkpointing
+
+Local SQLite checkpointer for graphs that keep durable progress outside the
+LangGraph platform, e.g. the research agent's per-unit checkpoints (see
+DURABLE_RESEARCH_UNITS in agents/researcher/graph.py).
+
+Requires the optional `durable` extra (langgraph-checkpoint-sqlite and
+aiosqlite):
+
+    uv sync --extra durable
+
+The database lives at RESEARCH_CHECKPOINT_PATH (defaults to
+.research_checkpoints.sqlite3 in the project root).
+
+Each checkpointer holds an aiosqlite connection, which runs a non-daemon
+thread and belongs to the event loop that opened it. Close them with
+`close_sqlite_checkpointers()` (or run inside `sqlite_checkpointers()`)
+before that loop ends, or the interpreter cannot exit.
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CHECKPOINT_PATH = PROJECT_ROOT / ".research_checkpoints.sqlite3"
+
+# Open checkpointers keyed by (database file, event loop), and per-loop locks
+# so concurrent research units do not each open a connection
+_checkpointers = {}
+_locks = {}
+
+
+async def get_sqlite_checkpointer(path: str | Path | None = None):
+    """Get the async SQLite checkpointer for a database file in the running event loop.
+
+    Args:
+        path: SQLite file; defaults to RESEARCH_CHECKPOINT_PATH
+    """
+    path = str(path or os.getenv("RESEARCH_CHECKPOINT_PATH", DEFAULT_CHECKPOINT_PATH))
+    loop = asyncio.get_running_loop()
+    key = (path, loop)
+    if key in _checkpointers:
+        return _checkpointers[key]
+    async with _locks.setdefault(loop, asyncio.Lock()):
+        if key in _checkpointers:
+            return _checkpointers[key]
+        try:
+            import aiosqlite
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+        except ImportError as e:
+            raise ImportError(
+                "Durable research units need a SQLite checkpointer: uv sync --extra durable"
+            ) from e
+        conn = await aiosqlite.connect(path)
+        checkpointer = AsyncSqliteSaver(conn)
+        await checkpointer.setup()
+        _checkpointers[key] = checkpointer
+        return checkpointer
+
+
+async def close_sqlite_checkpointers():
+    """Close the checkpointers opened in the running event loop."""
+    loop = asyncio.get_running_loop()
+    for key in [key for key in _checkpointers if key[1] is loop]:
+        await _checkpointers.pop(key).conn.close()
+    _locks.pop(loop, None)
+
+
+@asynccontextmanager
+async def sqlite_checkpointers():
+    """Close the checkpointers opened inside the block when it exits.
+
+    Usage:
+        async with sqlite_checkpointers():
+            await supervisor_tools(state, config)
+    """
+    try:
+        yield
+    finally:
+        await close_sqlite_checkpointers()
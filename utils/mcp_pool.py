@@ -0,0 +1,387 @@
+"""
+MCP Session Pool
+
+Keeps warm MCP client sessions open so tool calls don't pay for process
+startup and the initialize / list_tools handshake every time.
+
+- stdio: spawns `size` server processes once and keeps them alive
+- streamable_http: opens `size` sessions against one shared server process
+
+Concurrent tool calls are multiplexed over the open sessions (each MCP
+session already supports many in-flight requests) and routed to the least
+busy one. The tool schema list is fetched once and cached. A session whose
+server stops answering pings is replaced with a fresh one, either when a call
+on it fails or on `health_check()`. BatchCoalescer optionally folds
+concurrent single-item calls into the server's batch tools.
+
+Usage:
+    pool = MCPSessionPool.for_email_tools(size=2)
+    await pool.start()
+    tools = await pool.get_tools()   # LangChain tools routed through the pool
+    ...
+    await pool.close()
+"""
+
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Any, Literal, Optional
+
+from langchain_core.tools import StructuredTool
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+
+logger = logging.getLogger(__name__)
+
+EMAIL_TOOLS_SERVER = Path(__file__).resolve().parent.parent / "mcp" / "email_tools.py"
+DEFAULT_HTTP_URL = "http://127.0.0.1:8000/mcp"
+
+# A session that does not answer a ping within this many seconds is replaced
+PING_TIMEOUT_SECONDS = 5.0
+
+
+class MCPSessionPool:
+    """Pool of warm MCP client sessions.
+
+    Args:
+        server_params: How to spawn the server (stdio transport)
+        size: Number of sessions to keep open
+        transport: "stdio" to spawn server processes, "streamable_http" to
+            connect to an already running server at `url`
+        url: Server URL for the streamable_http transport
+    """
+
+    def __init__(
+        self,
+        server_params: Optional[StdioServerParameters] = None,
+        size: int = 2,
+        transport: Literal["stdio", "streamable_http"] = "stdio",
+        url: str = DEFAULT_HTTP_URL,
+    ):
+        if transport == "stdio" and server_params is None:
+            raise ValueError("server_params is required for the stdio transport")
+        self.server_params = server_params
+        self.size = size
+        self.transport = transport
+        self.url = url
+
+        self._sessions: list[ClientSession] = []
+        # Keyed by id(session): calls in flight, the task holding the session
+        # open and the event that tells that task to close it
+        self._in_flight: dict[int, int] = {}
+        self._tasks: dict[int, asyncio.Task] = {}
+        self._stops: dict[int, asyncio.Event] = {}
+        self._replacing: dict[int, asyncio.Task] = {}
+        self._tool_schemas = None
+
+    @classmethod
+    def for_email_tools(cls, size: int = 2, transport: str = "stdio", url: str = DEFAULT_HTTP_URL):
+        """Pool for the mcp/email_tools.py server."""
+        server_params = StdioServerParameters(
+            command=sys.executable,
+            args=["-u", str(EMAIL_TOOLS_SERVER)],
+        )
+        return cls(server_params, size=size, transport=transport, url=url)
+
+    # ---- Lifecycle ----
+
+    def _client(self):
+        if self.transport == "streamable_http":
+            return streamablehttp_client(self.url)
+        return stdio_client(self.server_params)
+
+    async def _hold_session(self, ready: asyncio.Future, stop: asyncio.Event):
+        """Open one session and keep it alive until `stop` is set.
+
+        The transport context managers must be entered and exited in the same
+        task, so each session lives in its own background task.
+        """
+        try:
+            async with self._client() as streams:
+                read, write = streams[0], streams[1]
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    ready.set_result(session)
+                    await stop.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                raise
+
+    async def _open_session(self) -> ClientSession:
+        """Open one session in its own background task and register it."""
+        ready = asyncio.get_running_loop().create_future()
+        stop = asyncio.Event()
+        task = asyncio.create_task(self._hold_session(ready, stop))
+        try:
+            session = await ready
+        except BaseException:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            raise
+        self._in_flight[id(session)] = 0
+        self._tasks[id(session)] = task
+        self._stops[id(session)] = stop
+        return session
+
+    async def _close_session(self, session: ClientSession):
+        """Stop a session's task, closing the session and its transport."""
+        key = id(session)
+        self._in_flight.pop(key, None)
+        if key in self._stops:
+            self._stops.pop(key).set()
+        if key in self._tasks:
+            await asyncio.gather(self._tasks.pop(key), return_exceptions=True)
+
+    async def start(self):
+        """Open all sessions and cache the tool list.
+
+        If any session fails to open, the ones that did are closed again
+        before the error is raised.
+        """
+        if self._sessions:
+            return self
+        results = await asyncio.gather(
+            *(self._open_session() for _ in range(self.size)), return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            await asyncio.gather(
+                *(self._close_session(result) for result in results if not isinstance(result, BaseException))
+            )
+            raise errors[0]
+        self._sessions = list(results)
+        try:
+            await self.list_tools()
+        except BaseException:
+            await self.close()
+            raise
+        return self
+
+    async def close(self):
+        """Close every session (and stop spawned server processes)."""
+        for task in self._replacing.values():
+            task.cancel()
+        await asyncio.gather(*self._replacing.values(), return_exceptions=True)
+        sessions, self._sessions = self._sessions, []
+        await asyncio.gather(*(self._close_session(session) for session in sessions))
+        self._replacing.clear()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # ---- Calls ----
+
+    def _least_busy_session(self) -> ClientSession:
+        if not self._sessions:
+            raise RuntimeError("MCPSessionPool is not started")
+        return min(self._sessions, key=lambda session: self._in_flight[id(session)])
+
+    async def list_tools(self):
+        """Return the server's tool schemas, fetched once per pool."""
+        if self._tool_schemas is None:
+            result = await self._least_busy_session().list_tools()
+            self._tool_schemas = result.tools
+        return self._tool_schemas
+
+    async def _call_on(self, session: ClientSession, name: str, arguments: dict[str, Any]):
+        key = id(session)
+        self._in_flight[key] += 1
+        try:
+            return await session.call_tool(name, arguments)
+        finally:
+            if key in self._in_flight:
+                self._in_flight[key] -= 1
+
+    async def call_tool(self, name: str, arguments: dict[str, Any]):
+        """Call a tool on the least busy warm session.
+
+        If the call fails and the session no longer answers a ping, its
+        server is gone: the session is replaced and the call retried once on
+        the new one.
+        """
+        session = self._least_busy_session()
+        try:
+            return await self._call_on(session, name, arguments)
+        except Exception as e:
+            if await self._is_alive(session):
+                raise
+            logger.warning("MCP session stopped responding (%r); reconnecting", e)
+        return await self._call_on(await self._replace(session), name, arguments)
+
+    # ---- Health ----
+
+    async def _is_alive(self, session: ClientSession) -> bool:
+        try:
+            await asyncio.wait_for(session.send_ping(), PING_TIMEOUT_SECONDS)
+            return True
+        except Exception:
+            return False
+
+    async def _replace(self, session: ClientSession) -> ClientSession:
+        """Swap a dead session for a fresh one; concurrent callers share one reconnect."""
+        if session not in self._sessions:
+            # Already replaced by another caller
+            return self._least_busy_session()
+        key = id(session)
+        if key not in self._replacing:
+            self._replacing[key] = asyncio.create_task(self._reconnect(session))
+        return await asyncio.shield(self._replacing[key])
+
+    async def _reconnect(self, session: ClientSession) -> ClientSession:
+        try:
+            replacement = await self._open_session()
+            if session not in self._sessions:
+                # The pool was closed while reconnecting
+                await self._close_session(replacement)
+                raise RuntimeError("MCPSessionPool is closed")
+            self._sessions[self._sessions.index(session)] = replacement
+            await self._close_session(session)
+            return replacement
+        finally:
+            self._replacing.pop(id(session), None)
+
+    async def health_check(self) -> int:
+        """Ping every session and replace those whose server is gone.
+
+        Returns the number of sessions replaced.
+        """
+        sessions = list(self._sessions)
+        alive = await asyncio.gather(*(self._is_alive(session) for session in sessions))
+        dead = [session for session, ok in zip(sessions, alive) if not ok]
+        if dead:
+            logger.warning("%d MCP session(s) stopped responding; reconnecting", len(dead))
+            await asyncio.gather(*(self._replace(session) for session in dead))
+        return len(dead)
+
+    async def call_tool_text(self, name: str, arguments: dict[str, Any]) -> str:
+        """Call a tool and return its text content, raising on tool errors."""
+        return result_text(await self.call_tool(name, arguments))
+
+    async def get_tools(self, coalesce_window: Optional[float] = None) -> list[StructuredTool]:
+        """Build LangChain tools whose calls are routed through the pool.
+
+        Args:
+            coalesce_window: If set, concurrent calls to a tool that has a
+                `<name>_batch` variant are coalesced into one batch call
+                within this many seconds (see BatchCoalescer)
+        """
+        schemas = await self.list_tools()
+        if coalesce_window is not None:
+            caller = BatchCoalescer(self, window=coalesce_window).call
+        else:
+            caller = self.call_tool_text
+        return [to_langchain_tool(schema, caller) for schema in schemas]
+
+
+def result_text(result) -> str:
+    """Join the text content of an MCP tool result, raising if it is an error."""
+    text = "\n".join(
+        content.text for content in result.content if getattr(content, "type", None) == "text"
+    )
+    if result.isError:
+        raise RuntimeError(text)
+    return text
+
+
+def to_langchain_tool(schema, caller) -> StructuredTool:
+    """Wrap an MCP tool schema as a LangChain tool that calls `caller(name, arguments)`."""
+    async def call(**arguments):
+        return await caller(schema.name, arguments)
+
+    return StructuredTool(
+        name=schema.name,
+        description=schema.description or "",
+        args_schema=schema.inputSchema,
+        coroutine=call,
+    )
+
+
+class BatchCoalescer:
+    """Coalesce concurrent single-item tool calls into `<name>_batch` calls.
+
+    The first call to a tool opens a short window; every call to the same tool
+    that arrives inside it joins the batch. The batch result is split back
+    into per-call results, and per-item errors are raised only for their own
+    caller. Tools without a batch variant are called directly.
+
+    Args:
+        pool: Started MCPSessionPool
+        window: Seconds to wait for more calls before sending a batch
+        max_batch_size: Send early once this many calls are pending
+    """
+
+    def __init__(self, pool: MCPSessionPool, window: float = 0.005, max_batch_size: int = 50):
+        self.pool = pool
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._pending: dict[str, list[tuple[dict, asyncio.Future]]] = {}
+        # Window timer of each tool with pending calls
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._flush_tasks: set[asyncio.Task] = set()
+
+    async def call(self, name: str, arguments: dict[str, Any]) -> str:
+        batch_names = {schema.name for schema in await self.pool.list_tools()}
+        if f"{name}_batch" not in batch_names:
+            return await self.pool.call_tool_text(name, arguments)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(name, [])
+        pending.append((arguments, future))
+        if len(pending) >= self.max_batch_size:
+            self._flush(name)
+        elif len(pending) == 1:
+            self._timers[name] = loop.call_later(self.window, self._flush, name)
+        return await future
+
+    def _flush(self, name: str):
+        """Take the tool's pending calls now and send them as one batch.
+
+        Cancels the window timer, so calls arriving after an early flush
+        start a window of their own.
+        """
+        timer = self._timers.pop(name, None)
+        if timer is not None:
+            timer.cancel()
+        # Callers cancelled while waiting for the window are not sent
+        batch = [(arguments, future) for arguments, future in self._pending.pop(name, []) if not future.done()]
+        if not batch:
+            return
+        task = asyncio.create_task(self._send(name, batch))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _send(self, name: str, batch: list[tuple[dict, asyncio.Future]]):
+        try:
+            if len(batch) == 1:
+                arguments, future = batch[0]
+                result = await self.pool.call_tool_text(name, arguments)
+                if not future.done():
+                    future.set_result(result)
+                return
+            text = await self.pool.call_tool_text(
+                f"{name}_batch", {"items": [arguments for arguments, _ in batch]}
+            )
+            items = json.loads(text)
+            for (_, future), item in zip(batch, items):
+                # The caller may have been cancelled while the batch ran
+                if future.done():
+                    continue
+                if "error" in item:
+                    future.set_exception(RuntimeError(item["error"]))
+                else:
+                    future.set_result(item["result"])
+            if len(items) != len(batch):
+                raise RuntimeError(f"{name}_batch returned {len(items)} results for {len(batch)} items")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
@@ -20,12 +20,17 @@ from dotenv import load_dotenv
 load_dotenv(override=True)
 from langchain.chat_models import init_chat_model
 
+from utils.rate_limiter import rate_limited
+
+# rate_limited(provider) attaches the process-wide requests/tokens per minute
+# limiter for that provider, shared by every graph in langgraph.json. Its
+# limits come from RATE_LIMIT_<PROVIDER>_RPM / _TPM in .env (unset: unlimited).
 
 # ---- Default Models -------------------------------------------------------
-# model = init_chat_model("openai:gpt-4.1-mini")
+# model = init_chat_model("openai:gpt-4.1-mini", **rate_limited("openai"))
 
 # Use Anthropic by default
-model = init_chat_model("anthropic:claude-haiku-4-5")
+model = init_chat_model("anthropic:claude-haiku-4-5", **rate_limited("anthropic"))
 
 
 # ---- Azure OpenAI ---------------------------------------------------------
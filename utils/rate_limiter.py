@@ -0,0 +1,241 @@
+"""
+Rate Limiter
+
+Process-wide token-bucket rate limiting per provider, shared by every graph
+in langgraph.json (they all run in one `langgraph dev` process).
+
+Each provider gets one TokenBucketRateLimiter with two buckets:
+- requests per minute
+- tokens per minute, charged by the estimated prompt + output size of a call
+
+The limiter plugs into LangChain's `rate_limiter=` chat-model parameter. The
+token estimate for a call comes from RateLimitCallbackHandler, which runs
+inline on chat-model start (before the limiter is consulted) and reconciles
+the estimate with actual usage on completion. When a provider returns 429,
+the whole limiter pauses with exponential backoff and jitter, so every caller
+backs off instead of each `.with_retry` hammering the API independently.
+
+Usage:
+    model = init_chat_model("openai:gpt-4.1-mini", **rate_limited("openai"))
+
+Limits are read from RATE_LIMIT_<PROVIDER>_RPM / RATE_LIMIT_<PROVIDER>_TPM and
+depend on the account's tier, so none are assumed: a provider without them
+is not throttled, though a 429 still pauses its callers.
+
+Buckets live in process memory, so every process has its own. Processes
+that share one account (e.g. the graph server and the research queue
+workers, see agents/researcher/worker.py) would together send N times the
+limits; RATE_LIMIT_PROCESSES=N gives each process 1/N of them instead.
+start_workers sets it for the workers it starts.
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.rate_limiters import BaseRateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Tokens charged per call when no estimate is available
+DEFAULT_CALL_TOKENS = 2_000
+
+# (run id, token estimate) of the call being made in the current context
+_estimated_tokens: contextvars.ContextVar[Optional[tuple[Any, int]]] = contextvars.ContextVar(
+    "estimated_tokens", default=None
+)
+
+
+class TokenBucket:
+    """Continuously refilling bucket; capacity is `burst_seconds` worth of rate."""
+
+    def __init__(self, per_minute: float, burst_seconds: float = 10.0):
+        self.rate = per_minute / 60.0
+        self.capacity = max(self.rate * burst_seconds, 1.0)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available (clamped to capacity)."""
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+
+class TokenBucketRateLimiter(BaseRateLimiter):
+    """Requests-per-minute and tokens-per-minute limiter for one provider.
+
+    Args:
+        name: Provider name, used in logs
+        requests_per_minute: Request budget (0 disables the request bucket)
+        tokens_per_minute: Token budget (0 disables the token bucket)
+        burst_seconds: How many seconds of budget may be spent in one burst
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: float,
+        tokens_per_minute: float = 0,
+        burst_seconds: float = 10.0,
+    ):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute, burst_seconds) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute, burst_seconds) if tokens_per_minute else None
+        self.blocked_until = 0.0
+        self.consecutive_429s = 0
+        self.stats = {"admitted": 0, "waited_seconds": 0.0, "rate_limited": 0}
+        self._charged: dict[Any, float] = {}  # run id -> tokens taken from the bucket
+        self._lock = threading.Lock()
+
+    def _try_acquire(self, cost: float, run_id: Any = None) -> float:
+        """Take one request and `cost` tokens, or return how long to wait."""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(self.blocked_until - now, 0.0)
+            for bucket, amount in ((self.requests, 1), (self.tokens, cost)):
+                if bucket is not None:
+                    bucket.refill(now)
+                    wait = max(wait, bucket.wait_time(amount))
+            if wait > 0:
+                return wait
+
+            if self.requests is not None:
+                self.requests.level -= 1
+            if self.tokens is not None:
+                charged = min(cost, self.tokens.capacity)
+                self.tokens.level -= charged
+                if run_id is not None:
+                    self._charged[run_id] = charged
+            self.stats["admitted"] += 1
+            return 0.0
+
+    def _cost(self) -> tuple[Any, int]:
+        run_id, estimate = _estimated_tokens.get() or (None, None)
+        return run_id, estimate or DEFAULT_CALL_TOKENS
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        run_id, cost = self._cost()
+        while (wait := self._try_acquire(cost, run_id)) > 0:
+            if not blocking:
+                return False
+            self.stats["waited_seconds"] += wait
+            time.sleep(wait)
+        return True
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        run_id, cost = self._cost()
+        while (wait := self._try_acquire(cost, run_id)) > 0:
+            if not blocking:
+                return False
+            self.stats["waited_seconds"] += wait
+            await asyncio.sleep(wait)
+        return True
+
+    def reconcile(self, run_id: Any, actual: Optional[int]) -> None:
+        """Charge (or refund) the difference between the tokens a run was charged and used.
+
+        Only what was actually taken from the bucket is refunded: a large
+        estimate is clamped to the bucket's capacity when it is charged.
+        With `actual` None the run's charge is kept and just forgotten.
+        """
+        with self._lock:
+            charged = self._charged.pop(run_id, None)
+            if self.tokens is None or charged is None or not actual:
+                return
+            self.tokens.refill(time.monotonic())
+            self.tokens.level = min(self.tokens.capacity, self.tokens.level - (actual - charged))
+
+    def on_rate_limited(self) -> None:
+        """Pause every caller with exponential backoff and full jitter after a 429."""
+        with self._lock:
+            self.consecutive_429s += 1
+            self.stats["rate_limited"] += 1
+            backoff = min(2 ** self.consecutive_429s, 60)
+            pause = random.uniform(backoff / 2, backoff)
+            self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+        logger.warning("%s returned 429; pausing all calls for %.1fs", self.name, pause)
+
+    def on_success(self) -> None:
+        self.consecutive_429s = 0
+
+
+def _is_rate_limit_error(error: BaseException) -> bool:
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or "rate limit" in str(error).lower() or "429" in type(error).__name__
+
+
+class RateLimitCallbackHandler(BaseCallbackHandler):
+    """Feeds token estimates to a TokenBucketRateLimiter and reports outcomes.
+
+    Runs inline so the estimate set on chat-model start is visible to the
+    limiter, which LangChain consults right after the start callbacks.
+    """
+
+    run_inline = True
+
+    def __init__(self, limiter: TokenBucketRateLimiter, max_output_tokens: int = 1_000):
+        self.limiter = limiter
+        self.max_output_tokens = max_output_tokens
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        estimate = sum(count_tokens_approximately(batch) for batch in messages) + self.max_output_tokens
+        _estimated_tokens.set((run_id, estimate))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self.limiter.on_success()
+        actual = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                actual += usage.get("total_tokens", 0)
+        self.limiter.reconcile(run_id, actual)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self.limiter.reconcile(run_id, None)
+        if _is_rate_limit_error(error):
+            self.limiter.on_rate_limited()
+
+
+_limiters: dict[str, TokenBucketRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> TokenBucketRateLimiter:
+    """Get the process-wide limiter for a provider.
+
+    Limits come from RATE_LIMIT_<PROVIDER>_RPM / _TPM, divided by
+    RATE_LIMIT_PROCESSES; an unset limit leaves that bucket disabled.
+    """
+    provider = provider.lower()
+    with _limiters_lock:
+        if provider not in _limiters:
+            prefix = f"RATE_LIMIT_{provider.upper()}"
+            processes = max(int(os.getenv("RATE_LIMIT_PROCESSES") or 1), 1)
+            _limiters[provider] = TokenBucketRateLimiter(
+                provider,
+                requests_per_minute=float(os.getenv(f"{prefix}_RPM") or 0) / processes,
+                tokens_per_minute=float(os.getenv(f"{prefix}_TPM") or 0) / processes,
+            )
+        return _limiters[provider]
+
+
+def rate_limited(provider: str, max_output_tokens: int = 1_000) -> dict:
+    """Chat-model kwargs that attach the shared limiter for `provider`."""
+    limiter = get_rate_limiter(provider)
+    return {
+        "rate_limiter": limiter,
+        "callbacks": [RateLimitCallbackHandler(limiter, max_output_tokens=max_output_tokens)],
+    }
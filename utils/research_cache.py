@@ -0,0 +1,231 @@
+"""
+Research Cache
+
+Cross-run cache of researcher outputs (compressed_research and raw_notes),
+keyed by a fingerprint of the research topic (normalized for case,
+whitespace and punctuation only), so a topic researched by one run can be
+answered from cache in the next one instead of re-running the researcher
+subgraph.
+
+Entries are partitioned by a scope string (the graph uses the run's user
+and assistant ids): a lookup only sees entries stored under the same
+scope, so one user's research is never served to another.
+
+Freshness: entries older than the TTL are treated as misses (and removed by
+`purge_expired`); a lookup can ask for a stricter `max_age`. Matching is
+exact on the fingerprint by default; with a similarity threshold, the
+freshest entry whose topic tokens overlap enough (Jaccard) is used instead.
+
+Each entry records how long the research originally took, so the cache can
+report the compute it saved. The default store is SQLite at
+RESEARCH_CACHE_PATH (defaults to .research_cache.sqlite3 in the project root).
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+from utils.text_similarity import fingerprint, jaccard, tokenize
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_RESEARCH_CACHE_PATH = PROJECT_ROOT / ".research_cache.sqlite3"
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+# Near-duplicate matching scans at most this many of the freshest entries
+MAX_SIMILARITY_CANDIDATES = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS research_cache (
+    scope TEXT NOT NULL DEFAULT '',
+    fingerprint TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    tokens TEXT NOT NULL,
+    compressed_research TEXT NOT NULL,
+    raw_notes TEXT NOT NULL,
+    compute_seconds REAL NOT NULL,
+    created_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (scope, fingerprint)
+);
+CREATE INDEX IF NOT EXISTS research_cache_created_at ON research_cache (scope, created_at);
+"""
+
+
+class ResearchCache:
+    """SQLite-backed cache of research results keyed by topic fingerprint."""
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_RESEARCH_CACHE_PATH,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        similarity_threshold: Optional[float] = None,
+    ):
+        """
+        Args:
+            path: SQLite database file
+            ttl_seconds: Entries older than this are never returned
+            similarity_threshold: Minimum token Jaccard similarity for a
+                near-duplicate match; None matches exact fingerprints only
+        """
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "hits": 0, "near_duplicate_hits": 0, "saved_seconds": 0.0}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(research_cache)")}
+            if columns and "scope" not in columns:
+                # Entries from before scoping cannot be attributed to anyone; it is only a cache
+                conn.execute("DROP TABLE research_cache")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection for one transaction (committed on success) and close it afterwards."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def lookup(
+        self,
+        topic: str,
+        max_age: Optional[float] = None,
+        similarity_threshold: Optional[float] = None,
+        scope: str = "",
+    ) -> Optional[dict]:
+        """Return the cached result for a topic, or None on a miss.
+
+        Args:
+            topic: Research topic as given to ConductResearch
+            max_age: Stricter freshness for this lookup, in seconds (capped by the TTL)
+            similarity_threshold: Overrides the cache's near-duplicate threshold
+            scope: Only entries stored under this scope are returned
+
+        Returns:
+            Dict with compressed_research, raw_notes, similarity, age_seconds
+            and compute_seconds
+        """
+        now = time.time()
+        max_age = self.ttl_seconds if max_age is None else min(max_age, self.ttl_seconds)
+        threshold = self.similarity_threshold if similarity_threshold is None else similarity_threshold
+        key = fingerprint(topic)
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM research_cache WHERE scope = ? AND fingerprint = ? AND created_at >= ?",
+                (scope, key, now - max_age),
+            ).fetchone()
+            similarity, near_duplicate = 1.0, False
+
+            if row is None and threshold is not None:
+                row, similarity = self._nearest(conn, scope, set(tokenize(topic)), now - max_age, threshold)
+                near_duplicate = row is not None
+
+            if row is not None:
+                conn.execute(
+                    "UPDATE research_cache SET hits = hits + 1 WHERE scope = ? AND fingerprint = ?",
+                    (scope, row["fingerprint"]),
+                )
+
+        with self._lock:
+            self._stats["lookups"] += 1
+            if row is not None:
+                self._stats["hits"] += 1
+                self._stats["saved_seconds"] += row["compute_seconds"]
+                if near_duplicate:
+                    self._stats["near_duplicate_hits"] += 1
+        if row is None:
+            return None
+
+        return {
+            "compressed_research": row["compressed_research"],
+            "raw_notes": json.loads(row["raw_notes"]),
+            "similarity": similarity,
+            "age_seconds": now - row["created_at"],
+            "compute_seconds": row["compute_seconds"],
+        }
+
+    @staticmethod
+    def _nearest(conn: sqlite3.Connection, scope: str, tokens: set, min_created_at: float, threshold: float):
+        best, best_similarity = None, 0.0
+        candidates = conn.execute(
+            "SELECT * FROM research_cache WHERE scope = ? AND created_at >= ? ORDER BY created_at DESC LIMIT ?",
+            (scope, min_created_at, MAX_SIMILARITY_CANDIDATES),
+        )
+        for row in candidates:
+            similarity = jaccard(tokens, set(json.loads(row["tokens"])))
+            if similarity >= threshold and (best is None or similarity > best_similarity):
+                best, best_similarity = row, similarity
+        return best, best_similarity
+
+    def store(
+        self,
+        topic: str,
+        compressed_research: str,
+        raw_notes: list[str],
+        compute_seconds: float,
+        scope: str = "",
+    ):
+        """Cache a research result, replacing any older entry for the same scope and fingerprint."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO research_cache "
+                "(scope, fingerprint, topic, tokens, compressed_research, raw_notes, compute_seconds, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    scope,
+                    fingerprint(topic),
+                    topic,
+                    json.dumps(sorted(set(tokenize(topic)))),
+                    compressed_research,
+                    json.dumps(raw_notes),
+                    compute_seconds,
+                    time.time(),
+                ),
+            )
+
+    def purge_expired(self) -> int:
+        """Delete entries older than the TTL; returns the number deleted."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM research_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            return cursor.rowcount
+
+    def stats(self) -> dict:
+        """Hit rate and saved compute for this process, plus lifetime totals from the store."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["misses"] = stats["lookups"] - stats["hits"]
+        stats["hit_rate"] = stats["hits"] / stats["lookups"] if stats["lookups"] else 0.0
+
+        with self._connect() as conn:
+            entries, lifetime_hits, lifetime_saved = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(hits), 0), COALESCE(SUM(hits * compute_seconds), 0) FROM research_cache"
+            ).fetchone()
+        stats.update(entries=entries, lifetime_hits=lifetime_hits, lifetime_saved_seconds=lifetime_saved)
+        return stats
+
+
+_research_cache: Optional[ResearchCache] = None
+
+
+def get_research_cache() -> ResearchCache:
+    """Get the process-wide research cache backed by RESEARCH_CACHE_PATH."""
+    global _research_cache
+    if _research_cache is None:
+        _research_cache = ResearchCache(os.getenv("RESEARCH_CACHE_PATH", DEFAULT_RESEARCH_CACHE_PATH))
+    return _research_cache
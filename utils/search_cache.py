@@ -0,0 +1,251 @@
+"""
+Search Cache
+
+Per-run cache shared by every researcher of one research run (one thread),
+so that parallel researchers do not pay for, or read, the same pages twice.
+
+- Identical searches (same provider, normalized query and parameters) run
+  once; concurrent identical searches wait on the in-flight one
+- Results are deduped by canonical URL (lowercased host, no "www.", default
+  port, fragment or tracking parameters, sorted query) and content hash
+  before they are returned to a researcher: a page already handed to the
+  same researcher is replaced by a one-line reference instead of its full
+  content. Dedupe is scoped to one research unit (the config's
+  research_unit_id), because each researcher compresses only what it was
+  shown: hiding a page another researcher read would drop it from this
+  researcher's findings
+
+Caches are kept per (thread id, run id) and dropped after
+SEARCH_CACHE_IDLE_SECONDS without use, or explicitly with
+`reset_search_cache` when a new run starts (`drop_other_run_caches` in
+worker processes). A run with neither id gets a cache of its own per call,
+so unrelated runs never share results.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from langgraph.config import get_config
+
+from utils.blob_store import UNTHREADED, thread_id_from_config
+from utils.rate_limiter import get_rate_limiter
+
+SEARCH_CACHE_IDLE_SECONDS = 15 * 60
+MAX_CACHED_RUNS = 64
+
+TRACKING_PARAMS = re.compile(r"^(utm_.*|fbclid|gclid|dclid|msclkid|mc_cid|mc_eid|ref|ref_src|igshid)$")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonical_url(url: str) -> str:
+    """Canonical form of a URL, so trivially different links to one page compare equal."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or "https"
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/") or "/"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not TRACKING_PARAMS.match(key.lower())
+    ))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def content_hash(text: str) -> str:
+    """Hash of text with whitespace and case normalized."""
+    normalized = " ".join(str(text).lower().split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    """Search cache and result deduplication for one research run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._searches: dict[tuple, Future] = {}
+        # Canonical URLs and content hashes handed out, per dedupe scope
+        self._seen: dict[Optional[str], tuple[set[str], set[str]]] = {}
+        self.last_used = time.monotonic()
+        self.stats = {"searches": 0, "search_hits": 0, "duplicate_results": 0}
+
+    def _single_flight(self, cache: dict, key, compute: Callable, miss_stat: str, hit_stat: str):
+        """Return the cached value for key, computing it once even under concurrent callers."""
+        with self._lock:
+            self.last_used = time.monotonic()
+            future = cache.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                cache[key] = future
+                self.stats[miss_stat] += 1
+            else:
+                self.stats[hit_stat] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = compute()
+        except Exception as e:
+            # Do not cache failures; the next caller retries
+            with self._lock:
+                cache.pop(key, None)
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        return result
+
+    def search(self, provider: str, query: str, search_fn: Callable[[], list[dict]], **params) -> list[dict]:
+        """Run a provider search once per run for the same normalized query and parameters.
+
+        Args:
+            provider: Provider name, e.g. "tavily"
+            query: Search query
+            search_fn: Performs the search and returns result dicts with "url"
+            **params: Search parameters that are part of the cache key
+        """
+        key = (provider, " ".join(query.lower().split()), tuple(sorted(params.items())))
+        return self._single_flight(self._searches, key, search_fn, "searches", "search_hits")
+
+    def dedupe(self, results: list[dict], scope: Optional[str] = None) -> tuple[list[dict], list[dict]]:
+        """Split results into pages new to a scope and ones already handed out in it.
+
+        A result is a duplicate if its canonical URL or content hash was seen
+        before in the same scope, in this batch or an earlier one. New
+        results are marked seen.
+
+        Args:
+            results: Result dicts with "url" and "content" or "raw_content"
+            scope: Who the results are for, e.g. a research unit id
+
+        Returns:
+            Tuple of (new results, duplicate results)
+        """
+        new, duplicates = [], []
+        with self._lock:
+            seen_urls, seen_hashes = self._seen.setdefault(scope, (set(), set()))
+            for result in results:
+                url = canonical_url(result.get("url", ""))
+                digest = content_hash(result.get("raw_content") or result.get("content", ""))
+                if url in seen_urls or digest in seen_hashes:
+                    duplicates.append(result)
+                    self.stats["duplicate_results"] += 1
+                    continue
+                seen_urls.add(url)
+                seen_hashes.add(digest)
+                new.append(result)
+        return new, duplicates
+
+
+_caches: "OrderedDict[tuple[str, str], SearchCache]" = OrderedDict()
+_caches_lock = threading.Lock()
+
+
+def _current_config(config):
+    """The given config, or the config of the graph run this is called from."""
+    if config is not None:
+        return config
+    try:
+        return get_config()
+    except RuntimeError:
+        # Called outside a graph run
+        return None
+
+
+def _run_key(config) -> Optional[tuple[str, str]]:
+    """(thread id, run id) of the run a config belongs to, or None if it has neither."""
+    thread_id = thread_id_from_config(config)
+    run_id = (config or {}).get("configurable", {}).get("run_id")
+    if thread_id == UNTHREADED and run_id is None:
+        return None
+    return thread_id, str(run_id)
+
+
+def get_search_cache(config=None) -> SearchCache:
+    """Get the search cache of the run identified by the config's thread and run id.
+
+    Without a config, the config of the enclosing graph run is used.
+    """
+    run_key = _run_key(_current_config(config))
+    if run_key is None:
+        return SearchCache()
+    now = time.monotonic()
+    with _caches_lock:
+        for key in [key for key, cache in _caches.items() if now - cache.last_used > SEARCH_CACHE_IDLE_SECONDS]:
+            del _caches[key]
+        cache = _caches.get(run_key)
+        if cache is None:
+            cache = _caches[run_key] = SearchCache()
+            while len(_caches) > MAX_CACHED_RUNS:
+                _caches.popitem(last=False)
+        _caches.move_to_end(run_key)
+        return cache
+
+
+def reset_search_cache(config=None):
+    """Start a fresh cache for the config's run, e.g. when a new research run begins."""
+    with _caches_lock:
+        _caches.pop(_run_key(_current_config(config)), None)
+
+
+def drop_other_run_caches(config=None):
+    """Drop the caches of earlier runs on the config's thread.
+
+    Used by queue workers, which never see a run start and would otherwise
+    keep a finished run's cache until it goes idle.
+    """
+    run_key = _run_key(_current_config(config))
+    if run_key is None:
+        return
+    with _caches_lock:
+        for key in [key for key in _caches if key[0] == run_key[0] and key != run_key]:
+            del _caches[key]
+
+
+def format_search_results(query: str, results: list[dict], duplicates: list[dict]) -> str:
+    """Format search results for a model, listing duplicates as one-line references."""
+    result_texts = []
+    for result in results:
+        content = result.get("content", "No content available")
+        result_texts.append(f"## {result['title']}\n**URL:** {result['url']}\n\n{content}\n\n---\n")
+
+    output = f"Found {len(result_texts)} result(s) for '{query}':\n\n{''.join(result_texts)}"
+    if duplicates:
+        output += "\nDuplicates of pages you already retrieved (content omitted):\n"
+        output += "".join(f"- {result['title']}: {result['url']}\n" for result in duplicates)
+    return output
+
+
+def cached_tavily_search(client, query: str, config=None, max_results: int = 3, topic: str = "general") -> str:
+    """Tavily search through the run's search cache, returning deduped, formatted results.
+
+    Searches are shared by the whole run; results are deduped against what
+    the calling research unit (the config's research_unit_id) has already
+    been shown.
+
+    Args:
+        client: TavilyClient
+        query: Search query
+        config: Config selecting the run's cache and research unit (defaults to the enclosing run's)
+        max_results: Max results per search
+        topic: Tavily search topic
+    """
+    def search():
+        # Share the Tavily request budget with every other graph in this process
+        get_rate_limiter("tavily").acquire()
+        return client.search(query, max_results=max_results, topic=topic).get("results", [])
+
+    config = _current_config(config)
+    cache = get_search_cache(config)
+    results = cache.search("tavily", query, search, max_results=max_results, topic=topic)
+    new, duplicates = cache.dedupe(results, (config or {}).get("configurable", {}).get("research_unit_id"))
+    return format_search_results(query, new, duplicates)
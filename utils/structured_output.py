@@ -0,0 +1,347 @@
+"""
+Structured Output
+
+Local repair for structured model outputs, tried before re-calling the model.
+
+`model.with_structured_output(schema).with_retry(...)` re-sends the whole
+prompt whenever the output does not parse or validate. Most of those
+failures are small and mechanical, so `with_json_repair` first tries to fix
+the output the model already returned:
+
+- truncated JSON (missing closing brackets; a value cut off mid-way is
+  dropped, so a required one still re-calls the model, and the repair is
+  counted as lossy)
+- prose or markdown fences around the JSON
+- wrong scalar types ("true" for a bool, 3 for a str, a str for a list,
+  "Respond" for the literal "respond")
+- missing keys whose type allows None
+
+Only when repair fails is the model called again. Outcomes are counted per
+schema in `structured_output_stats`; "lossy" counts the repairs (also in
+"repaired") that had to drop a truncated value to parse.
+
+Usage:
+    llm_router = with_json_repair(model, RouterSchema)
+"""
+
+import asyncio
+import json
+import logging
+import random
+import re
+import time
+import types
+from typing import Any, Literal, Optional, Union, get_args, get_origin
+
+from langchain_core.runnables import RunnableLambda
+
+logger = logging.getLogger(__name__)
+
+# Per schema name: outputs that parsed as-is, outputs fixed locally (and how
+# many of those dropped truncated content), model re-calls for outputs that
+# could not be repaired, and calls that gave up with the output still
+# unrepaired
+structured_output_stats: dict[str, dict[str, int]] = {}
+
+# Delay before retrying a failed model call; doubles per attempt, plus jitter
+RETRY_BACKOFF_SECONDS = 1
+
+TRUE_STRINGS = {"true", "yes", "y", "1"}
+FALSE_STRINGS = {"false", "no", "n", "0", "none", "null", ""}
+
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)\s*(?:```|$)", re.DOTALL)
+# Literals that cannot be the prefix of a longer value, unlike a number (12 of 123)
+_COMPLETE_LITERAL = re.compile(r"[\s\[{:,](true|false|null)$")
+
+
+class StructuredOutputError(ValueError):
+    """Raised when a structured output could neither be parsed nor repaired."""
+
+
+def _close_json(text: str) -> list[tuple[str, bool]]:
+    """Candidate completions of a truncated JSON prefix, most complete first.
+
+    If the text was cut right after a complete value (a string, object,
+    array, true, false or null), closing the open brackets loses nothing
+    and is tried first. Otherwise the candidates cut back to each earlier
+    comma outside strings in turn, dropping the trailing key or value that
+    was cut off mid-way. A string cut off mid-way is never closed
+    artificially, and a trailing number is never kept, since either would
+    pass truncated text off as the model's answer.
+
+    Returns:
+        (candidate, lossy) pairs; lossy candidates dropped some of the text
+    """
+    stack = []
+    in_string = escaped = False
+    cut_points = []  # (position of a comma outside strings, brackets open there)
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if stack:
+                stack.pop()
+        elif char == ",":
+            cut_points.append((i, list(stack)))
+
+    candidates = []
+    tail = text.rstrip()
+    if not in_string and (tail.endswith(('"', "}", "]")) or _COMPLETE_LITERAL.search(tail)):
+        candidates.append((tail + "".join(reversed(stack)), False))
+    for position, open_brackets in reversed(cut_points):
+        # Cutting at a trailing comma ("[1, 2,") drops nothing
+        lossy = bool(text[position + 1:].strip())
+        candidates.append((text[:position] + "".join(reversed(open_brackets)), lossy))
+    return candidates
+
+
+def recover_json(text: str) -> tuple[Optional[Any], bool]:
+    """Extract a JSON object from model text, completing it if truncated.
+
+    Returns:
+        Tuple of (the object, or None if none can be recovered; whether a
+        truncated value had to be dropped to recover it)
+    """
+    fenced = _FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    start = text.find("{")
+    if start == -1:
+        return None, False
+    text = text[start:]
+
+    # raw_decode stops at the end of the first complete value, ignoring trailing prose
+    decoder = json.JSONDecoder()
+    try:
+        return decoder.raw_decode(text)[0], False
+    except json.JSONDecodeError:
+        pass
+    for candidate, lossy in _close_json(text):
+        try:
+            return decoder.raw_decode(candidate)[0], lossy
+        except json.JSONDecodeError:
+            continue
+    return None, False
+
+
+def repair_json(text: str) -> Optional[Any]:
+    """Extract a JSON object from model text, completing it if truncated.
+
+    Returns None if no JSON object can be recovered. Use recover_json to
+    also learn whether truncated content was dropped.
+    """
+    return recover_json(text)[0]
+
+
+def _allows_none(annotation) -> bool:
+    return annotation is None or (
+        get_origin(annotation) in (Union, types.UnionType) and type(None) in get_args(annotation)
+    )
+
+
+def coerce_value(value, annotation):
+    """Best-effort conversion of a JSON value to a field's annotated type."""
+    origin, args = get_origin(annotation), get_args(annotation)
+    if origin in (Union, types.UnionType):
+        if value is None and type(None) in args:
+            return None
+        options = [arg for arg in args if arg is not type(None)]
+        return coerce_value(value, options[0]) if len(options) == 1 else value
+    if origin is Literal:
+        if isinstance(value, str) and value not in args:
+            matches = [arg for arg in args if isinstance(arg, str) and arg.lower() == value.strip().lower()]
+            return matches[0] if matches else value
+        return value
+    if origin is list:
+        if isinstance(value, str):
+            # A JSON-encoded list, or a single item
+            try:
+                loaded = json.loads(value)
+            except json.JSONDecodeError:
+                loaded = None
+            value = loaded if isinstance(loaded, list) else [value]
+        if isinstance(value, list) and args:
+            return [coerce_value(item, args[0]) for item in value]
+        return value
+    if annotation is bool:
+        if isinstance(value, str) and value.strip().lower() in TRUE_STRINGS | FALSE_STRINGS:
+            return value.strip().lower() in TRUE_STRINGS
+        if isinstance(value, (int, float)) and value in (0, 1):
+            return bool(value)
+        return value
+    if annotation is str:
+        if isinstance(value, bool):
+            return str(value).lower()
+        if isinstance(value, (int, float)):
+            return str(value)
+        return value
+    if annotation in (int, float) and isinstance(value, str):
+        try:
+            return annotation(value.strip())
+        except ValueError:
+            return value
+    return value
+
+
+def coerce_to_schema(data: dict, schema) -> dict:
+    """Fit a decoded JSON object to a pydantic schema's fields.
+
+    Unwraps a single wrapping key (e.g. {"RouterSchema": {...}}), converts
+    values to the annotated types and fills missing keys that allow None.
+    """
+    fields = schema.model_fields
+    if len(data) == 1 and not set(data) & set(fields):
+        (inner,) = data.values()
+        if isinstance(inner, dict):
+            data = inner
+    data = dict(data)
+    for name, field in fields.items():
+        if name in data:
+            data[name] = coerce_value(data[name], field.annotation)
+        elif field.is_required() and _allows_none(field.annotation):
+            data[name] = None
+    return data
+
+
+def _message_text(message) -> str:
+    content = getattr(message, "content", "")
+    if isinstance(content, list):
+        return "".join(
+            block.get("text", "") if isinstance(block, dict) else str(block) for block in content
+        )
+    return content or ""
+
+
+# stop_reason / finish_reason values of a response cut off by the output limit
+TRUNCATED_STOP_REASONS = {"max_tokens", "length"}
+
+
+def _is_truncated(raw) -> bool:
+    metadata = getattr(raw, "response_metadata", None) or {}
+    return (metadata.get("stop_reason") or metadata.get("finish_reason")) in TRUNCATED_STOP_REASONS
+
+
+def _repair_candidates(raw, schema) -> list:
+    """Everything in the raw model message that may hold the schema's JSON.
+
+    Tool call arguments of a response cut off by the output limit are skipped:
+    the provider has already closed any string that was cut off mid-way.
+    """
+    candidates = []
+    if not _is_truncated(raw):
+        for call in getattr(raw, "tool_calls", None) or []:
+            if call.get("name") in (schema.__name__, None):
+                candidates.append(call.get("args"))
+    for call in getattr(raw, "invalid_tool_calls", None) or []:
+        if call.get("name") in (schema.__name__, None):
+            candidates.append(call.get("args"))
+    candidates.append(_message_text(raw))
+    return candidates
+
+
+def _schema_stats(schema) -> dict[str, int]:
+    return structured_output_stats.setdefault(
+        schema.__name__, {"parsed": 0, "repaired": 0, "lossy": 0, "recalls": 0, "failed": 0}
+    )
+
+
+def parse_or_repair(schema, output: dict):
+    """Return the parsed output, repairing it locally if it did not parse.
+
+    Args:
+        schema: Pydantic schema the output should match
+        output: Result of with_structured_output(schema, include_raw=True)
+
+    Raises:
+        StructuredOutputError: The output could not be repaired
+    """
+    stats = _schema_stats(schema)
+    if output.get("parsed") is not None and output.get("parsing_error") is None:
+        stats["parsed"] += 1
+        return output["parsed"]
+
+    for candidate in _repair_candidates(output.get("raw"), schema):
+        data, lossy = recover_json(candidate) if isinstance(candidate, str) else (candidate, False)
+        if not isinstance(data, dict):
+            continue
+        try:
+            repaired = schema.model_validate(coerce_to_schema(data, schema))
+        except ValueError:
+            continue
+        stats["repaired"] += 1
+        if lossy:
+            # Only optional fields can be missing here, but their values are lost
+            stats["lossy"] += 1
+            logger.warning(
+                "Repaired truncated %s output by dropping a value that was cut off: %s",
+                schema.__name__, candidate[-200:]
+            )
+        else:
+            logger.info("Repaired %s output locally (%s)", schema.__name__, output.get("parsing_error") or "no parse")
+        return repaired
+
+    raise StructuredOutputError(
+        f"Unrepairable {schema.__name__} output: {output.get('parsing_error') or 'no structured output'}"
+    )
+
+
+def with_json_repair(model, schema, max_attempts: int = 3, **kwargs):
+    """Structured output runnable that repairs bad outputs before re-calling the model.
+
+    Like .with_retry(stop_after_attempt=max_attempts), a failed model call
+    is retried with exponential backoff. An output that cannot be repaired
+    re-calls the model straight away; those re-calls are counted as
+    "recalls", and outputs still unrepaired after the last attempt as
+    "failed".
+
+    Args:
+        model: Chat model (optionally with tools bound)
+        schema: Pydantic schema for the output
+        max_attempts: Model calls before giving up
+        **kwargs: Passed to with_structured_output (e.g. method)
+    """
+    structured = model.with_structured_output(schema, include_raw=True, **kwargs)
+
+    def on_failure(error: Exception, attempt: int) -> Optional[float]:
+        """Record a failed attempt; return the delay before the next one, or None to give up."""
+        unrepaired = isinstance(error, StructuredOutputError)
+        if attempt == max_attempts:
+            if unrepaired:
+                _schema_stats(schema)["failed"] += 1
+            return None
+        if unrepaired:
+            _schema_stats(schema)["recalls"] += 1
+            logger.warning("%s; calling the model again", error)
+            return 0.0
+        return RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1) + random.uniform(0, 1)
+
+    def invoke(messages, config):
+        for attempt in range(1, max_attempts + 1):
+            try:
+                return parse_or_repair(schema, structured.invoke(messages, config))
+            except Exception as e:
+                delay = on_failure(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+
+    async def ainvoke(messages, config):
+        for attempt in range(1, max_attempts + 1):
+            try:
+                return parse_or_repair(schema, await structured.ainvoke(messages, config))
+            except Exception as e:
+                delay = on_failure(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+
+    return RunnableLambda(invoke, afunc=ainvoke, name=f"{schema.__name__}_with_repair")
@@ -0,0 +1,260 @@
+"""
+Task Queue
+
+Durable local task queue on SQLite, shared by any number of processes on
+one machine. Used to hand research units to a pool of worker processes
+(see agents/researcher/worker.py and RESEARCH_EXECUTOR in
+agents/researcher/graph.py).
+
+- enqueue: idempotent by task id, so a re-executed step re-attaches to its
+  existing task (and its result, if already done)
+- lease: a worker claims one available task for `visibility_timeout`
+  seconds; if it does not heartbeat or finish in time (e.g. it crashed),
+  the task becomes available to other workers again
+- fail: the task is retried with exponential backoff until `max_attempts`,
+  then marked failed
+- wait: an async producer polls until the task is done or failed
+
+The database lives at RESEARCH_QUEUE_PATH (defaults to
+.research_queue.sqlite3 in the project root).
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_QUEUE_PATH = PROJECT_ROOT / ".research_queue.sqlite3"
+
+QUEUED, LEASED, DONE, FAILED, CANCELLED = "queued", "leased", "done", "failed", "cancelled"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_available ON tasks (kind, status, available_at);
+"""
+
+
+class TaskFailed(Exception):
+    """Raised by `wait` when a task failed permanently or was cancelled."""
+
+
+class TaskQueue:
+    """SQLite-backed queue with leases, visibility timeouts and retries."""
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_QUEUE_PATH,
+        visibility_timeout: float = 60,
+        max_attempts: int = 3,
+        retry_backoff: float = 2,
+    ):
+        """
+        Args:
+            path: SQLite database file
+            visibility_timeout: Seconds a lease lasts without a heartbeat
+            max_attempts: Attempts before a task is marked failed
+            retry_backoff: Delay before the first retry; doubles per attempt
+        """
+        self.path = Path(path)
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # WAL lets workers read while another process holds the write lock
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _connect(self, immediate: bool = False):
+        """Open a connection for one transaction and close it afterwards.
+
+        immediate takes the write lock up front, so concurrent leases from
+        several processes cannot claim the same task.
+        """
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def enqueue(self, kind: str, payload: dict, task_id: Optional[str] = None) -> str:
+        """Add a task and return its id.
+
+        An existing task with the same id is left as-is, except that a
+        failed or cancelled one is queued again with fresh attempts.
+        """
+        task_id = task_id or uuid.uuid4().hex
+        now = time.time()
+        with self._connect(immediate=True) as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO tasks (id, kind, payload, status, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (task_id, kind, json.dumps(payload), QUEUED, now, now, now),
+            )
+            conn.execute(
+                "UPDATE tasks SET status = ?, attempts = 0, available_at = ?, error = NULL, updated_at = ? "
+                "WHERE id = ? AND status IN (?, ?)",
+                (QUEUED, now, now, task_id, FAILED, CANCELLED),
+            )
+        return task_id
+
+    def lease(self, worker_id: str, kinds: Optional[list[str]] = None) -> Optional[dict]:
+        """Claim the oldest available task, or return None if there is none.
+
+        Available means queued and due, or leased with an expired lease.
+        Returns the task as a dict with its payload decoded.
+        """
+        now = time.time()
+        kind_filter = ""
+        params = [QUEUED, now, LEASED, now]
+        if kinds:
+            kind_filter = f" AND kind IN ({', '.join('?' * len(kinds))})"
+            params += kinds
+
+        with self._connect(immediate=True) as conn:
+            # Expired leases that used up their attempts are failed, not re-leased
+            conn.execute(
+                "UPDATE tasks SET status = ?, error = COALESCE(error, 'lease expired'), updated_at = ? "
+                "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                (FAILED, now, LEASED, now, self.max_attempts),
+            )
+            row = conn.execute(
+                "SELECT * FROM tasks WHERE ((status = ? AND available_at <= ?) OR (status = ? AND lease_expires < ?))"
+                f"{kind_filter} ORDER BY available_at LIMIT 1",
+                params,
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE tasks SET status = ?, attempts = attempts + 1, lease_owner = ?, lease_expires = ?, "
+                "updated_at = ? WHERE id = ?",
+                (LEASED, worker_id, now + self.visibility_timeout, now, row["id"]),
+            )
+        task = dict(row)
+        task.update(
+            payload=json.loads(task["payload"]),
+            status=LEASED,
+            attempts=task["attempts"] + 1,
+            lease_owner=worker_id,
+            lease_expires=now + self.visibility_timeout,
+        )
+        return task
+
+    def heartbeat(self, task_id: str, worker_id: str) -> bool:
+        """Extend a lease; False if the worker no longer holds it (expired, taken over or cancelled)."""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_expires = ?, updated_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+                (now + self.visibility_timeout, now, task_id, LEASED, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, task_id: str, worker_id: str, result) -> bool:
+        """Store a leased task's result; False if the lease was lost meanwhile."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = ?, result = ?, lease_owner = NULL, updated_at = ? "
+                "WHERE id = ? AND status = ? AND lease_owner = ?",
+                (DONE, json.dumps(result), time.time(), task_id, LEASED, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, task_id: str, worker_id: str, error: str) -> bool:
+        """Record a failed attempt: retry with backoff, or mark failed after max_attempts."""
+        now = time.time()
+        with self._connect(immediate=True) as conn:
+            row = conn.execute(
+                "SELECT attempts FROM tasks WHERE id = ? AND status = ? AND lease_owner = ?",
+                (task_id, LEASED, worker_id),
+            ).fetchone()
+            if row is None:
+                return False
+            if row["attempts"] >= self.max_attempts:
+                status, available_at = FAILED, now
+            else:
+                status, available_at = QUEUED, now + self.retry_backoff * 2 ** (row["attempts"] - 1)
+            conn.execute(
+                "UPDATE tasks SET status = ?, available_at = ?, error = ?, lease_owner = NULL, updated_at = ? "
+                "WHERE id = ?",
+                (status, available_at, error, now, task_id),
+            )
+        return True
+
+    def cancel(self, task_id: str):
+        """Cancel a task that is not finished; a worker holding it loses its lease."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = ?, lease_owner = NULL, updated_at = ? WHERE id = ? AND status IN (?, ?)",
+                (CANCELLED, time.time(), task_id, QUEUED, LEASED),
+            )
+
+    def get(self, task_id: str) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return dict(row) if row else None
+
+    async def wait(self, task_id: str, poll_interval: float = 0.1, max_poll_interval: float = 1.0):
+        """Wait for a task's result.
+
+        Raises:
+            TaskFailed: The task failed permanently or was cancelled
+        """
+        interval = poll_interval
+        while True:
+            task = await asyncio.to_thread(self.get, task_id)
+            if task is None:
+                raise TaskFailed(f"Unknown task {task_id}")
+            if task["status"] == DONE:
+                return json.loads(task["result"])
+            if task["status"] in (FAILED, CANCELLED):
+                raise TaskFailed(f"Task {task_id} {task['status']}: {task['error']}")
+            await asyncio.sleep(interval)
+            interval = min(interval * 1.5, max_poll_interval)
+
+    def stats(self) -> dict:
+        """Number of tasks by status."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+
+_task_queue: Optional[TaskQueue] = None
+
+
+def get_task_queue() -> TaskQueue:
+    """Get the process-wide task queue backed by RESEARCH_QUEUE_PATH."""
+    global _task_queue
+    if _task_queue is None:
+        _task_queue = TaskQueue(os.getenv("RESEARCH_QUEUE_PATH", DEFAULT_QUEUE_PATH))
+    return _task_queue
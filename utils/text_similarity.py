@@ -0,0 +1,165 @@
+"""
+Text Similarity
+
+Small, dependency-free helpers for comparing short texts such as research
+topics: normalization, a stable fingerprint for exact matching, Jaccard
+similarity over stopword-free word sets for fuzzy matching, and TF-IDF
+cosine similarity for grouping overlapping paragraphs.
+Everything runs locally; no embeddings or network calls.
+"""
+
+import hashlib
+import math
+import re
+from collections import Counter
+from typing import Callable, Optional
+
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being between both but by
+can could did do does doing for from had has have having how if in into is it its
+more most of on or other our over should so such than that the their them then there
+these they this those through to under until up very was were what when where which
+while who why will with within would you your
+""".split())
+
+_WORD = re.compile(r"[a-z0-9]+")
+_POSSESSIVE = re.compile(r"['\u2019]s\b")
+_APOSTROPHE = re.compile(r"['\u2019]")
+_CAPITALIZED = re.compile(r"\b[A-Z][A-Za-z0-9]*(?:[-.][A-Za-z0-9]+)*")
+_SENTENCE_START = re.compile(r"(?:^|[.!?:;\n])\s*$")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase words of a text with punctuation and stopwords removed."""
+    words = _WORD.findall(_POSSESSIVE.sub("", text.lower()))
+    return [word for word in words if word not in STOPWORDS]
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form of a text: lowercase words joined by single spaces.
+
+    Only case, whitespace and punctuation are normalized. Every word is
+    kept, since stopwords such as "after" or "until" can change what a
+    question asks.
+    """
+    return " ".join(_WORD.findall(_APOSTROPHE.sub("", text.lower())))
+
+
+def fingerprint(text: str) -> str:
+    """Stable hash of the normalized text; equal for texts differing only in case, whitespace or punctuation."""
+    # Versioned so keys from the old stopword-stripping normalization never match
+    return hashlib.sha256(f"v2:{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+def named_entities(text: str) -> set[str]:
+    """Lowercased names in a text: capitalized words and acronyms such as "OpenAI", "EU" or "GPT-4".
+
+    A capitalized word at the start of a sentence only counts if it has
+    another capital or a digit in it, so "Research OpenAI's policy" yields
+    just {"openai"}.
+    """
+    text = _POSSESSIVE.sub("", text)
+    names = set()
+    for match in _CAPITALIZED.finditer(text):
+        word = match.group()
+        sentence_start = _SENTENCE_START.search(text[:match.start()]) is not None
+        if sentence_start and not re.search(r"[A-Z0-9]", word[1:]):
+            continue
+        names.add(word.lower())
+    return names
+
+
+def jaccard(a: set, b: set) -> float:
+    """Jaccard similarity of two sets (1.0 for two empty sets)."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def token_similarity(a: str, b: str) -> float:
+    """Order-insensitive similarity of two texts: Jaccard over their token sets."""
+    return jaccard(set(tokenize(a)), set(tokenize(b)))
+
+
+def shingles(text: str, size: int = 3) -> set[str]:
+    """Word n-gram shingles of a text (its tokens if it has fewer than size)."""
+    words = tokenize(text)
+    if len(words) < size:
+        return set(words)
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+_SUFFIXES = ("ations", "ation", "ings", "ing", "ies", "es", "s", "ed", "ly")
+
+
+def stem(word: str) -> str:
+    """Crude suffix stripping so that e.g. "electrolytes"/"electrolyte" or "commercialization"/"commercialize" match."""
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4 and not word.endswith("ss"):
+            return word[:-len(suffix)]
+    return word
+
+
+def tfidf_vectors(texts: list[str], ngram_size: int = 2) -> list[dict[str, float]]:
+    """TF-IDF vectors of texts over their words and word n-grams, with IDF taken from the texts themselves."""
+    documents = []
+    for text in texts:
+        words = [stem(word) for word in tokenize(text)]
+        terms = words + [" ".join(words[i:i + ngram_size]) for i in range(len(words) - ngram_size + 1)]
+        documents.append(Counter(terms))
+
+    document_frequency = Counter(term for document in documents for term in document)
+    # Smoothed IDF: terms shared by every text still count, just less
+    idf = {
+        term: math.log((1 + len(documents)) / (1 + count)) + 1
+        for term, count in document_frequency.items()
+    }
+    return [
+        {term: (1 + math.log(count)) * idf[term] for term, count in document.items()}
+        for document in documents
+    ]
+
+
+def cosine(a: dict[str, float], b: dict[str, float]) -> float:
+    """Cosine similarity of two sparse vectors."""
+    if len(a) > len(b):
+        a, b = b, a
+    dot = sum(weight * b.get(term, 0.0) for term, weight in a.items())
+    norm = math.sqrt(sum(w * w for w in a.values())) * math.sqrt(sum(w * w for w in b.values()))
+    return dot / norm if norm else 0.0
+
+
+def group_similar(
+    texts: list[str],
+    threshold: float,
+    can_join: Optional[Callable[[int, int], bool]] = None,
+) -> list[list[int]]:
+    """Group texts whose TF-IDF cosine similarity reaches threshold.
+
+    Similarity is treated as transitive (single linkage): if A~B and B~C,
+    all three end up in one group. Groups and their members are ordered by
+    first appearance. can_join(i, j), if given, must also hold for texts i
+    and j to be linked.
+
+    Returns:
+        Lists of indexes into texts; every index appears in exactly one group
+    """
+    parent = list(range(len(texts)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    vectors = tfidf_vectors(texts)
+    for i in range(len(texts)):
+        for j in range(i + 1, len(texts)):
+            if cosine(vectors[i], vectors[j]) >= threshold and (can_join is None or can_join(i, j)):
+                parent[max(find(i), find(j))] = min(find(i), find(j))
+
+    groups: dict[int, list[int]] = {}
+    for i in range(len(texts)):
+        groups.setdefault(find(i), []).append(i)
+    return list(groups.values())
+
@@ -0,0 +1,161 @@
+"""
+Weather Client
+
+Pooled, cached and coalesced lookups against the open-meteo forecast API.
+
+- One requests.Session with a pooled HTTPAdapter, so concurrent users reuse
+  warm TLS connections instead of handshaking on every call
+- Explicit connect/read timeouts and bounded retries with backoff
+- TTL cache keyed on coordinates snapped to a grid (0.1 degrees is ~11km),
+  so nearby lookups for the same city share one entry; expired entries are
+  evicted on insert and the cache holds at most `max_entries` readings
+- Single-flight: concurrent identical lookups wait on one in-flight request
+
+Point `base_url` (or OPEN_METEO_URL) at a local stand-in server for testing.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_BASE_URL = "https://api.open-meteo.com/v1/forecast"
+
+
+class WeatherClient:
+    """Current-conditions client for open-meteo.
+
+    Args:
+        base_url: Forecast endpoint URL
+        ttl_seconds: How long a cached reading stays fresh
+        grid_degrees: Coordinate grid used for cache keys
+        connect_timeout: Seconds to wait for a connection
+        read_timeout: Seconds to wait for a response
+        max_retries: Retries on connection errors and 429/5xx responses
+        pool_size: Max pooled connections per host
+        max_entries: Max cached readings; the oldest are evicted first
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        ttl_seconds: float = 600,
+        grid_degrees: float = 0.1,
+        connect_timeout: float = 3.0,
+        read_timeout: float = 5.0,
+        max_retries: int = 2,
+        pool_size: int = 20,
+        max_entries: int = 10_000,
+    ):
+        self.base_url = base_url or os.getenv("OPEN_METEO_URL", DEFAULT_BASE_URL)
+        self.ttl_seconds = ttl_seconds
+        self.grid_degrees = grid_degrees
+        self.max_entries = max_entries
+        self.timeout = (connect_timeout, read_timeout)
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Ordered by fetch time, so expired and oldest entries are at the front
+        self._cache: "OrderedDict[tuple[float, float], tuple[float, dict]]" = OrderedDict()
+        self._in_flight: dict[tuple[float, float], Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0}
+
+    def _snap(self, latitude: float, longitude: float) -> tuple[float, float]:
+        """Snap coordinates to the cache grid."""
+        grid = self.grid_degrees
+        return (round(round(latitude / grid) * grid, 4), round(round(longitude / grid) * grid, 4))
+
+    def _store(self, key: tuple[float, float], result: dict):
+        """Cache a reading, evicting expired entries and the oldest beyond max_entries.
+
+        Must be called with the lock held.
+        """
+        now = time.monotonic()
+        self._cache.pop(key, None)
+        self._cache[key] = (now, result)
+        while self._cache:
+            oldest_key, (fetched_at, _) = next(iter(self._cache.items()))
+            if now - fetched_at < self.ttl_seconds and len(self._cache) <= self.max_entries:
+                break
+            del self._cache[oldest_key]
+
+    def _fetch(self, latitude: float, longitude: float) -> dict:
+        params = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "current": "temperature_2m,weather_code",
+            "temperature_unit": "fahrenheit",
+        }
+        response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        weather = response.json()["current"]
+        return {
+            "temperature_fahrenheit": weather["temperature_2m"],
+            "weather_code": weather["weather_code"],
+        }
+
+    def get_current(self, latitude: float, longitude: float) -> dict:
+        """Get current temperature (Fahrenheit) and weather code for coordinates."""
+        key = self._snap(latitude, longitude)
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and time.monotonic() - cached[0] < self.ttl_seconds:
+                self.stats["hits"] += 1
+                return cached[1]
+
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+                self.stats["misses"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            return future.result()
+
+        # Only the leader hits the network; followers wait on its future
+        try:
+            result = self._fetch(*key)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            with self._lock:
+                self._store(key, result)
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+
+_client: Optional[WeatherClient] = None
+_client_lock = threading.Lock()
+
+
+def get_weather_client() -> WeatherClient:
+    """Get the process-wide weather client."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = WeatherClient()
+        return _client